@@ -2,28 +2,36 @@
 Main Flask application for AI-Powered Opportunity Intelligence System
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 import os
+import json
 import traceback
 from dotenv import load_dotenv
 
 # Import services
 from services.profile_service import ProfileService
 from services.opportunity_service import OpportunityService
+from services.opportunity_crawler import OpportunityCrawler
 from services.reasoning_service import ReasoningService
 from services.firebase_service import FirebaseService
 from services.chatbot_service import ChatbotService
 from services.gamification_service import GamificationService
 from services.analytics_service import AnalyticsService
 from services.success_stories_service import SuccessStoriesService
+from services.peer_stats_service import PeerStatsService
+from services.llm_client_pool import get_client_pool
+from services import llm_json
+from services.passwords import AuthBusyError
+from services.resume_jobs import ResumeJobQueue, ResumeQueueFullError
 from services.auth_service import (
     register_user, 
     login_user, 
     verify_session, 
     logout_user,
     link_profile_to_user,
-    get_user_profile
+    get_user_profile,
+    start_session_sweeper
 )
 
 # Load environment variables
@@ -36,12 +44,22 @@ CORS(app)  # Enable CORS for React frontend
 # Initialize services
 firebase_service = FirebaseService()
 profile_service = ProfileService(firebase_service)
+resume_jobs = ResumeJobQueue(profile_service, firebase_service)
 opportunity_service = OpportunityService(firebase_service)
-reasoning_service = ReasoningService(firebase_service)
+opportunity_crawler = OpportunityCrawler(opportunity_service)
+reasoning_service = ReasoningService(firebase_service, profile_service)
 chatbot_service = ChatbotService()
-gamification_service = GamificationService(firebase_service)
-analytics_service = AnalyticsService(firebase_service)
-success_stories_service = SuccessStoriesService(firebase_service)
+peer_stats_service = PeerStatsService(firebase_service)
+gamification_service = GamificationService(firebase_service, peer_stats_service)
+analytics_service = AnalyticsService(firebase_service, peer_stats_service)
+success_stories_service = SuccessStoriesService(firebase_service, peer_stats_service)
+
+# Background jobs
+peer_stats_service.start_reconciliation()
+start_session_sweeper()
+opportunity_service.key_scheduler.start_sync()
+opportunity_crawler.start()
+opportunity_service.start_expiry_sweeper()
 
 # ============================================================================
 # AUTHENTICATION ENDPOINTS
@@ -75,6 +93,8 @@ def register():
         result = register_user(email, password, name)
         return jsonify(result), 201
         
+    except AuthBusyError as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '1'}
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
     except Exception as e:
@@ -101,6 +121,8 @@ def login():
         result = login_user(email, password)
         return jsonify(result), 200
         
+    except AuthBusyError as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '1'}
     except ValueError as e:
         return jsonify({'error': str(e)}), 401
     except Exception as e:
@@ -164,11 +186,14 @@ def verify():
 @app.route('/api/profile/parse_resume', methods=['POST'])
 def parse_resume():
     """
-    Parse resume PDF and create/update profile for authenticated user
+    Queue a resume PDF for parsing into a new profile for the authenticated user
+    
+    Parsing runs in the background; poll GET /api/profile/parse_resume/<job_id>
+    until status is 'done' (result holds the profile) or 'failed'.
     
     Expected: multipart/form-data with 'resume' file
     Headers: Authorization: Bearer <session_token>
-    Returns: { profile_id, profile_data }
+    Returns: 202 { job_id, status, stage, progress }
     """
     try:
         # Verify authentication
@@ -187,30 +212,55 @@ def parse_resume():
         if resume_file.filename == '':
             return jsonify({'error': 'No file selected'}), 400
         
+        user_id = session['user_id']
+        
         # Check if user already has a profile
         existing_profile_id = session.get('profile_id')
         
         if existing_profile_id:
-            # Update existing profile
-            print(f"🔄 Updating existing profile {existing_profile_id} for user {session['user_id']}")
-            result = profile_service.parse_and_create_profile(resume_file)
-            # Link the new profile to user
-            link_profile_to_user(session['user_id'], result['profile_id'])
+            print(f"🔄 Replacing existing profile {existing_profile_id} for user {user_id}")
         else:
-            # Create new profile
-            print(f"✨ Creating new profile for user {session['user_id']}")
-            result = profile_service.parse_and_create_profile(resume_file)
-            # Link profile to user
-            link_profile_to_user(session['user_id'], result['profile_id'])
+            print(f"✨ Creating new profile for user {user_id}")
         
-        return jsonify(result), 201
+        # Link the new profile to the user once the worker has created it
+        job = resume_jobs.submit(
+            user_id,
+            resume_file.read(),
+            on_success=lambda result: link_profile_to_user(user_id, result['profile_id'])
+        )
         
+        return jsonify(job), 202
+        
+    except ResumeQueueFullError as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '5'}
     except Exception as e:
         print(f"❌ Parse resume error: {e}")
         print(f"❌ Traceback: {traceback.format_exc()}")
         return jsonify({'error': f'Failed to parse resume: {str(e)}'}), 500
 
 
+@app.route('/api/profile/parse_resume/<job_id>', methods=['GET'])
+def get_parse_resume_status(job_id):
+    """
+    Status of a resume parsing job
+    
+    Headers: Authorization: Bearer <session_token>
+    Returns: { job_id, status, stage, progress, result, error }
+    """
+    auth_header = request.headers.get('Authorization', '')
+    session_token = auth_header.replace('Bearer ', '') if auth_header.startswith('Bearer ') else None
+    
+    session = verify_session(session_token)
+    if not session:
+        return jsonify({'error': 'Unauthorized. Please login.'}), 401
+    
+    job = resume_jobs.get(job_id, user_id=session['user_id'])
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    return jsonify(job), 200
+
+
 @app.route('/api/profile/create', methods=['POST'])
 def create_profile():
     """
@@ -275,7 +325,8 @@ def search_opportunities():
         "opportunity_type": "hackathon",  // optional: filter by type
         "year": "2026",  // optional: filter by year
         "page": 1,  // optional: pagination (default 1)
-        "per_page": 10  // optional: results per page (default 10)
+        "per_page": 10,  // optional: results per page (default 10)
+        "mode": "local_first"  // optional: answer from cached catalog first
     }
     
     Returns: { opportunities: [...], count, total, page, has_more }
@@ -293,7 +344,7 @@ def search_opportunities():
         per_page = data.get('per_page', 10)
         
         # Search opportunities
-        result = opportunity_service.search_opportunities(query, opportunity_type)
+        result = opportunity_service.search_opportunities(query, opportunity_type, data.get('mode'))
         all_opportunities = result['opportunities']
         
         # Award points for search (if user_id provided)
@@ -324,7 +375,8 @@ def search_opportunities():
             'page': page,
             'per_page': per_page,
             'has_more': end_idx < total,
-            'query': result['query']
+            'query': result['query'],
+            'source': result.get('source', 'google')
         }), 200
         
     except Exception as e:
@@ -420,8 +472,12 @@ def analyze_eligibility():
         "missing_experience": [...],
         "confidence_score": 85,
         "explanation_simple": "...",
-        "next_steps": [...]
+        "next_steps": [...],
+        "provisional": false
     }
+    
+    Clear cases get an instant rule-based verdict with "provisional": true;
+    the Gemini analysis replaces it in the background, so ask again later.
     """
     try:
         data = request.json
@@ -525,6 +581,8 @@ def create_application():
         }
         
         result = firebase_service.create_application(user_id, application_data)
+        if result.get('id') != 'unsaved':
+            peer_stats_service.record_application(user_id)
         return jsonify(result), 201
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -609,6 +667,48 @@ def chat():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/chat/stream', methods=['POST'])
+def chat_stream():
+    """
+    Streaming chatbot endpoint (Server-Sent Events)
+    
+    Expected JSON: same as /api/chat
+    
+    Emits 'chunk' events ({ "text": "..." }) as the answer is generated,
+    then one 'done' event ({ "response": "...", "context_used": bool }) or
+    an 'error' event ({ "response": "...", "error": "..." }).
+    """
+    data = request.json or {}
+    user_id = data.get('user_id')
+    message = data.get('message')
+    context = data.get('context', {})
+    
+    if not user_id or not message:
+        return jsonify({'error': 'User ID and message required'}), 400
+    
+    # Auto-load user profile for personalized responses
+    try:
+        profile = firebase_service.get_user_profile(user_id)
+        if profile:
+            context['profile'] = profile
+    except Exception as profile_error:
+        print(f"⚠️  Could not load profile for chatbot: {profile_error}")
+    
+    def generate():
+        for event in chatbot_service.chat_stream(user_id, message, context):
+            event_type = event.pop('type')
+            yield f"event: {event_type}\ndata: {json.dumps(event)}\n\n"
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # Don't let a reverse proxy buffer the stream
+        }
+    )
+
+
 @app.route('/api/chat/clear/<user_id>', methods=['POST'])
 def clear_chat_history(user_id):
     """Clear chat history for user"""
@@ -737,6 +837,7 @@ def info():
         'endpoints': {
             'profiles': [
                 'POST /api/profile/parse_resume',
+                'GET /api/profile/parse_resume/<job_id>',
                 'POST /api/profile/create',
                 'GET /api/profile/<id>'
             ],
@@ -750,7 +851,15 @@ def info():
                 'POST /api/reasoning/batch',
                 'GET /api/reasoning/results/<id>'
             ]
-        }
+        },
+        'cache': firebase_service.cache.info(),
+        'profile_summary_cache': firebase_service.summary_cache.info(),
+        'search_cache': opportunity_service.search_cache.info(),
+        'search_keys': opportunity_service.key_scheduler.info(),
+        'crawler': opportunity_crawler.info(),
+        'resume_jobs': resume_jobs.info(),
+        'llm': get_client_pool().info(),
+        'llm_json': llm_json.stats()
     }), 200
 
 
@@ -833,6 +942,6 @@ if __name__ == '__main__':
     Environment: {'Development' if debug else 'Production'}
     """)
     
-    # Disable auto-reload to prevent interruption during long-running requests (resume parsing)
+    # Resume parsing jobs run in this process, so an auto-reload would kill them mid-parse
     # Set use_reloader=False to avoid Flask restarting during file uploads
     app.run(host='0.0.0.0', port=port, debug=debug, use_reloader=False)
@@ -5,13 +5,15 @@ Analytics Service - User statistics, peer comparison, and insights with syntheti
 from datetime import datetime, timedelta
 from collections import defaultdict
 from .synthetic_data_service import SyntheticDataService
+from .peer_stats_service import PeerStatsService
 
 
 class AnalyticsService:
-    def __init__(self, firebase_service):
+    def __init__(self, firebase_service, peer_stats=None):
         """Initialize analytics service"""
         self.firebase = firebase_service
         self.db = firebase_service.db
+        self.peer_stats = peer_stats or PeerStatsService(firebase_service)
     
     def get_user_analytics(self, user_id):
         """Get comprehensive analytics for user"""
@@ -24,10 +26,8 @@ class AnalyticsService:
             applications = [doc.to_dict() for doc in apps]
             
             # Get gamification data - initialize if doesn't exist
-            gami_doc = self.db.collection('gamification').document(user_id).get()
-            if gami_doc.exists:
-                gami_data = gami_doc.to_dict()
-            else:
+            gami_data = self.firebase.get_gamification(user_id)
+            if gami_data is None:
                 # Initialize empty gamification data for new users
                 gami_data = {
                     'total_points': 0,
@@ -122,24 +122,24 @@ class AnalyticsService:
                 .limit(user_rank + 3)\
                 .stream()
             
+            nearby = [
+                (rank, doc) for rank, doc in enumerate(surrounding, 1)
+                if abs(rank - user_rank) <= 3
+            ]
+            
+            # Resolve profile names in one batched read
+            profiles = self.firebase.get_profile_summaries(doc.id for _, doc in nearby)
+            
             users_list = []
-            for rank, doc in enumerate(surrounding, 1):
-                if abs(rank - user_rank) <= 3:
-                    data = doc.to_dict()
-                    # Get profile name
-                    try:
-                        profile = self.db.collection('profiles').document(doc.id).get()
-                        name = profile.to_dict().get('personal_info', {}).get('name', 'Anonymous')
-                    except:
-                        name = 'Anonymous'
-                    
-                    users_list.append({
-                        'rank': rank,
-                        'user_id': doc.id,
-                        'name': name,
-                        'points': data['total_points'],
-                        'is_current_user': doc.id == user_id
-                    })
+            for rank, doc in nearby:
+                data = doc.to_dict()
+                users_list.append({
+                    'rank': rank,
+                    'user_id': doc.id,
+                    'name': (profiles.get(doc.id) or {}).get('name') or 'Anonymous',
+                    'points': data['total_points'],
+                    'is_current_user': doc.id == user_id
+                })
             
             percentile = ((total_users - user_rank) / total_users) * 100 if total_users > 0 else 0
             
@@ -343,10 +343,10 @@ class AnalyticsService:
     def _get_peer_comparison(self, user_id, user_stats):
         """Compare user statistics with real database peer data (including synthetic)"""
         try:
-            # Get all users from database (real + synthetic)
-            all_gami_docs = list(self.db.collection('gamification').stream())
+            # Pre-aggregated peer stats (real + synthetic users) - one point read
+            snapshot = self.peer_stats.get_snapshot()
             
-            if len(all_gami_docs) < 2:
+            if not snapshot or snapshot.get('user_count', 0) < 2:
                 # Fallback to synthetic generation if database is empty
                 user_data = {
                     'user_id': user_id,
@@ -364,88 +364,41 @@ class AnalyticsService:
                 }
                 return SyntheticDataService.calculate_synthetic_peer_stats(user_data)
             
-            # Use real database data
-            all_users = []
-            for doc in all_gami_docs:
+            your_points = user_stats.get('total_points', 0)
+            summary = PeerStatsService.summarize(snapshot, your_points)
+            
+            # Top 10 is a bounded query rather than a scan of every user
+            top_docs = list(self.db.collection('gamification')\
+                .order_by('total_points', direction='DESCENDING')\
+                .limit(10)\
+                .stream())
+            profiles = self.firebase.get_profile_summaries(doc.id for doc in top_docs)
+            
+            top_users = []
+            for i, doc in enumerate(top_docs):
                 data = doc.to_dict()
-                user_obj = {
-                    'user_id': doc.id,
-                    'name': 'Unknown',
-                    'college': 'Unknown',
-                    'total_points': data.get('total_points', 0),
+                profile = profiles.get(doc.id) or {}
+                top_users.append({
+                    'rank': i+1,
+                    'name': profile.get('name') or 'Unknown',
+                    'college': profile.get('college') or 'Unknown',
+                    'points': data.get('total_points', 0),
                     'level': data.get('level', 1),
-                    'login_streak': data.get('login_streak', 0),
-                    'actions': data.get('actions', {}),
-                    'achievements_count': len(data.get('achievements', [])),
-                    'is_synthetic': data.get('is_synthetic', False)
-                }
-                
-                # Get name and college from profile
-                try:
-                    profile_doc = self.db.collection('profiles').document(doc.id).get()
-                    if profile_doc.exists:
-                        profile = profile_doc.to_dict()
-                        user_obj['name'] = profile.get('personal_info', {}).get('name', 'Unknown')
-                        user_obj['college'] = profile.get('education', {}).get('institution', 'Unknown')
-                except:
-                    pass
-                
-                all_users.append(user_obj)
-            
-            # Sort by points
-            all_users.sort(key=lambda x: x['total_points'], reverse=True)
-            
-            # Find user rank
-            user_rank = next((i+1 for i, u in enumerate(all_users) 
-                             if u['user_id'] == user_id), None)
-            
-            if not user_rank:
-                user_rank = len(all_users) + 1
-            
-            # Calculate averages
-            avg_points = sum(u['total_points'] for u in all_users) / len(all_users) if all_users else 0
-            avg_streak = sum(u['login_streak'] for u in all_users) / len(all_users) if all_users else 0
-            
-            # Get application counts
-            avg_applications = 0
-            try:
-                all_apps = list(self.db.collection('applications').stream())
-                app_counts = {}
-                for app in all_apps:
-                    app_user_id = app.to_dict().get('user_id')
-                    app_counts[app_user_id] = app_counts.get(app_user_id, 0) + 1
-                
-                if app_counts:
-                    avg_applications = sum(app_counts.values()) / len(app_counts)
-            except:
-                pass
-            
-            # Calculate percentile
-            users_below = sum(1 for u in all_users if u['total_points'] < user_stats.get('total_points', 0))
-            percentile = (users_below / len(all_users)) * 100 if all_users else 0
+                    'is_you': doc.id == user_id
+                })
             
             return {
-                'total_users': len(all_users),
-                'user_rank': user_rank,
-                'percentile': round(percentile, 1),
-                'avg_points': round(avg_points, 0),
-                'your_points': user_stats.get('total_points', 0),
-                'avg_applications': round(avg_applications, 1),
+                'total_users': summary['total_users'],
+                'user_rank': summary['user_rank'],
+                'percentile': round(summary['percentile'], 1),
+                'avg_points': round(summary['avg_points'], 0),
+                'your_points': your_points,
+                'avg_applications': round(summary['avg_applications'], 1),
                 'your_applications': user_stats.get('total_applications', 0),
-                'avg_streak': round(avg_streak, 1),
+                'avg_streak': round(summary['avg_streak'], 1),
                 'your_streak': user_stats.get('login_streak', 0),
-                'performance_vs_peers': 'above_average' if user_stats.get('total_points', 0) > avg_points else 'below_average',
-                'top_users': [
-                    {
-                        'rank': i+1,
-                        'name': u['name'],
-                        'college': u.get('college', 'Unknown'),
-                        'points': u['total_points'],
-                        'level': u['level'],
-                        'is_you': u['user_id'] == user_id
-                    }
-                    for i, u in enumerate(all_users[:10])
-                ]
+                'performance_vs_peers': 'above_average' if your_points > summary['avg_points'] else 'below_average',
+                'top_users': top_users
             }
             
         except Exception as e:
@@ -2,17 +2,43 @@
 Authentication Service
 Handles user registration, login, and session management
 """
-import hashlib
+import os
 import secrets
+import threading
 from datetime import datetime, timedelta
 from firebase_admin import firestore
 
-# In-memory session store (use Redis in production)
-active_sessions = {}
+from .session_store import create_session_store
+from . import passwords
+from .scheduler import PeriodicJob
+
+# Session store is built on first use so .env has been loaded by then
+_session_store = None
+_session_store_lock = threading.Lock()
+_session_sweeper = None
+
+
+def get_session_store():
+    """Get the process-wide session store (backend selected by SESSION_BACKEND)"""
+    global _session_store
+    with _session_store_lock:
+        if _session_store is None:
+            _session_store = create_session_store()
+        return _session_store
+
+
+def start_session_sweeper():
+    """Periodically remove expired sessions (SESSION_SWEEP_INTERVAL seconds)"""
+    global _session_sweeper
+    if _session_sweeper is None:
+        interval = int(os.getenv('SESSION_SWEEP_INTERVAL', 600))
+        _session_sweeper = PeriodicJob('session-sweeper', interval, get_session_store().purge_expired).start()
+    return _session_sweeper
+
 
 def hash_password(password):
-    """Hash password with SHA-256"""
-    return hashlib.sha256(password.encode()).hexdigest()
+    """Hash password with salted scrypt (runs on the bounded hashing pool)"""
+    return passwords.hash_password(password)
 
 def generate_session_token():
     """Generate secure session token"""
@@ -45,12 +71,12 @@ def register_user(email, password, name):
     
     # Create session
     session_token = generate_session_token()
-    active_sessions[session_token] = {
+    get_session_store().create(session_token, {
         'user_id': user_id,
         'email': email,
         'name': name,
         'expires_at': datetime.utcnow() + timedelta(days=7)
-    }
+    })
     
     return {
         'user_id': user_id,
@@ -79,10 +105,18 @@ def login_user(email, password):
     user_id = user_doc.id
     
     # Verify password
-    password_hash = hash_password(password)
-    if user_data['password_hash'] != password_hash:
+    matches, needs_rehash = passwords.verify_password(password, user_data.get('password_hash'))
+    if not matches:
         raise ValueError('Invalid email or password')
     
+    # Upgrade legacy SHA-256 (or outdated cost) hashes now that we know the password
+    if needs_rehash:
+        try:
+            user_doc.reference.update({'password_hash': hash_password(password)})
+            print(f"🔐 Upgraded password hash for user {user_id}")
+        except Exception as e:
+            print(f"Could not upgrade password hash: {e}")
+    
     # Get gamification data for streak info
     login_streak = 0
     try:
@@ -98,13 +132,13 @@ def login_user(email, password):
     
     # Create session
     session_token = generate_session_token()
-    active_sessions[session_token] = {
+    get_session_store().create(session_token, {
         'user_id': user_id,
         'email': user_data['email'],
         'name': user_data.get('name', email.split('@')[0]),
         'profile_id': user_data.get('profile_id'),
         'expires_at': datetime.utcnow() + timedelta(days=7)
-    }
+    })
     
     return {
         'user_id': user_id,
@@ -120,22 +154,16 @@ def verify_session(session_token):
     Verify session token is valid
     Returns: user data if valid, None if invalid
     """
-    if not session_token or session_token not in active_sessions:
-        return None
-    
-    session = active_sessions[session_token]
-    
-    # Check expiration
-    if datetime.utcnow() > session['expires_at']:
-        del active_sessions[session_token]
+    if not session_token:
         return None
     
-    return session
+    # Expired sessions are removed by the store and reported as missing
+    return get_session_store().get(session_token)
 
 def logout_user(session_token):
     """Logout user by removing session"""
-    if session_token in active_sessions:
-        del active_sessions[session_token]
+    if session_token:
+        get_session_store().delete(session_token)
     return True
 
 def link_profile_to_user(user_id, profile_id):
@@ -150,9 +178,7 @@ def link_profile_to_user(user_id, profile_id):
     })
     
     # Update all active sessions for this user
-    for token, session in active_sessions.items():
-        if session['user_id'] == user_id:
-            session['profile_id'] = profile_id
+    get_session_store().update_user(user_id, profile_id=profile_id)
     
     return True
 
@@ -0,0 +1,235 @@
+"""
+Cache - Pluggable read-through cache with TTL, LRU eviction and hit/miss counters
+
+Backends:
+- memory: in-process LRU (default, per gunicorn worker)
+- redis:  any Redis-compatible server (shared across workers), set
+          CACHE_BACKEND=redis and REDIS_URL
+"""
+
+import copy
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+
+class CacheStats:
+    """Thread-safe hit/miss counters, broken down by key kind (prefix before ':')"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = defaultdict(lambda: {'hits': 0, 'misses': 0, 'sets': 0, 'invalidations': 0})
+
+    def record(self, key, event):
+        kind = key.split(':', 1)[0]
+        with self._lock:
+            self._counts[kind][event] += 1
+
+    def snapshot(self):
+        with self._lock:
+            by_kind = {kind: dict(counts) for kind, counts in self._counts.items()}
+
+        totals = {'hits': 0, 'misses': 0, 'sets': 0, 'invalidations': 0}
+        for counts in by_kind.values():
+            for event, value in counts.items():
+                totals[event] += value
+
+        lookups = totals['hits'] + totals['misses']
+        totals['hit_rate'] = round(totals['hits'] / lookups, 3) if lookups else 0
+        return {**totals, 'by_kind': by_kind}
+
+
+class BaseCache:
+    """Common read-through logic; backends implement _get/_set/_delete/_clear"""
+
+    backend = 'base'
+
+    def __init__(self, default_ttl=60):
+        self.default_ttl = default_ttl
+        self.stats = CacheStats()
+
+    def get(self, key):
+        """Get cached value or None on miss"""
+        found, value = self._get(key)
+        self.stats.record(key, 'hits' if found else 'misses')
+        return value if found else None
+
+    def get_many(self, keys):
+        """Get several keys at once; returns {key: value} for hits only"""
+        found = {}
+        for key, (hit, value) in zip(keys, self._get_many(keys)):
+            self.stats.record(key, 'hits' if hit else 'misses')
+            if hit:
+                found[key] = value
+        return found
+
+    def set(self, key, value, ttl=None):
+        self._set(key, value, ttl if ttl is not None else self.default_ttl)
+        self.stats.record(key, 'sets')
+
+    def delete(self, *keys):
+        for key in keys:
+            self._delete(key)
+            self.stats.record(key, 'invalidations')
+
+    def clear(self):
+        self._clear()
+
+    def get_or_load(self, key, loader, ttl=None):
+        """
+        Read-through lookup
+
+        Args:
+            key: Cache key, conventionally '<kind>:<id>'
+            loader: Zero-argument callable returning the fresh value
+            ttl: Seconds to keep the value (defaults to default_ttl)
+
+        Returns:
+            Cached or freshly loaded value. None results are not cached so a
+            document created later is picked up immediately.
+        """
+        found, value = self._get(key)
+        if found:
+            self.stats.record(key, 'hits')
+            return value
+
+        self.stats.record(key, 'misses')
+        value = loader()
+        if value is not None:
+            self.set(key, value, ttl)
+        return value
+
+    def info(self):
+        return {'backend': self.backend, **self.stats.snapshot()}
+
+    def _get(self, key):
+        raise NotImplementedError
+
+    def _get_many(self, keys):
+        return [self._get(key) for key in keys]
+
+    def _set(self, key, value, ttl):
+        raise NotImplementedError
+
+    def _delete(self, key):
+        raise NotImplementedError
+
+    def _clear(self):
+        raise NotImplementedError
+
+
+class MemoryCache(BaseCache):
+    """In-process LRU cache with per-entry TTL"""
+
+    backend = 'memory'
+
+    def __init__(self, max_entries=2048, default_ttl=60):
+        super().__init__(default_ttl)
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+        # Hand out copies so callers can't mutate the cached document
+        return True, copy.deepcopy(value)
+
+    def _set(self, key, value, ttl):
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def _clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def info(self):
+        with self._lock:
+            size = len(self._entries)
+        return {**super().info(), 'entries': size, 'max_entries': self.max_entries}
+
+
+class RedisCache(BaseCache):
+    """Cache stored in a Redis-compatible server, shared by all workers"""
+
+    backend = 'redis'
+
+    def __init__(self, url, namespace='orbit', default_ttl=60):
+        super().__init__(default_ttl)
+        try:
+            import redis
+        except ImportError:
+            raise ImportError("CACHE_BACKEND=redis requires the 'redis' package (pip install redis)")
+
+        self.client = redis.Redis.from_url(url)
+        self.client.ping()
+        self.namespace = namespace
+
+    def _key(self, key):
+        return f"{self.namespace}:{key}"
+
+    def _get(self, key):
+        raw = self.client.get(self._key(key))
+        if raw is None:
+            return False, None
+        return True, pickle.loads(raw)
+
+    def _get_many(self, keys):
+        if not keys:
+            return []
+        raws = self.client.mget([self._key(key) for key in keys])
+        return [(False, None) if raw is None else (True, pickle.loads(raw)) for raw in raws]
+
+    def _set(self, key, value, ttl):
+        self.client.set(self._key(key), pickle.dumps(value), ex=max(1, int(ttl)))
+
+    def _delete(self, key):
+        self.client.delete(self._key(key))
+
+    def _clear(self):
+        for key in self.client.scan_iter(f"{self.namespace}:*"):
+            self.client.delete(key)
+
+
+def create_cache(namespace, default_ttl=60, max_entries=None):
+    """
+    Build the cache backend selected by CACHE_BACKEND (memory | redis)
+
+    Falls back to the in-process cache if the Redis backend can't be created.
+    max_entries bounds the in-process LRU (default CACHE_MAX_ENTRIES).
+    """
+    backend = os.getenv('CACHE_BACKEND', 'memory').lower()
+
+    if backend == 'redis':
+        try:
+            cache = RedisCache(
+                os.getenv('REDIS_URL', 'redis://localhost:6379/0'),
+                namespace=namespace,
+                default_ttl=default_ttl
+            )
+            print(f"✓ Using Redis cache for '{namespace}'")
+            return cache
+        except Exception as e:
+            print(f"⚠️  Redis cache unavailable ({e}), falling back to in-process cache")
+
+    return MemoryCache(
+        max_entries=max_entries or int(os.getenv('CACHE_MAX_ENTRIES', 2048)),
+        default_ttl=default_ttl
+    )
@@ -0,0 +1,68 @@
+"""
+Canonical URL - Normalize opportunity links so each real page has one ID
+
+Search results for the same page arrive with different tracking
+parameters, fragments, www/mobile subdomains and http/https schemes.
+canonicalize_url() strips those differences and opportunity_id_for_url()
+derives the Firestore document ID from the result.
+"""
+
+import hashlib
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+
+# Host prefixes that serve the same content as the bare domain
+MIRROR_HOST_PREFIXES = ('www.', 'm.', 'mobile.', 'amp.')
+
+# Query parameters that only track the visit. Only well-known tracker names:
+# generic ones like 'ref' or 'source' select content on many sites, and
+# stripping them would merge distinct opportunities into one ID
+TRACKING_PARAMS = {
+    'gclid', 'dclid', 'gbraid', 'wbraid', 'fbclid', 'msclkid', 'yclid', 'twclid',
+    'ttclid', 'li_fat_id', 'igshid', 'mc_cid', 'mc_eid', '_ga', '_gl', '_hsenc', '_hsmi'
+}
+TRACKING_PREFIXES = ('utm_', 'pk_', 'hsa_')
+
+
+def canonicalize_url(url):
+    """
+    Normalize a URL for deduplication
+
+    - https scheme, lowercase host without www./m./mobile./amp. or default port
+    - tracking parameters removed, remaining parameters sorted
+    - fragment and trailing slash removed
+
+    Returns:
+        Canonical URL string ('' for empty input)
+    """
+    if not url:
+        return ''
+
+    url = url.strip()
+    if '://' not in url:
+        url = f"https://{url}"
+
+    parts = urlsplit(url)
+
+    host = (parts.hostname or '').lower()
+    for prefix in MIRROR_HOST_PREFIXES:
+        if host.startswith(prefix) and host.count('.') > 1:
+            host = host[len(prefix):]
+            break
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+
+    path = parts.path.rstrip('/') or ''
+
+    return urlunsplit(('https', host, path, urlencode(query), ''))
+
+
+def opportunity_id_for_url(url):
+    """Stable 12-character opportunity ID derived from the canonical URL"""
+    return hashlib.md5(canonicalize_url(url).encode()).hexdigest()[:12]
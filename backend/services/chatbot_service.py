@@ -2,42 +2,23 @@
 Chatbot Service - AI assistant for ORBIT platform
 """
 
-import google.generativeai as genai
-import os
 import requests
 from bs4 import BeautifulSoup
 import re
 
+from .llm_client_pool import get_client_pool, GeminiQuotaError
+from .history_store import create_history_store
+
 
 class ChatbotService:
-    def __init__(self):
-        """Initialize chatbot service with Gemini AI and load balancing"""
-        # Configure Gemini API with load balancing
-        gemini_key = os.getenv('GEMINI_API_KEY')
-        gemini_key_2 = os.getenv('GEMINI_API_KEY_2')
-        
-        # Setup key rotation for load balancing
-        self.api_keys = [k for k in [gemini_key, gemini_key_2] if k]
-        if not self.api_keys:
-            print("⚠️  Warning: No GEMINI_API_KEY configured")
-        else:
-            print(f"✓ Load balancing enabled with {len(self.api_keys)} Gemini API keys for chatbot")
-        
-        self.current_key_index = 0
-        self.conversation_history = {}
-        
-        # Initialize with first key
-        if self.api_keys:
-            genai.configure(api_key=self.api_keys[0])
-            self.model = genai.GenerativeModel('gemini-2.5-flash')
+    # Shown when every configured Gemini key is rate limited or out of quota
+    QUOTA_MESSAGE = "🚫 **API Quota Exhausted**\n\nAll Gemini API keys have reached their limits.\n\n**Solutions:**\n1. Wait 1 minute and try again (if rate limit)\n2. Wait until tomorrow (if daily quota hit)\n3. Get new API keys from https://makersuite.google.com/app/apikey\n\n**Meanwhile, try:**\n- Just tell me the competition details (deadline, eligibility, requirements) and I'll help assess your eligibility!\n- Or use the 'Check Eligibility' button on opportunity cards"
+    ERROR_MESSAGE = "I'm having trouble processing that. Could you rephrase?"
     
-    def _rotate_api_key(self):
-        """Rotate to next API key for load balancing"""
-        if len(self.api_keys) > 1:
-            self.current_key_index = (self.current_key_index + 1) % len(self.api_keys)
-            genai.configure(api_key=self.api_keys[self.current_key_index])
-            self.model = genai.GenerativeModel('gemini-2.5-flash')
-            print(f"🔄 Rotated to API key #{self.current_key_index + 1}")
+    def __init__(self):
+        """Initialize chatbot service with the shared Gemini client pool"""
+        self.llm = get_client_pool()
+        self.history = create_history_store()
     
     def _scrape_webpage(self, url):
         """Scrape webpage content for analysis"""
@@ -105,71 +86,24 @@ Or you can copy-paste the key details from the page!"""
         try:
             print(f"💬 Chatbot request from user {user_id}: {message[:100]}...")
             
-            # Get or create conversation history
-            if user_id not in self.conversation_history:
-                self.conversation_history[user_id] = []
-            
-            # Check if message contains a URL
-            url_pattern = r'https?://[^\s]+'
-            urls = re.findall(url_pattern, message)
-            scraped_content = ""
-            
-            if urls:
-                print(f"🔗 Detected URL in message, scraping: {urls[0]}")
-                scraped_content = self._scrape_webpage(urls[0])
-                print(f"📄 Scraped content length: {len(scraped_content)} chars")
-                message += f"\n\n[Webpage Content Extracted]:\n{scraped_content}"
-            
-            # Build context-aware prompt
-            system_prompt = self._build_system_prompt(context)
-            full_prompt = f"{system_prompt}\n\nUser: {message}"
-            
-            # Add conversation history
-            if self.conversation_history[user_id]:
-                history_text = "\n".join([
-                    f"{'User' if msg['role'] == 'user' else 'Assistant'}: {msg['content']}"
-                    for msg in self.conversation_history[user_id][-5:]  # Last 5 messages
-                ])
-                full_prompt = f"Previous conversation:\n{history_text}\n\n{full_prompt}"
+            message, full_prompt = self._prepare_prompt(user_id, message, context)
             
             # Generate response
             print(f"🤖 Calling Gemini AI...")
             
-            # Try with retry and key rotation
-            max_retries = 2
-            for attempt in range(max_retries):
-                try:
-                    response = self.model.generate_content(full_prompt)
-                    response_text = response.text
-                    print(f"✅ Got response: {response_text[:100]}...")
-                    break
-                except Exception as api_error:
-                    if "429" in str(api_error) or "quota" in str(api_error).lower():
-                        print(f"⚠️  Quota exceeded on attempt {attempt + 1}, rotating key...")
-                        self._rotate_api_key()
-                        if attempt == max_retries - 1:
-                            return {
-                                'response': "I'm currently experiencing high demand. Please try again in a minute. ⏰",
-                                'error': 'quota_exceeded'
-                            }
-                    else:
-                        raise
-            else:
-                # All retries exhausted
+            # The pool retries on the other keys when one is rate limited
+            try:
+                response = self.llm.generate_content(full_prompt)
+                response_text = response.text
+                print(f"✅ Got response: {response_text[:100]}...")
+            except GeminiQuotaError as quota_error:
+                print(f"⚠️  {quota_error}")
                 return {
-                    'response': "🚫 **API Quota Exhausted**\n\nBoth Gemini API keys have reached their limits.\n\n**Solutions:**\n1. Wait 1 minute and try again (if rate limit)\n2. Wait until tomorrow (if daily quota hit)\n3. Get new API keys from https://makersuite.google.com/app/apikey\n\n**Meanwhile, try:**\n- Just tell me the competition details (deadline, eligibility, requirements) and I'll help assess your eligibility!\n- Or use the 'Check Eligibility' button on opportunity cards",
+                    'response': self.QUOTA_MESSAGE,
                     'error': 'quota_exceeded'
                 }
             
-            # Update conversation history
-            self.conversation_history[user_id].append({
-                'role': 'user',
-                'content': message
-            })
-            self.conversation_history[user_id].append({
-                'role': 'assistant',
-                'content': response_text
-            })
+            self._record_exchange(user_id, message, response_text)
             
             return {
                 'response': response_text,
@@ -180,10 +114,102 @@ Or you can copy-paste the key details from the page!"""
             import traceback
             traceback.print_exc()
             return {
-                'response': "I'm having trouble processing that. Could you rephrase?",
+                'response': self.ERROR_MESSAGE,
                 'error': str(e)
             }
     
+    def chat_stream(self, user_id, message, context=None):
+        """
+        Streaming variant of chat()
+        
+        Yields event dictionaries as Gemini produces output:
+            {'type': 'chunk', 'text': ...}     for each streamed piece
+            {'type': 'done', 'response': ...}  once, with the full text
+            {'type': 'error', 'response': ..., 'error': ...} on failure
+        
+        The exchange is added to the conversation history only after the
+        stream completes.
+        """
+        try:
+            print(f"💬 Streaming chatbot request from user {user_id}: {message[:100]}...")
+            
+            message, full_prompt = self._prepare_prompt(user_id, message, context)
+            
+            try:
+                response = self.llm.generate_content(full_prompt, stream=True)
+            except GeminiQuotaError as quota_error:
+                print(f"⚠️  {quota_error}")
+                yield {'type': 'error', 'response': self.QUOTA_MESSAGE, 'error': 'quota_exceeded'}
+                return
+            
+            parts = []
+            for chunk in response:
+                try:
+                    text = chunk.text
+                except ValueError:
+                    # Chunk without text (e.g. only safety metadata)
+                    continue
+                if text:
+                    parts.append(text)
+                    yield {'type': 'chunk', 'text': text}
+            
+            response_text = ''.join(parts)
+            print(f"✅ Streamed response: {response_text[:100]}...")
+            
+            self._record_exchange(user_id, message, response_text)
+            
+            yield {
+                'type': 'done',
+                'response': response_text,
+                'context_used': context is not None
+            }
+        except Exception as e:
+            print(f"❌ Chatbot stream error: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            yield {'type': 'error', 'response': self.ERROR_MESSAGE, 'error': str(e)}
+    
+    def _prepare_prompt(self, user_id, message, context):
+        """
+        Expand URLs in the message and build the full prompt with history
+        
+        Returns:
+            Tuple of (message as stored in history, full prompt)
+        """
+        # Check if message contains a URL
+        url_pattern = r'https?://[^\s]+'
+        urls = re.findall(url_pattern, message)
+        scraped_content = ""
+        
+        if urls:
+            print(f"🔗 Detected URL in message, scraping: {urls[0]}")
+            scraped_content = self._scrape_webpage(urls[0])
+            print(f"📄 Scraped content length: {len(scraped_content)} chars")
+            message += f"\n\n[Webpage Content Extracted]:\n{scraped_content}"
+        
+        # Build context-aware prompt
+        system_prompt = self._build_system_prompt(context)
+        full_prompt = f"{system_prompt}\n\nUser: {message}"
+        
+        # Add conversation history
+        history = self.history.get(user_id, limit=5)  # Last 5 messages
+        if history:
+            history_text = "\n".join([
+                f"{'User' if msg['role'] == 'user' else 'Assistant'}: {msg['content']}"
+                for msg in history
+            ])
+            full_prompt = f"Previous conversation:\n{history_text}\n\n{full_prompt}"
+        
+        return message, full_prompt
+    
+    def _record_exchange(self, user_id, message, response_text):
+        """Append a user message and the assistant's reply to the history"""
+        self.history.append(
+            user_id,
+            {'role': 'user', 'content': message},
+            {'role': 'assistant', 'content': response_text}
+        )
+    
     def _build_system_prompt(self, context):
         """Build context-aware system prompt"""
         base_prompt = """You are ORBIT's AI assistant, helping students find and succeed in opportunities.
@@ -236,6 +262,5 @@ Be helpful, concise, and encourage user initiative."""
     
     def clear_history(self, user_id):
         """Clear conversation history for user"""
-        if user_id in self.conversation_history:
-            del self.conversation_history[user_id]
+        self.history.clear(user_id)
         return {'success': True}
@@ -0,0 +1,249 @@
+"""
+Date Extraction - Deadline and expiry detection for search result snippets
+
+Every search result is scanned twice: once for its deadline and once to
+decide whether it has already expired. The patterns here are compiled
+once at import, each one is skipped when the text lacks a literal it
+cannot match without (a keyword, an apostrophe, a slash or dash, a
+four-digit year), and results are memoized per text so the same result
+seen again in a later search is not re-scanned.
+
+Matching semantics are unchanged from the original inline helpers:
+the deadline is the first match of the highest-priority pattern, and a
+result is expired if it mentions a closed/ended keyword or any date
+before yesterday.
+"""
+
+import re
+from collections import namedtuple
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+
+
+# Results are memoized per text; search pages repeat heavily across queries
+CACHE_SIZE = 16384
+
+DEADLINE_KEYWORDS = [
+    'deadline', 'apply by', 'last date', 'due date', 'register by', 'submit by',
+    'registration deadline', 'application deadline', 'closes on', 'close date',
+    'expiry', 'expires', 'ends on', 'till', 'before'
+]
+SHORT_DEADLINE_KEYWORDS = ['deadline', 'apply by', 'last date', 'due date', 'register by', 'submit by']
+
+EXPIRED_KEYWORDS = ['closed', 'ended', 'expired', 'registration closed', 'applications closed']
+
+MONTHS = {'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+          'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12}
+
+_KEYWORDS = '(?:' + '|'.join(DEADLINE_KEYWORDS) + ')'
+_SHORT_KEYWORDS = '(?:' + '|'.join(SHORT_DEADLINE_KEYWORDS) + ')'
+
+# Each pattern lists the gates (literals it cannot match without) that must
+# all be present in the text before it is run:
+# 'keyword' / 'short_keyword' (a deadline keyword), "'" (short year),
+# '/' and '-' (numeric dates), 'separator' (either), 'deadline' (the word)
+DEADLINE_PATTERNS = [
+    # With keywords
+    (_KEYWORDS + r':?\s*([A-Z][a-z]+\s+\d{1,2},?\s+\d{4})', 'keyword_mdy', ('keyword',)),
+    (_KEYWORDS + r':?\s*(\d{1,2}\s+[A-Z][a-z]+\s+\d{4})', 'keyword_dmy', ('keyword',)),
+    (_SHORT_KEYWORDS + r':?\s*(\d{1,2}\s+[A-Z][a-z]+\s+\'\d{2})', 'keyword_short_dmy', ('short_keyword', "'")),
+    (_SHORT_KEYWORDS + r':?\s*([A-Z][a-z]+\s+\d{1,2}\s+\'\d{2})', 'keyword_short_mdy', ('short_keyword', "'")),
+
+    # Standalone dates (more aggressive)
+    (r'\b([A-Z][a-z]+\s+\d{1,2},?\s+20\d{2})\b', 'standalone_mdy', ()),
+    (r'\b(\d{1,2}\s+[A-Z][a-z]+\s+20\d{2})\b', 'standalone_dmy', ()),
+    (r'\b(\d{1,2}\s+[A-Z][a-z]+\s+\'\d{2})\b', 'standalone_short_dmy', ("'",)),
+    (r'\b([A-Z][a-z]+\s+\d{1,2}\s+\'\d{2})\b', 'standalone_short_mdy', ("'",)),
+
+    # Numeric formats
+    (r'\b(\d{1,2}/\d{1,2}/20\d{2})\b', 'slash', ('/',)),
+    (r'\b(\d{1,2}-\d{1,2}-20\d{2})\b', 'dash', ('-',)),
+    (r'\b(20\d{2}-\d{1,2}-\d{1,2})\b', 'iso', ('-',)),
+]
+
+# Matched against lowercased text; groups are converted by _to_date()
+EXPIRY_PATTERNS = [
+    # Month Day, Year: Jan 15, 2026
+    (r'(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]* (\d{1,2}),? (\d{4})', 'mdy', ()),
+    # Day-Month-Year: 15-01-2026 or 15/01/2026
+    (r'(\d{1,2})[-/](\d{1,2})[-/](\d{4})', 'dmy', ('separator',)),
+    # Year-Month-Day: 2026-01-15
+    (r'(\d{4})-(\d{1,2})-(\d{1,2})', 'ymd', ('-',)),
+    # Deadline: 15 Jan 2026
+    (r'deadline:?\s*(\d{1,2})\s*(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\s*(\d{4})', 'dmy_text', ('deadline',)),
+]
+
+# strptime formats for the strings extract_deadline() returns (commas removed);
+# numeric dates are day-first like the expiry patterns
+DEADLINE_FORMATS = ['%B %d %Y', '%b %d %Y', '%d %B %Y', '%d %b %Y', '%d/%m/%Y', '%d-%m-%Y', '%Y-%m-%d']
+
+_COMPILED_DEADLINE = [(re.compile(p, re.IGNORECASE), name, gates) for p, name, gates in DEADLINE_PATTERNS]
+_COMPILED_EXPIRY = [(re.compile(p), name, gates) for p, name, gates in EXPIRY_PATTERNS]
+
+# Every pattern needs a four-digit or apostrophe-prefixed two-digit year
+_YEAR_RE = re.compile(r"\d{4}|'\d{2}")
+_FULL_YEAR_RE = re.compile(r'\d{4}')
+
+
+ExpiryScan = namedtuple('ExpiryScan', ['closed', 'dates'])
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def extract_deadline(text):
+    """
+    Find the deadline mentioned in a title + snippet
+
+    Patterns are tried in priority order (keyword dates, then standalone
+    dates, then numeric formats) and the first match wins.
+
+    Returns:
+        Date string as written (short years expanded, e.g. '26 -> 2026) or None
+    """
+    if not text or not _YEAR_RE.search(text):
+        return None
+
+    lowered = text.lower()
+    present = {
+        'keyword': any(k in lowered for k in DEADLINE_KEYWORDS),
+        'short_keyword': any(k in lowered for k in SHORT_DEADLINE_KEYWORDS),
+        "'": "'" in text,
+        '/': '/' in text,
+        '-': '-' in text,
+    }
+
+    for regex, _, gates in _COMPILED_DEADLINE:
+        if not all(present[gate] for gate in gates):
+            continue
+        match = regex.search(text)
+        if match:
+            date_str = match.group(1)
+
+            # Convert short year to full year
+            if "'" in date_str:
+                date_str = date_str.replace("'2", "202").replace("'1", "201")
+            return date_str
+
+    return None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def scan_expiry(title, snippet):
+    """
+    Collect everything needed to decide whether a result has expired
+
+    Independent of today's date so it can be memoized; see is_expired().
+
+    Returns:
+        ExpiryScan(closed, dates) where closed is True if an expired keyword
+        appears and dates are all parseable dates, in pattern then text order
+    """
+    text = (title + ' ' + snippet).lower()
+
+    if any(keyword in text for keyword in EXPIRED_KEYWORDS):
+        return ExpiryScan(True, ())
+
+    if not _FULL_YEAR_RE.search(text):
+        return ExpiryScan(False, ())
+
+    present = {
+        'separator': '-' in text or '/' in text,
+        '-': '-' in text,
+        'deadline': 'deadline' in text,
+    }
+
+    dates = []
+    for regex, format_type, gates in _COMPILED_EXPIRY:
+        if not all(present[gate] for gate in gates):
+            continue
+        for match in regex.findall(text):
+            deadline = _to_date(format_type, match)
+            if deadline:
+                dates.append(deadline)
+
+    return ExpiryScan(False, tuple(dates))
+
+
+def is_expired(title, snippet, today=None):
+    """
+    Check whether a result's deadline has passed
+
+    Args:
+        title: Result title
+        snippet: Result snippet
+        today: Reference date (defaults to date.today())
+
+    Returns:
+        Tuple of (expired, deadline) where deadline is the first date found
+        before yesterday, or None when expired by keyword (or not expired)
+    """
+    scan = scan_expiry(title, snippet)
+    if scan.closed:
+        return True, None
+
+    yesterday = (today or date.today()) - timedelta(days=1)
+    for deadline in scan.dates:
+        if deadline < yesterday:
+            return True, deadline
+
+    return False, None
+
+
+def parse_deadline(date_str):
+    """
+    Parse a deadline string from extract_deadline() into a date
+
+    Returns:
+        date, or None for 'Not specified' and formats it doesn't recognise
+    """
+    if not date_str:
+        return None
+
+    text = ' '.join(date_str.replace(',', ' ').split())
+    for fmt in DEADLINE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def expires_at(deadline_str, default_ttl_days, now=None):
+    """
+    When a cached opportunity stops being served
+
+    Results are treated as expired once their deadline is before yesterday
+    (see is_expired()), so a parsed deadline expires two days after it;
+    without one the opportunity lives default_ttl_days from now.
+
+    Returns:
+        Timezone-aware UTC datetime
+    """
+    deadline = parse_deadline(deadline_str)
+    if deadline:
+        return datetime.combine(deadline + timedelta(days=2), datetime.min.time(), timezone.utc)
+    return (now or datetime.now(timezone.utc)) + timedelta(days=default_ttl_days)
+
+
+def cache_info():
+    return {
+        'deadline': extract_deadline.cache_info()._asdict(),
+        'expiry': scan_expiry.cache_info()._asdict()
+    }
+
+
+def _to_date(format_type, match):
+    try:
+        if format_type == 'mdy':
+            month, day, year = MONTHS.get(match[0][:3]), int(match[1]), int(match[2])
+        elif format_type == 'dmy':
+            day, month, year = int(match[0]), int(match[1]), int(match[2])
+        elif format_type == 'ymd':
+            year, month, day = int(match[0]), int(match[1]), int(match[2])
+        else:  # dmy_text
+            day, month, year = int(match[0]), MONTHS.get(match[1][:3]), int(match[2])
+
+        if not month:
+            return None
+        return date(year, month, day)
+    except ValueError:
+        return None
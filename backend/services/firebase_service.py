@@ -6,7 +6,50 @@ import firebase_admin
 from firebase_admin import credentials, firestore
 import os
 import json
-from datetime import datetime
+import hashlib
+from datetime import datetime, timedelta, timezone
+from .cache import create_cache
+from .canonical_url import canonicalize_url, opportunity_id_for_url
+from .date_extraction import expires_at as opportunity_expires_at
+
+
+# Firestore get_all() accepts many refs, but keep each round trip bounded
+GET_ALL_BATCH_SIZE = 100
+
+# Firestore allows at most 500 writes per batch
+WRITE_BATCH_SIZE = 500
+
+# Opportunity fields that make up its content hash (unchanged docs aren't rewritten)
+OPPORTUNITY_CONTENT_FIELDS = [
+    'title', 'link', 'url', 'description', 'snippet', 'source', 'type',
+    'organizer', 'eligibility_text', 'deadline', 'apply_by'
+]
+
+# Fields stored with an opportunity that depend on the search that found it;
+# kept out of the content hash so a different query doesn't force a rewrite
+OPPORTUNITY_SEARCH_FIELDS = ['relevance_score']
+
+# Firestore caps the number of values in an 'in' filter at 30
+REASONING_IN_QUERY_SIZE = 30
+
+# get_cached_opportunities reads this many times the page size, so the page
+# is still full after dropping expired entries and duplicates
+CACHED_OPPORTUNITIES_OVERFETCH = 3
+
+# Seconds each kind of document stays in the read-through cache
+CACHE_TTLS = {
+    'profile': 300,
+    'opportunity': 600,
+    'reasoning': 600,
+    'reasoning_fingerprint': 3600,
+    'gamification': 30,
+    'applications': 30
+}
+
+
+def is_provisional_reasoning(reasoning):
+    """True for a stored pre-screen verdict that a Gemini analysis will replace"""
+    return bool((reasoning.get('analysis') or {}).get('provisional'))
 
 
 class FirebaseService:
@@ -17,8 +60,30 @@ class FirebaseService:
         self.students_collection = None
         self.opportunities_collection = None
         self.reasoning_collection = None
+        self.reasoning_cache_collection = None
         self.firebase_enabled = False
         
+        # Read-through cache for hot documents (invalidated on writes)
+        self.cache = create_cache('firebase')
+        
+        # Short-lived name/college cache for leaderboard and peer views, kept
+        # apart so bulk lookups don't evict hot documents from self.cache
+        self.profile_summary_ttl = int(os.getenv('PROFILE_SUMMARY_TTL', 120))
+        self.summary_cache = create_cache(
+            'profile_summary',
+            max_entries=int(os.getenv('PROFILE_SUMMARY_CACHE_SIZE', 4096))
+        )
+        
+        # Opportunities without a parseable deadline expire this long after last being seen
+        self.opportunity_ttl_days = int(os.getenv('OPPORTUNITY_DEFAULT_TTL_DAYS', 60))
+        
+        # Unchanged opportunities only get last_seen (and expires_at) rewritten
+        # once it is older than this, not on every search
+        self.last_seen_refresh = int(os.getenv('OPPORTUNITY_LAST_SEEN_REFRESH', 86400))
+        
+        # Cleared once a query shows the (type, cached_at) composite index is missing
+        self._type_cached_index = True
+        
         try:
             # Check if already initialized
             if not firebase_admin._apps:
@@ -64,6 +129,7 @@ class FirebaseService:
             self.students_collection = self.db.collection('students')
             self.opportunities_collection = self.db.collection('opportunities')
             self.reasoning_collection = self.db.collection('reasoning_results')
+            self.reasoning_cache_collection = self.db.collection('reasoning_cache')
             
             self.firebase_enabled = True
             print("✓ Firebase initialized successfully")
@@ -130,6 +196,15 @@ class FirebaseService:
             print(f"⚠️  Firebase disabled - cannot retrieve profile {profile_id}")
             return None
         
+        return self.cache.get_or_load(
+            f"profile:{profile_id}",
+            lambda: self._fetch_student_profile(profile_id),
+            ttl=CACHE_TTLS['profile']
+        )
+    
+    
+    def _fetch_student_profile(self, profile_id):
+        """Read a student profile from Firestore (cache miss path)"""
         try:
             doc_ref = self.students_collection.document(profile_id)
             doc = doc_ref.get()
@@ -159,12 +234,81 @@ class FirebaseService:
                 'profile': profile_data,
                 'updated_at': firestore.SERVER_TIMESTAMP
             })
+            self.cache.delete(f"profile:{profile_id}")
             return {'success': True, 'profile_id': profile_id}
         except Exception as e:
             print(f"❌ Error updating profile: {e}")
             return {'success': False, 'error': str(e)}
     
     
+    def get_profile_summaries(self, user_ids, use_cache=True):
+        """
+        Resolve display name and college for many users in one round trip
+        
+        Reads the 'profiles' collection with get_all() in chunks of
+        GET_ALL_BATCH_SIZE and keeps results for profile_summary_ttl seconds
+        in summary_cache, so leaderboard and peer views don't issue one read
+        per row.
+        
+        Args:
+            user_ids: Iterable of user IDs (duplicates and None are ignored)
+            use_cache: False for full scans (e.g. reconciliation), which
+                       read every profile and would only churn the cache
+        
+        Returns:
+            Dictionary of user_id -> {'name', 'college'}, or None for users
+            without a profile document
+        """
+        unique_ids = list(dict.fromkeys(uid for uid in user_ids if uid))
+        summaries = {}
+        
+        if not self.firebase_enabled or not unique_ids:
+            return summaries
+        
+        cache_keys = {user_id: f"profile_summary:{user_id}" for user_id in unique_ids}
+        cached = self.summary_cache.get_many(list(cache_keys.values())) if use_cache else {}
+        
+        missing = []
+        for user_id in unique_ids:
+            entry = cached.get(cache_keys[user_id])
+            if entry is not None:
+                summaries[user_id] = entry['summary']
+            else:
+                missing.append(user_id)
+        
+        profiles = self.db.collection('profiles')
+        
+        for i in range(0, len(missing), GET_ALL_BATCH_SIZE):
+            chunk = missing[i:i + GET_ALL_BATCH_SIZE]
+            
+            try:
+                docs = self.db.get_all(
+                    [profiles.document(user_id) for user_id in chunk],
+                    field_paths=['personal_info.name', 'education.institution']
+                )
+                
+                fetched = {}
+                for doc in docs:
+                    if doc.exists:
+                        data = doc.to_dict()
+                        fetched[doc.id] = {
+                            'name': data.get('personal_info', {}).get('name'),
+                            'college': data.get('education', {}).get('institution')
+                        }
+            except Exception as e:
+                print(f"❌ Error resolving {len(chunk)} profiles: {e}")
+                continue
+            
+            for user_id in chunk:
+                summary = fetched.get(user_id)
+                if use_cache:
+                    # Wrapped so "no profile" is cached too
+                    self.summary_cache.set(cache_keys[user_id], {'summary': summary}, ttl=self.profile_summary_ttl)
+                summaries[user_id] = summary
+        
+        return summaries
+    
+    
     # ========================================================================
     # OPPORTUNITY OPERATIONS
     # ========================================================================
@@ -195,12 +339,397 @@ class FirebaseService:
             return {'opportunity_id': mock_id, **opportunity_data}
     
     
+    def upsert_opportunities(self, opportunities):
+        """
+        Upsert search results under their own 'opportunity_id' with batched writes
+        
+        Existing documents are read in bulk first (content_hash and
+        last_seen only) and skipped when their content hasn't changed; the
+        rest are written in WriteBatch chunks of up to WRITE_BATCH_SIZE.
+        
+        Args:
+            opportunities: List of opportunity dicts, each with 'opportunity_id'
+        
+        Returns:
+            Dictionary with 'created', 'updated' and 'unchanged' counts
+            (unchanged documents only get last_seen and expires_at bumped,
+            and only once last_seen is older than last_seen_refresh)
+        """
+        stats = {'created': 0, 'updated': 0, 'unchanged': 0}
+        
+        if not self.firebase_enabled or not opportunities:
+            return stats
+        
+        # Last occurrence wins if a search returned the same opportunity twice
+        by_id = {opp['opportunity_id']: opp for opp in opportunities}
+        ids = list(by_id)
+        
+        existing_hashes = {}
+        last_seen = {}
+        for i in range(0, len(ids), GET_ALL_BATCH_SIZE):
+            refs = [self.opportunities_collection.document(opp_id) for opp_id in ids[i:i + GET_ALL_BATCH_SIZE]]
+            for doc in self.db.get_all(refs, field_paths=['content_hash', 'last_seen']):
+                if doc.exists:
+                    data = doc.to_dict() or {}
+                    existing_hashes[doc.id] = data.get('content_hash')
+                    last_seen[doc.id] = data.get('last_seen')
+        
+        now = datetime.now().isoformat()
+        stale_before = (datetime.now() - timedelta(seconds=self.last_seen_refresh)).isoformat()
+        writes = []
+        changed_ids = []
+        for opp_id, opp in by_id.items():
+            content_hash = self._opportunity_content_hash(opp)
+            
+            # Seen again, so push the default TTL out (deadline-based expiry is unchanged)
+            expires_at = opp.get('expires_at') or opportunity_expires_at(opp.get('deadline'), self.opportunity_ttl_days)
+            
+            if opp_id in existing_hashes and existing_hashes[opp_id] == content_hash:
+                stats['unchanged'] += 1
+                if not last_seen.get(opp_id) or last_seen[opp_id] < stale_before:
+                    writes.append((opp_id, {'last_seen': now, 'expires_at': expires_at}))
+                continue
+            
+            data = {
+                **{field: opp.get(field) for field in OPPORTUNITY_CONTENT_FIELDS + OPPORTUNITY_SEARCH_FIELDS},
+                'canonical_url': opp.get('canonical_url') or canonicalize_url(opp.get('url')),
+                'content_hash': content_hash,
+                'last_seen': now,
+                'expires_at': expires_at,
+                'source_type': 'search',
+                'is_cached': True,
+                'cached_at': firestore.SERVER_TIMESTAMP
+            }
+            if opp_id in existing_hashes:
+                stats['updated'] += 1
+            else:
+                # First sighting; later searches only move last_seen
+                data['discovered_date'] = opp.get('discovered_date') or now
+                data['created_at'] = now
+                stats['created'] += 1
+            writes.append((opp_id, data))
+            changed_ids.append(opp_id)
+        
+        self._commit_in_batches(
+            [('set', self.opportunities_collection.document(opp_id), data) for opp_id, data in writes]
+        )
+        
+        if changed_ids:
+            self.cache.delete(*[f"opportunity:{opp_id}" for opp_id in changed_ids])
+        
+        print(f"✓ Upserted opportunities: {stats['created']} new, {stats['updated']} updated, {stats['unchanged']} unchanged")
+        return stats
+    
+    
+    def get_cached_opportunities(self, limit=20, opportunity_type=None):
+        """
+        Get recently cached opportunities (one entry per canonical URL)
+        
+        Newest documents are read by cached_at, which only needs the
+        single-field index; expired ones (expires_at passed, until the sweep
+        removes them) are dropped here rather than with a range filter,
+        which would force ordering by expires_at. A type filter uses the
+        (type, cached_at) index from firestore.indexes.json, or is applied
+        here too while that index doesn't exist.
+        
+        Args:
+            limit: Max number of results
+            opportunity_type: Filter by type
+        
+        Returns:
+            List of opportunities
+        """
+        if not self.firebase_enabled:
+            return []
+        
+        try:
+            newest = self.opportunities_collection.order_by('cached_at', direction=firestore.Query.DESCENDING)
+            fetch = limit * CACHED_OPPORTUNITIES_OVERFETCH
+            
+            docs = None
+            if opportunity_type and self._type_cached_index:
+                try:
+                    typed = newest.where(filter=firestore.FieldFilter('type', '==', opportunity_type))
+                    docs = list(typed.limit(fetch).stream())
+                except Exception as e:
+                    self._type_cached_index = False
+                    print(f"⚠️  No (type, cached_at) index, filtering cached opportunities by type in process: {e}")
+            if docs is None:
+                if opportunity_type:
+                    fetch *= CACHED_OPPORTUNITIES_OVERFETCH
+                docs = list(newest.limit(fetch).stream())
+            
+            now = datetime.now(timezone.utc)
+            opportunities = []
+            seen = set()
+            for doc in docs:
+                data = doc.to_dict()
+                if data.get('is_expired') or (data.get('expires_at') and data['expires_at'] <= now):
+                    continue
+                if opportunity_type and data.get('type') != opportunity_type:
+                    continue
+                # Guard against duplicates that predate compaction
+                key = data.get('canonical_url') or canonicalize_url(data.get('url') or data.get('link'))
+                if key in seen:
+                    continue
+                seen.add(key)
+                data['opportunity_id'] = doc.id
+                opportunities.append(data)
+                if len(opportunities) == limit:
+                    break
+            
+            return opportunities
+            
+        except Exception as e:
+            print(f"❌ Error getting cached opportunities: {e}")
+            return []
+    
+    
+    def compact_opportunities(self, dry_run=False):
+        """
+        Merge duplicate opportunity documents into one per canonical URL
+        
+        Each group is written under its canonical ID with the newest content,
+        the earliest discovered_date and the latest last_seen; reasoning
+        results pointing at the duplicates are re-pointed and the duplicates
+        deleted.
+        
+        Args:
+            dry_run: Only report what would change
+        
+        Returns:
+            Dictionary with counts of groups merged and documents removed
+        """
+        stats = {'scanned': 0, 'groups_merged': 0, 'documents_removed': 0, 'reasoning_repointed': 0}
+        
+        if not self.firebase_enabled:
+            return stats
+        
+        groups = {}
+        for doc in self.opportunities_collection.stream():
+            stats['scanned'] += 1
+            data = doc.to_dict()
+            url = data.get('url') or data.get('link')
+            if not url:
+                continue
+            groups.setdefault(opportunity_id_for_url(url), []).append((doc.id, data))
+        
+        operations = []
+        for target_id, docs in groups.items():
+            duplicate_ids = [doc_id for doc_id, _ in docs if doc_id != target_id]
+            if not duplicate_ids:
+                continue
+            
+            stats['groups_merged'] += 1
+            stats['documents_removed'] += len(duplicate_ids)
+            
+            def sort_key(item):
+                data = item[1]
+                return str(data.get('last_seen') or data.get('created_at') or data.get('discovered_date') or '')
+            
+            newest = max(docs, key=sort_key)[1]
+            discovered = [str(d.get('discovered_date') or d.get('created_at')) for _, d in docs
+                          if d.get('discovered_date') or d.get('created_at')]
+            last_seen = [str(d.get('last_seen')) for _, d in docs if d.get('last_seen')]
+            
+            merged = {
+                **newest,
+                'canonical_url': canonicalize_url(newest.get('url') or newest.get('link')),
+                'content_hash': self._opportunity_content_hash(newest),
+                'discovered_date': min(discovered) if discovered else datetime.now().isoformat(),
+                'last_seen': max(last_seen) if last_seen else datetime.now().isoformat()
+            }
+            merged.pop('opportunity_id', None)
+            
+            print(f"🔗 {target_id}: merging {len(docs)} documents ({merged.get('title', '')[:50]})")
+            
+            operations.append(('set', self.opportunities_collection.document(target_id), merged))
+            for doc_id in duplicate_ids:
+                operations.append(('delete', self.opportunities_collection.document(doc_id), None))
+            
+            for i in range(0, len(duplicate_ids), REASONING_IN_QUERY_SIZE):
+                chunk = duplicate_ids[i:i + REASONING_IN_QUERY_SIZE]
+                reasoning_docs = self.reasoning_collection \
+                    .where(filter=firestore.FieldFilter('opportunity_id', 'in', chunk)) \
+                    .stream()
+                for reasoning in reasoning_docs:
+                    stats['reasoning_repointed'] += 1
+                    operations.append(('update', reasoning.reference, {'opportunity_id': target_id}))
+        
+        if not dry_run:
+            self._commit_in_batches(operations)
+            self.cache.clear()
+        
+        print(f"{'🔍 Dry run: ' if dry_run else '✓ '}Compaction scanned {stats['scanned']} documents, "
+              f"merged {stats['groups_merged']} groups, removed {stats['documents_removed']} duplicates")
+        return stats
+    
+    
+    def mark_expired_opportunities(self, is_expired):
+        """
+        Flag cached opportunities whose deadline has passed
+        
+        Only documents whose expires_at is near are checked: a parsed
+        deadline puts expires_at two days after it, so every opportunity
+        with a passed deadline is in that window, and the rest of the
+        catalog is not read.
+        
+        Args:
+            is_expired: Callable (title, snippet) -> bool
+        
+        Returns:
+            List of opportunity IDs newly marked as expired
+        """
+        if not self.firebase_enabled:
+            return []
+        
+        horizon = datetime.now(timezone.utc) + timedelta(days=2)
+        query = self.opportunities_collection \
+            .where(filter=firestore.FieldFilter('expires_at', '<=', horizon)) \
+            .select(['title', 'snippet', 'is_expired'])
+        
+        expired_ids = []
+        operations = []
+        for doc in query.stream():
+            data = doc.to_dict()
+            if data.get('is_expired'):
+                continue
+            if is_expired(data.get('title') or '', data.get('snippet') or ''):
+                expired_ids.append(doc.id)
+                operations.append(('update', doc.reference, {
+                    'is_expired': True,
+                    'expired_at': firestore.SERVER_TIMESTAMP,
+                    'expires_at': firestore.SERVER_TIMESTAMP
+                }))
+        
+        self._commit_in_batches(operations)
+        for opportunity_id in expired_ids:
+            self.invalidate_opportunity(opportunity_id)
+        
+        return expired_ids
+    
+    
+    def sweep_expired_opportunities(self, archive=True):
+        """
+        Remove opportunities whose expires_at has passed
+        
+        Expired documents are read through the expires_at index in pages
+        and moved to 'opportunities_archive' (or deleted) in WriteBatch
+        chunks. Documents written before expires_at existed get one from
+        their stored deadline first (once).
+        
+        Args:
+            archive: Copy documents to opportunities_archive before deleting
+        
+        Returns:
+            List of removed opportunity IDs
+        """
+        if not self.firebase_enabled:
+            return []
+        
+        self._backfill_opportunity_expiry()
+        
+        # Archiving takes two writes per document
+        page_size = WRITE_BATCH_SIZE // 2 if archive else WRITE_BATCH_SIZE
+        archive_collection = self.db.collection('opportunities_archive')
+        removed = []
+        
+        while True:
+            expired = list(
+                self.opportunities_collection
+                .where(filter=firestore.FieldFilter('expires_at', '<=', datetime.now(timezone.utc)))
+                .limit(page_size)
+                .stream()
+            )
+            if not expired:
+                break
+            
+            operations = []
+            for doc in expired:
+                if archive:
+                    operations.append(('set', archive_collection.document(doc.id), {
+                        **doc.to_dict(),
+                        'archived_at': firestore.SERVER_TIMESTAMP
+                    }))
+                operations.append(('delete', doc.reference, None))
+            self._commit_in_batches(operations)
+            
+            removed.extend(doc.id for doc in expired)
+            if len(expired) < page_size:
+                break
+        
+        if removed:
+            self.cache.delete(*[f"opportunity:{opp_id}" for opp_id in removed])
+        
+        print(f"🧹 {'Archived' if archive else 'Deleted'} {len(removed)} expired opportunities")
+        return removed
+    
+    
+    def _backfill_opportunity_expiry(self):
+        """Set expires_at on documents cached before the field existed (runs once)"""
+        marker = self.db.collection('stats').document('opportunity_expiry')
+        if (marker.get().to_dict() or {}).get('backfilled'):
+            return 0
+        
+        now = datetime.now(timezone.utc)
+        operations = []
+        fields = ['deadline', 'expires_at', 'is_expired', 'last_seen']
+        for doc in self.opportunities_collection.select(fields).stream():
+            data = doc.to_dict()
+            if data.get('expires_at'):
+                continue
+            
+            if data.get('is_expired'):
+                expires_at = now
+            else:
+                try:
+                    last_seen = datetime.fromisoformat(str(data.get('last_seen'))).astimezone(timezone.utc)
+                except ValueError:
+                    last_seen = now
+                expires_at = opportunity_expires_at(data.get('deadline'), self.opportunity_ttl_days, now=last_seen)
+            operations.append(('update', doc.reference, {'expires_at': expires_at}))
+        
+        self._commit_in_batches(operations)
+        marker.set({'backfilled': True, 'backfilled_at': now.isoformat()}, merge=True)
+        
+        print(f"✓ Backfilled expires_at on {len(operations)} opportunities")
+        return len(operations)
+    
+    
+    def _opportunity_content_hash(self, opportunity):
+        content = {field: opportunity.get(field) for field in OPPORTUNITY_CONTENT_FIELDS}
+        return hashlib.md5(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest()
+    
+    
+    def _commit_in_batches(self, operations):
+        """Apply ('set' | 'update' | 'delete', ref, data) operations in WriteBatch chunks"""
+        for i in range(0, len(operations), WRITE_BATCH_SIZE):
+            batch = self.db.batch()
+            for op, ref, data in operations[i:i + WRITE_BATCH_SIZE]:
+                if op == 'set':
+                    batch.set(ref, data, merge=True)
+                elif op == 'update':
+                    batch.update(ref, data)
+                else:
+                    batch.delete(ref)
+            batch.commit()
+    
+    
     def get_opportunity(self, opportunity_id):
         """Get opportunity by ID"""
         if not self.firebase_enabled:
             print(f"⚠️  Firebase disabled - cannot retrieve opportunity {opportunity_id}")
             return None
         
+        return self.cache.get_or_load(
+            f"opportunity:{opportunity_id}",
+            lambda: self._fetch_opportunity(opportunity_id),
+            ttl=CACHE_TTLS['opportunity']
+        )
+    
+    
+    def _fetch_opportunity(self, opportunity_id):
+        """Read an opportunity from Firestore (cache miss path)"""
         try:
             doc_ref = self.opportunities_collection.document(opportunity_id)
             doc = doc_ref.get()
@@ -219,11 +748,16 @@ class FirebaseService:
             return None
     
     
+    def invalidate_opportunity(self, opportunity_id):
+        """Drop a cached opportunity after it was rewritten"""
+        self.cache.delete(f"opportunity:{opportunity_id}")
+    
+    
     # ========================================================================
     # REASONING RESULTS OPERATIONS
     # ========================================================================
     
-    def create_reasoning_result(self, profile_id, opportunity_id, analysis):
+    def create_reasoning_result(self, profile_id, opportunity_id, analysis, fingerprint=None):
         """Store reasoning result - ALWAYS returns result even if Firebase fails"""
         if not self.firebase_enabled:
             print("⚠️  Firebase disabled - returning analysis without saving")
@@ -241,8 +775,11 @@ class FirebaseService:
                 'analysis': analysis,
                 'analyzed_at': firestore.SERVER_TIMESTAMP
             }
+            if fingerprint:
+                reasoning['fingerprint'] = fingerprint
             
             doc_ref.set(reasoning)
+            self.cache.delete(f"reasoning:{profile_id}:{opportunity_id}")
             
             print(f"✓ Saved reasoning result {doc_ref.id}")
             return {
@@ -260,10 +797,27 @@ class FirebaseService:
     
     
     def get_cached_reasoning(self, profile_id, opportunity_id):
-        """Check if reasoning already exists"""
+        """
+        Check if reasoning already exists
+        
+        Provisional pre-screen verdicts are not kept in the read-through
+        cache, so every worker sees the Gemini analysis as soon as it
+        replaces them.
+        """
         if not self.firebase_enabled:
             return None
         
+        cache_key = f"reasoning:{profile_id}:{opportunity_id}"
+        result = self.cache.get(cache_key)
+        if result is None:
+            result = self._fetch_cached_reasoning(profile_id, opportunity_id)
+            if result is not None and not is_provisional_reasoning(result):
+                self.cache.set(cache_key, result, ttl=CACHE_TTLS['reasoning'])
+        return result
+    
+    
+    def _fetch_cached_reasoning(self, profile_id, opportunity_id):
+        """Query the latest stored reasoning for a pair (cache miss path)"""
         try:
             query = self.reasoning_collection \
                 .where(filter=firestore.FieldFilter('profile_id', '==', profile_id)) \
@@ -285,6 +839,158 @@ class FirebaseService:
             return None
     
     
+    def get_cached_reasonings(self, profile_id, opportunity_ids):
+        """
+        Bulk version of get_cached_reasoning for one profile
+        
+        Serves what it can from the cache, then resolves the rest with
+        'in' queries of up to REASONING_IN_QUERY_SIZE opportunities each.
+        
+        Returns:
+            Dictionary of opportunity_id -> latest reasoning (misses omitted)
+        """
+        unique_ids = list(dict.fromkeys(opp_id for opp_id in opportunity_ids if opp_id))
+        
+        if not self.firebase_enabled or not unique_ids:
+            return {}
+        
+        cache_keys = {opp_id: f"reasoning:{profile_id}:{opp_id}" for opp_id in unique_ids}
+        cached = self.cache.get_many(list(cache_keys.values()))
+        
+        results = {}
+        missing = []
+        for opp_id in unique_ids:
+            if cache_keys[opp_id] in cached:
+                results[opp_id] = cached[cache_keys[opp_id]]
+            else:
+                missing.append(opp_id)
+        
+        for i in range(0, len(missing), REASONING_IN_QUERY_SIZE):
+            chunk = missing[i:i + REASONING_IN_QUERY_SIZE]
+            
+            try:
+                docs = self.reasoning_collection \
+                    .where(filter=firestore.FieldFilter('profile_id', '==', profile_id)) \
+                    .where(filter=firestore.FieldFilter('opportunity_id', 'in', chunk)) \
+                    .stream()
+                
+                # Keep the newest result per opportunity
+                latest = {}
+                for doc in docs:
+                    data = doc.to_dict()
+                    data['reasoning_id'] = doc.id
+                    opp_id = data.get('opportunity_id')
+                    current = latest.get(opp_id)
+                    if current is None or (data.get('analyzed_at') and
+                                           (current.get('analyzed_at') is None or
+                                            data['analyzed_at'] > current['analyzed_at'])):
+                        latest[opp_id] = data
+            except Exception as e:
+                print(f"❌ Error getting cached reasoning for {len(chunk)} opportunities: {e}")
+                continue
+            
+            for opp_id, data in latest.items():
+                if not is_provisional_reasoning(data):
+                    self.cache.set(cache_keys[opp_id], data, ttl=CACHE_TTLS['reasoning'])
+                results[opp_id] = data
+        
+        return results
+    
+    
+    def get_reasoning_result(self, reasoning_id):
+        """Get a stored reasoning result by ID"""
+        if not self.firebase_enabled:
+            return None
+        
+        try:
+            doc = self.reasoning_collection.document(reasoning_id).get()
+            if not doc.exists:
+                return None
+            data = doc.to_dict()
+            data['reasoning_id'] = doc.id
+            return data
+        except Exception as e:
+            print(f"❌ Error getting reasoning result {reasoning_id}: {e}")
+            return None
+    
+    
+    def get_reasoning_by_fingerprint(self, fingerprint):
+        """
+        Look up an analysis by the fingerprint of its prompt inputs
+        
+        Identical profile and opportunity content (e.g. a re-uploaded resume
+        that got a new profile_id) resolve to the same fingerprint, so the
+        analysis is reused instead of asking Gemini again.
+        
+        Returns:
+            Analysis dictionary, or None on a miss
+        """
+        if not self.firebase_enabled:
+            return None
+        
+        return self.cache.get_or_load(
+            f"reasoning_fingerprint:{fingerprint}",
+            lambda: self._fetch_reasoning_by_fingerprint(fingerprint),
+            ttl=CACHE_TTLS['reasoning_fingerprint']
+        )
+    
+    
+    def _fetch_reasoning_by_fingerprint(self, fingerprint):
+        try:
+            doc = self.reasoning_cache_collection.document(fingerprint).get()
+            if doc.exists:
+                return doc.to_dict().get('analysis')
+            return None
+        except Exception as e:
+            print(f"❌ Error getting reasoning for fingerprint {fingerprint[:12]}: {e}")
+            return None
+    
+    
+    def store_reasoning_fingerprint(self, fingerprint, analysis):
+        """Remember an analysis under the fingerprint of its prompt inputs"""
+        self.cache.set(f"reasoning_fingerprint:{fingerprint}", analysis, ttl=CACHE_TTLS['reasoning_fingerprint'])
+        
+        if not self.firebase_enabled:
+            return
+        
+        try:
+            self.reasoning_cache_collection.document(fingerprint).set({
+                'analysis': analysis,
+                'created_at': firestore.SERVER_TIMESTAMP
+            })
+        except Exception as e:
+            print(f"❌ Error saving reasoning for fingerprint {fingerprint[:12]}: {e}")
+    
+    
+    # ========================================================================
+    # GAMIFICATION OPERATIONS
+    # ========================================================================
+    
+    def get_gamification(self, user_id):
+        """
+        Get a user's gamification document (read-through cached)
+        
+        Use for read-only views; read-modify-write paths should read the
+        document directly and call invalidate_gamification() after writing.
+        
+        Returns:
+            Gamification dictionary or None if the user has none yet
+        """
+        if not self.firebase_enabled:
+            return None
+        
+        def load():
+            doc = self.db.collection('gamification').document(user_id).get()
+            return doc.to_dict() if doc.exists else None
+        
+        return self.cache.get_or_load(f"gamification:{user_id}", load, ttl=CACHE_TTLS['gamification'])
+    
+    
+    def invalidate_gamification(self, user_id):
+        """Drop a cached gamification document after it was written"""
+        self.cache.delete(f"gamification:{user_id}")
+    
+    
     # ========================================================================
     # APPLICATION TRACKER OPERATIONS
     # ========================================================================
@@ -309,6 +1015,7 @@ class FirebaseService:
             })
             
             application_ref.set(app_data_to_save)
+            self.cache.delete(f"applications:{user_id}")
             print(f"✓ Created application {application_ref.id}")
             
             # Return JSON-serializable data (replace SERVER_TIMESTAMP with current time)
@@ -336,6 +1043,15 @@ class FirebaseService:
             print("⚠️  Firebase disabled - cannot retrieve applications")
             return []
         
+        return self.cache.get_or_load(
+            f"applications:{user_id}",
+            lambda: self._fetch_user_applications(user_id),
+            ttl=CACHE_TTLS['applications']
+        )
+    
+    
+    def _fetch_user_applications(self, user_id):
+        """Query all applications for a user (cache miss path)"""
         try:
             applications = []
             docs = self.db.collection('applications')\
@@ -400,9 +1116,15 @@ class FirebaseService:
             if notes:
                 update_data['notes'] = notes
                 
-            self.db.collection('applications').document(application_id).update(update_data)
+            application_ref = self.db.collection('applications').document(application_id)
+            application_ref.update(update_data)
             print(f"✓ Updated application {application_id} status to {status}")
             
+            # Invalidate the owner's cached application list
+            owner = application_ref.get(field_paths=['user_id']).to_dict() or {}
+            if owner.get('user_id'):
+                self.cache.delete(f"applications:{owner['user_id']}")
+            
             # Return JSON-safe response
             return {
                 'success': True, 
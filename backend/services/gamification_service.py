@@ -3,14 +3,18 @@ Gamification Service - Points, badges, levels, achievements, and tasks
 """
 
 from datetime import datetime, timedelta
+import os
 import random
+from .leaderboard_index import LeaderboardIndex
+from .peer_stats_service import PeerStatsService
 
 
 class GamificationService:
-    def __init__(self, firebase_service):
+    def __init__(self, firebase_service, peer_stats=None):
         """Initialize gamification service"""
         self.firebase = firebase_service
         self.db = firebase_service.db
+        self.peer_stats = peer_stats or PeerStatsService(firebase_service)
         
         # Points system - Enhanced with eligibility scoring
         self.POINT_VALUES = {
@@ -79,15 +83,25 @@ class GamificationService:
                 {'id': 'weekly_explorer', 'title': 'Diverse Explorer', 'description': 'Explore 3 different categories', 'points': 60, 'target': 3, 'type': 'categories_explored'}
             ]
         }
+        
+        # Materialized rank index so leaderboard reads don't scan the collection
+        self.leaderboard = LeaderboardIndex(
+            max_age_seconds=int(os.getenv('LEADERBOARD_INDEX_TTL', 300))
+        )
+        if self.db is not None:
+            try:
+                self.leaderboard.rebuild(self.db)
+            except Exception as e:
+                print(f"⚠️  Could not build leaderboard index: {e}")
     
     def get_user_gamification(self, user_id):
         """Get complete gamification profile for user"""
         try:
             # Get or create gamification document
             gami_ref = self.db.collection('gamification').document(user_id)
-            gami_doc = gami_ref.get()
+            data = self.firebase.get_gamification(user_id)
             
-            if not gami_doc.exists:
+            if data is None:
                 # Initialize new user
                 initial_data = {
                     'user_id': user_id,
@@ -112,10 +126,11 @@ class GamificationService:
                     'created_at': datetime.now().isoformat()
                 }
                 gami_ref.set(initial_data)
+                self.firebase.invalidate_gamification(user_id)
+                self.leaderboard.upsert(user_id, 0, achievements_count=0, login_streak=0)
+                self.peer_stats.record_user_created(user_id)
                 return self._calculate_gamification_status(initial_data, user_id)
             
-            data = gami_doc.to_dict()
-            
             # Reset tasks if needed
             self._check_and_reset_tasks(gami_ref, data)
             
@@ -196,6 +211,22 @@ class GamificationService:
                 update_data['tasks_completed'] = data.get('tasks_completed', 0)
             
             gami_ref.update(update_data)
+            self.firebase.invalidate_gamification(user_id)
+            self.leaderboard.upsert(
+                user_id,
+                new_points,
+                achievements_count=len(update_data['achievements']),
+                login_streak=data.get('login_streak', 0)
+            )
+            self.peer_stats.record_user_change(
+                user_id,
+                {
+                    'points': old_points,
+                    'streak': data.get('login_streak', 0),
+                    'achievements': len(data.get('achievements', []))
+                },
+                {'points': new_points, 'achievements': len(update_data['achievements'])}
+            )
             
             return {
                 'success': True,
@@ -239,11 +270,23 @@ class GamificationService:
                 new_streak = 1
                 bonus_points = self.POINT_VALUES['daily_login']
             
+            new_total = data['total_points'] + bonus_points
             gami_ref.update({
                 'last_login': now.isoformat(),
                 'login_streak': new_streak,
-                'total_points': data['total_points'] + bonus_points
+                'total_points': new_total
             })
+            self.firebase.invalidate_gamification(user_id)
+            self.leaderboard.upsert(user_id, new_total, login_streak=new_streak)
+            self.peer_stats.record_user_change(
+                user_id,
+                {
+                    'points': data['total_points'],
+                    'streak': data.get('login_streak', 0),
+                    'achievements': len(data.get('achievements', []))
+                },
+                {'points': new_total, 'streak': new_streak}
+            )
             
             return {
                 'success': True,
@@ -258,36 +301,15 @@ class GamificationService:
     def get_leaderboard(self, limit=50):
         """Get top users by points"""
         try:
-            users = self.db.collection('gamification')\
-                .order_by('total_points', direction='DESCENDING')\
-                .limit(limit)\
-                .stream()
+            self.leaderboard.ensure_fresh(self.db)
+            
+            rows = self.leaderboard.top(limit)
+            profiles = self.firebase.get_profile_summaries(user_id for _, user_id, _ in rows)
             
             leaderboard = []
-            for rank, doc in enumerate(users, 1):
-                data = doc.to_dict()
-                user_id = data['user_id']
-                
-                # Get user profile name
-                try:
-                    profile = self.db.collection('profiles').document(user_id).get()
-                    name = profile.to_dict().get('personal_info', {}).get('name', 'Anonymous User')
-                except:
-                    name = 'Anonymous User'
-                
-                level_info = self._get_level_from_points(data['total_points'])
-                
-                leaderboard.append({
-                    'rank': rank,
-                    'user_id': user_id,
-                    'name': name,
-                    'points': data['total_points'],
-                    'level': level_info['level'],
-                    'level_name': level_info['name'],
-                    'level_icon': level_info['icon'],
-                    'achievements_count': len(data.get('achievements', [])),
-                    'login_streak': data.get('login_streak', 0)
-                })
+            for rank, user_id, entry in rows:
+                name = (profiles.get(user_id) or {}).get('name') or 'Anonymous User'
+                leaderboard.append(self._build_leaderboard_entry(rank, user_id, name, entry))
             
             return leaderboard
             
@@ -298,64 +320,51 @@ class GamificationService:
     def get_leaderboard_with_user(self, top_limit=10, user_id=None):
         """Get top N users + current user if not in top N"""
         try:
-            # Get all users sorted by points to calculate accurate ranks
-            all_users = self.db.collection('gamification')\
-                .order_by('total_points', direction='DESCENDING')\
-                .stream()
+            # Ranks come from the materialized index instead of a full collection scan
+            self.leaderboard.ensure_fresh(self.db)
             
-            leaderboard = []
-            user_entry = None
-            user_rank = None
-            
-            for rank, doc in enumerate(all_users, 1):
-                data = doc.to_dict()
-                current_user_id = data['user_id']
-                
-                # Get user profile name
-                try:
-                    profile = self.db.collection('profiles').document(current_user_id).get()
-                    name = profile.to_dict().get('personal_info', {}).get('name', 'Anonymous User')
-                except:
-                    name = 'Anonymous User'
-                
-                level_info = self._get_level_from_points(data['total_points'])
-                
-                entry = {
-                    'rank': rank,
-                    'user_id': current_user_id,
-                    'name': name,
-                    'points': data['total_points'],
-                    'level': level_info['level'],
-                    'level_name': level_info['name'],
-                    'level_icon': level_info['icon'],
-                    'achievements_count': len(data.get('achievements', [])),
-                    'login_streak': data.get('login_streak', 0)
-                }
-                
-                # Add to top N
-                if rank <= top_limit:
-                    leaderboard.append(entry)
-                
-                # Track current user's position
-                if user_id and current_user_id == user_id:
-                    user_entry = entry
-                    user_rank = rank
+            rows = self.leaderboard.top(top_limit)
+            user_rank = self.leaderboard.rank_of(user_id) if user_id else None
             
             # If user is not in top N, add them at the end
-            if user_id and user_rank and user_rank > top_limit and user_entry:
-                leaderboard.append(user_entry)
+            if user_rank and user_rank > top_limit:
+                rows.append((user_rank, user_id, self.leaderboard.get(user_id)))
+            
+            # Resolve all display names in one batched read
+            profiles = self.firebase.get_profile_summaries(uid for _, uid, _ in rows)
+            
+            leaderboard = []
+            for rank, current_user_id, entry in rows:
+                name = (profiles.get(current_user_id) or {}).get('name') or 'Anonymous User'
+                leaderboard.append(self._build_leaderboard_entry(rank, current_user_id, name, entry))
             
             return {
                 'leaderboard': leaderboard,
                 'user_rank': user_rank,
-                'total_users': rank if 'rank' in locals() else 0,
-                'show_separator': user_rank and user_rank > top_limit
+                'total_users': len(self.leaderboard),
+                'show_separator': bool(user_rank and user_rank > top_limit)
             }
             
         except Exception as e:
             print(f"Error getting leaderboard with user: {e}")
             return {'leaderboard': [], 'user_rank': None, 'total_users': 0, 'show_separator': False}
     
+    def _build_leaderboard_entry(self, rank, user_id, name, entry):
+        """Format an indexed user as a leaderboard row"""
+        level_info = self._get_level_from_points(entry['points'])
+        
+        return {
+            'rank': rank,
+            'user_id': user_id,
+            'name': name,
+            'points': entry['points'],
+            'level': level_info['level'],
+            'level_name': level_info['name'],
+            'level_icon': level_info['icon'],
+            'achievements_count': entry['achievements_count'],
+            'login_streak': entry['login_streak']
+        }
+    
     def _calculate_gamification_status(self, data, user_id):
         """Calculate current level, progress, achievements, and tasks"""
         points = data['total_points']
@@ -481,11 +490,13 @@ class GamificationService:
                 'daily_tasks': {},
                 'last_task_reset': now.isoformat()
             })
+            self.firebase.invalidate_gamification(gami_ref.id)
         
         # Reset weekly tasks on Monday
         if now.isocalendar()[1] != last_reset.isocalendar()[1]:
             data['weekly_tasks'] = {}
             gami_ref.update({'weekly_tasks': {}})
+            self.firebase.invalidate_gamification(gami_ref.id)
     
     def _check_and_update_tasks(self, data, action, metadata):
         """Check if action completes any tasks"""
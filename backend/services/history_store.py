@@ -0,0 +1,243 @@
+"""
+History Store - Bounded chatbot conversation history
+
+Backends:
+- memory: in-process, LRU over users (default, per gunicorn worker)
+- sqlite: a local SQLite file shared by all workers on the host
+- redis:  any Redis-compatible server, set CHAT_HISTORY_BACKEND=redis and REDIS_URL
+
+Every backend keeps at most max_messages per user and forgets users that
+have been idle for longer than idle_ttl seconds.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class BaseHistoryStore:
+    """Common interface; messages are {'role': 'user'|'assistant', 'content': str}"""
+
+    backend = 'base'
+
+    def __init__(self, max_messages=20, idle_ttl=86400):
+        self.max_messages = max_messages
+        self.idle_ttl = idle_ttl
+
+    def get(self, user_id, limit=None):
+        """Get a user's most recent messages, oldest first"""
+        raise NotImplementedError
+
+    def append(self, user_id, *messages):
+        """Append messages, dropping the oldest beyond max_messages"""
+        raise NotImplementedError
+
+    def clear(self, user_id):
+        raise NotImplementedError
+
+    def info(self):
+        return {'backend': self.backend, 'max_messages': self.max_messages, 'idle_ttl': self.idle_ttl}
+
+
+class MemoryHistoryStore(BaseHistoryStore):
+    """In-process history with LRU eviction over users"""
+
+    backend = 'memory'
+
+    def __init__(self, max_users=10000, max_messages=20, idle_ttl=86400):
+        super().__init__(max_messages, idle_ttl)
+        self.max_users = max_users
+        self._users = OrderedDict()  # user_id -> (last_active, [messages])
+        self._lock = threading.Lock()
+
+    def get(self, user_id, limit=None):
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is None:
+                return []
+            last_active, messages = entry
+            if time.monotonic() - last_active > self.idle_ttl:
+                del self._users[user_id]
+                return []
+            messages = list(messages)
+        return messages[-limit:] if limit else messages
+
+    def append(self, user_id, *messages):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._users.pop(user_id, None)
+            history = entry[1] if entry and now - entry[0] <= self.idle_ttl else []
+            history.extend(dict(m) for m in messages)
+            del history[:-self.max_messages]
+            self._users[user_id] = (now, history)
+
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+
+    def clear(self, user_id):
+        with self._lock:
+            self._users.pop(user_id, None)
+
+    def info(self):
+        with self._lock:
+            users = len(self._users)
+        return {**super().info(), 'users': users, 'max_users': self.max_users}
+
+
+class SQLiteHistoryStore(BaseHistoryStore):
+    """History in a SQLite file, shared by every worker on the host"""
+
+    backend = 'sqlite'
+
+    # Purge idle users at most this often (seconds)
+    PURGE_INTERVAL = 300
+
+    def __init__(self, path, max_messages=20, idle_ttl=86400):
+        super().__init__(max_messages, idle_ttl)
+        self.path = path
+        self._local = threading.local()
+        self._last_purge = 0
+
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS chat_history (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id TEXT NOT NULL,
+                    role TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_chat_history_user ON chat_history (user_id, id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_chat_history_created ON chat_history (created_at)")
+
+    def _connect(self):
+        # One connection per thread; WAL lets workers read while another writes
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, user_id, limit=None):
+        cutoff = time.time() - self.idle_ttl
+        conn = self._connect()
+        rows = conn.execute(
+            "SELECT role, content, created_at FROM chat_history "
+            "WHERE user_id = ? ORDER BY id DESC LIMIT ?",
+            (user_id, limit or self.max_messages)
+        ).fetchall()
+
+        # The whole conversation expires once its latest message is too old
+        if not rows or rows[0][2] < cutoff:
+            return []
+        return [{'role': role, 'content': content} for role, content, _ in reversed(rows)]
+
+    def append(self, user_id, *messages):
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO chat_history (user_id, role, content, created_at) VALUES (?, ?, ?, ?)",
+                [(user_id, m['role'], m['content'], now) for m in messages]
+            )
+            conn.execute(
+                "DELETE FROM chat_history WHERE user_id = ? AND id NOT IN "
+                "(SELECT id FROM chat_history WHERE user_id = ? ORDER BY id DESC LIMIT ?)",
+                (user_id, user_id, self.max_messages)
+            )
+        self._purge_idle(now)
+
+    def clear(self, user_id):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM chat_history WHERE user_id = ?", (user_id,))
+
+    def _purge_idle(self, now):
+        if now - self._last_purge < self.PURGE_INTERVAL:
+            return
+        self._last_purge = now
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM chat_history WHERE user_id IN "
+                "(SELECT user_id FROM chat_history GROUP BY user_id HAVING MAX(created_at) < ?)",
+                (now - self.idle_ttl,)
+            )
+
+    def info(self):
+        users = self._connect().execute("SELECT COUNT(DISTINCT user_id) FROM chat_history").fetchone()[0]
+        return {**super().info(), 'users': users, 'path': self.path}
+
+
+class RedisHistoryStore(BaseHistoryStore):
+    """History as one capped Redis list per user, expiring after idle_ttl"""
+
+    backend = 'redis'
+
+    def __init__(self, url, namespace='orbit:chat', max_messages=20, idle_ttl=86400):
+        super().__init__(max_messages, idle_ttl)
+        try:
+            import redis
+        except ImportError:
+            raise ImportError("CHAT_HISTORY_BACKEND=redis requires the 'redis' package (pip install redis)")
+
+        self.client = redis.Redis.from_url(url)
+        self.client.ping()
+        self.namespace = namespace
+
+    def _key(self, user_id):
+        return f"{self.namespace}:{user_id}"
+
+    def get(self, user_id, limit=None):
+        start = -(limit or self.max_messages)
+        return [json.loads(raw) for raw in self.client.lrange(self._key(user_id), start, -1)]
+
+    def append(self, user_id, *messages):
+        key = self._key(user_id)
+        pipe = self.client.pipeline()
+        pipe.rpush(key, *[json.dumps(m) for m in messages])
+        pipe.ltrim(key, -self.max_messages, -1)
+        pipe.expire(key, int(self.idle_ttl))
+        pipe.execute()
+
+    def clear(self, user_id):
+        self.client.delete(self._key(user_id))
+
+
+def create_history_store():
+    """
+    Build the history store selected by CHAT_HISTORY_BACKEND (memory | sqlite | redis)
+
+    Falls back to the in-process store if the configured backend can't be created.
+    """
+    backend = os.getenv('CHAT_HISTORY_BACKEND', 'memory').lower()
+    max_messages = int(os.getenv('CHAT_HISTORY_MAX_MESSAGES', 20))
+    idle_ttl = int(os.getenv('CHAT_HISTORY_TTL', 86400))
+
+    try:
+        if backend == 'sqlite':
+            store = SQLiteHistoryStore(
+                os.getenv('CHAT_HISTORY_DB', 'chat_history.db'),
+                max_messages=max_messages,
+                idle_ttl=idle_ttl
+            )
+            print(f"✓ Using SQLite chat history at {store.path}")
+            return store
+        if backend == 'redis':
+            store = RedisHistoryStore(
+                os.getenv('REDIS_URL', 'redis://localhost:6379/0'),
+                max_messages=max_messages,
+                idle_ttl=idle_ttl
+            )
+            print("✓ Using Redis chat history")
+            return store
+    except Exception as e:
+        print(f"⚠️  Chat history backend '{backend}' unavailable ({e}), falling back to in-process store")
+
+    return MemoryHistoryStore(
+        max_users=int(os.getenv('CHAT_HISTORY_MAX_USERS', 10000)),
+        max_messages=max_messages,
+        idle_ttl=idle_ttl
+    )
@@ -0,0 +1,125 @@
+"""
+Keyword Matcher - Relevance, type and eligibility scoring for a page of results
+
+Relevance scoring, type inference and eligibility extraction all look
+for fixed keyword lists inside each result. score_page() does all three
+in one pass per result: each field is lowercased once, the keyword
+tables are built once at import, and eligibility sentences are found
+with one precompiled alternation regex instead of a substring check per
+keyword per sentence.
+
+Semantics match the original per-item checks exactly: a keyword counts
+wherever it appears as a substring.
+"""
+
+import re
+from collections import namedtuple
+
+
+# High-value keywords boost score (+5 in title, +3 in snippet)
+HIGH_VALUE_KEYWORDS = ['apply', 'deadline', 'eligibility', 'register', 'prize', 'stipend', '2026']
+
+# Trusted domains get boost (+15, once)
+TRUSTED_DOMAINS = ['devpost.com', 'devfolio.co', 'unstop.com', 'internshala.com',
+                   'scholars4dev.com', 'opportunitydesk.org', 'linkedin.com']
+
+# Penalty for irrelevant indicators in the link (-20 each)
+SPAM_INDICATORS = ['login', 'signin', 'profile', 'settings', 'terms', 'privacy']
+
+# Type keywords, first matching type wins
+TYPE_KEYWORDS = {
+    'hackathon': ['hackathon', 'hack'],
+    'internship': ['internship', 'intern', 'summer training'],
+    'fellowship': ['fellowship', 'scholar', 'grant'],
+    'scholarship': ['scholarship', 'financial aid'],
+    'competition': ['competition', 'contest', 'challenge'],
+    'program': ['program', 'workshop', 'bootcamp']
+}
+
+# Sentences mentioning any of these make up the eligibility text
+ELIGIBILITY_KEYWORDS = [
+    'eligible', 'eligibility', 'open to', 'for students',
+    'requirements', 'must be', 'should be', 'criteria'
+]
+
+BASE_SCORE = 50
+
+_TYPE_KEYWORDS = [(opp_type, tuple(keywords)) for opp_type, keywords in TYPE_KEYWORDS.items()]
+_ELIGIBILITY_RE = re.compile('|'.join(re.escape(keyword) for keyword in ELIGIBILITY_KEYWORDS))
+
+
+KeywordMatch = namedtuple('KeywordMatch', ['relevance_score', 'type', 'eligibility_text', 'flags'])
+
+
+def score_page(items):
+    """
+    Score a page of raw search result items
+
+    Args:
+        items: Google Custom Search result items (title, snippet, link)
+
+    Returns:
+        List of KeywordMatch(relevance_score, type, eligibility_text, flags),
+        one per item in order; flags holds 'trusted_domain',
+        'spam_indicators' and 'has_eligibility'
+    """
+    return [score_item(item) for item in items]
+
+
+def score_item(item):
+    # Missing title/snippet fall back to these defaults, which contain
+    # no keywords, so relevance is the same as scoring '' for them
+    title = item.get('title', 'No title')
+    snippet = item.get('snippet', 'No description')
+    title_lower = title.lower()
+    snippet_lower = snippet.lower()
+    link = item.get('link', '').lower()
+
+    score = BASE_SCORE
+    for keyword in HIGH_VALUE_KEYWORDS:
+        if keyword in title_lower:
+            score += 5
+        if keyword in snippet_lower:
+            score += 3
+
+    trusted = False
+    for domain in TRUSTED_DOMAINS:
+        if domain in link:
+            trusted = True
+            score += 15
+            break
+
+    spam = []
+    for indicator in SPAM_INDICATORS:
+        if indicator in link:
+            spam.append(indicator)
+            score -= 20
+
+    # Type keywords may span the title/snippet boundary
+    text = f"{title_lower} {snippet_lower}"
+    opp_type = 'opportunity'
+    for candidate, keywords in _TYPE_KEYWORDS:
+        for keyword in keywords:
+            if keyword in text:
+                opp_type = candidate
+                break
+        if opp_type != 'opportunity':
+            break
+
+    eligibility = []
+    if _ELIGIBILITY_RE.search(snippet_lower):
+        # '.' is unaffected by lower(), so both splits line up
+        for sentence, sentence_lower in zip(snippet.split('.'), snippet_lower.split('.')):
+            if _ELIGIBILITY_RE.search(sentence_lower):
+                eligibility.append(sentence.strip())
+
+    return KeywordMatch(
+        relevance_score=max(0, min(100, score)),
+        type=opp_type,
+        eligibility_text=' '.join(eligibility) if eligibility else snippet,
+        flags={
+            'trusted_domain': trusted,
+            'spam_indicators': spam,
+            'has_eligibility': bool(eligibility)
+        }
+    )
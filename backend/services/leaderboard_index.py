@@ -0,0 +1,155 @@
+"""
+Leaderboard Index - In-process rank index over gamification points
+"""
+
+import threading
+import time
+
+from sortedcontainers import SortedList
+
+
+class LeaderboardIndex:
+    """
+    Materialized leaderboard kept in a sorted list of (-points, user_id) keys.
+
+    Answers top-N, rank-of-user and total user count in O(log n) without
+    streaming the gamification collection on every request. The index is
+    rebuilt from Firestore on startup (and again once it is older than
+    max_age_seconds, so other gunicorn workers' writes are picked up) and
+    updated incrementally by GamificationService whenever points change.
+    """
+
+    def __init__(self, max_age_seconds=300):
+        self.max_age_seconds = max_age_seconds
+        self._order = SortedList()
+        self._entries = {}
+        self._lock = threading.RLock()
+        self._rebuild_lock = threading.Lock()
+        self._built_at = None
+
+    # ========================================================================
+    # BUILD
+    # ========================================================================
+
+    def rebuild(self, db):
+        """
+        Rebuild the index from the gamification collection (one full scan)
+
+        Args:
+            db: Firestore client
+
+        Returns:
+            Number of users indexed
+        """
+        docs = db.collection('gamification')\
+            .select(['user_id', 'total_points', 'achievements', 'login_streak'])\
+            .stream()
+
+        order = SortedList()
+        entries = {}
+        for doc in docs:
+            data = doc.to_dict()
+            user_id = data.get('user_id', doc.id)
+            entry = {
+                'points': data.get('total_points', 0),
+                'achievements_count': len(data.get('achievements', [])),
+                'login_streak': data.get('login_streak', 0)
+            }
+            entries[user_id] = entry
+            order.add((-entry['points'], user_id))
+
+        with self._lock:
+            self._order = order
+            self._entries = entries
+            self._built_at = time.monotonic()
+
+        print(f"✓ Leaderboard index built with {len(entries)} users")
+        return len(entries)
+
+    def ensure_fresh(self, db):
+        """Rebuild the index if it was never built or is older than max_age_seconds"""
+        if not self.is_stale():
+            return
+
+        # Only one thread rebuilds; others keep serving the current snapshot
+        if not self._rebuild_lock.acquire(blocking=self._built_at is None):
+            return
+        try:
+            if self.is_stale():
+                self.rebuild(db)
+        finally:
+            self._rebuild_lock.release()
+
+    def is_stale(self):
+        if self._built_at is None:
+            return True
+        if not self.max_age_seconds:
+            return False
+        return time.monotonic() - self._built_at > self.max_age_seconds
+
+    # ========================================================================
+    # INCREMENTAL UPDATES
+    # ========================================================================
+
+    def upsert(self, user_id, points, achievements_count=None, login_streak=None):
+        """
+        Insert or move a user in the index
+
+        Fields passed as None keep their previously indexed value.
+        """
+        with self._lock:
+            previous = self._entries.get(user_id)
+            if previous:
+                self._order.discard((-previous['points'], user_id))
+                entry = dict(previous)
+            else:
+                entry = {'points': 0, 'achievements_count': 0, 'login_streak': 0}
+
+            entry['points'] = points
+            if achievements_count is not None:
+                entry['achievements_count'] = achievements_count
+            if login_streak is not None:
+                entry['login_streak'] = login_streak
+
+            self._entries[user_id] = entry
+            self._order.add((-points, user_id))
+
+    def remove(self, user_id):
+        with self._lock:
+            previous = self._entries.pop(user_id, None)
+            if previous:
+                self._order.discard((-previous['points'], user_id))
+
+    # ========================================================================
+    # QUERIES
+    # ========================================================================
+
+    def top(self, limit):
+        """
+        Get the top N users
+
+        Returns:
+            List of (rank, user_id, entry) tuples, best first
+        """
+        with self._lock:
+            return [
+                (rank, user_id, dict(self._entries[user_id]))
+                for rank, (_, user_id) in enumerate(self._order[:max(0, limit)], 1)
+            ]
+
+    def rank_of(self, user_id):
+        """Get 1-based rank of a user, or None if not indexed"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            return self._order.index((-entry['points'], user_id)) + 1
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            return dict(entry) if entry else None
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
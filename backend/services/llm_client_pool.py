@@ -0,0 +1,259 @@
+"""
+LLM Client Pool - Shared, per-key rate-limited Gemini clients
+
+Every service that talks to Gemini goes through one pool instead of calling
+the process-global genai.configure(), so rotating keys in one service can
+no longer change the key another service (or thread) is using.
+"""
+
+import os
+import threading
+import time
+
+import google.generativeai as genai
+import google.ai.generativelanguage as glm
+from google.api_core import exceptions as google_exceptions
+
+
+DEFAULT_MODEL = 'gemini-2.5-flash'
+
+# GEMINI_API_KEY, GEMINI_API_KEY_2 ... GEMINI_API_KEY_9
+MAX_GEMINI_KEYS = 9
+
+
+class GeminiQuotaError(Exception):
+    """Raised when every configured key is rate limited or cooling down"""
+
+
+def load_gemini_keys():
+    """Read GEMINI_API_KEY and GEMINI_API_KEY_2..9 from the environment"""
+    names = ['GEMINI_API_KEY'] + [f'GEMINI_API_KEY_{i}' for i in range(2, MAX_GEMINI_KEYS + 1)]
+    return [os.getenv(name) for name in names if os.getenv(name)]
+
+
+def is_quota_error(error):
+    """True for 429 / quota exhausted responses from the Gemini API"""
+    if isinstance(error, (google_exceptions.ResourceExhausted, google_exceptions.TooManyRequests)):
+        return True
+    text = str(error).lower()
+    return '429' in text or 'quota' in text or 'resource exhausted' in text
+
+
+def _model_for_key(model_name, api_key):
+    """
+    GenerativeModel bound to one API key
+
+    google-generativeai 0.3.2 (pinned in requirements.txt) has no public way
+    to give a model its own key: GenerativeModel uses the client from the last
+    genai.configure() call unless its private _client is set. This is the only
+    place that relies on that; recheck it when upgrading the SDK.
+    """
+    model = genai.GenerativeModel(model_name)
+    model._client = glm.GenerativeServiceClient(client_options={'api_key': api_key})
+    return model
+
+
+class _KeySlot:
+    """One API key: its own client, a token bucket and usage counters"""
+
+    def __init__(self, index, api_key, model_name, requests_per_minute):
+        self.index = index
+        self.model = _model_for_key(model_name, api_key)
+
+        self.capacity = float(requests_per_minute)
+        self.refill_per_second = requests_per_minute / 60.0
+        self.tokens = self.capacity
+        self.refilled_at = time.monotonic()
+        self.cooldown_until = 0.0
+
+        self.in_flight = 0
+        self.requests = 0
+        self.successes = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.latency_total = 0.0
+
+    def refill(self, now):
+        elapsed = now - self.refilled_at
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_per_second)
+        self.refilled_at = now
+
+    def seconds_until_ready(self, now):
+        """Seconds until this key can take another request"""
+        wait = max(0.0, self.cooldown_until - now)
+        if self.tokens < 1:
+            wait = max(wait, (1 - self.tokens) / self.refill_per_second)
+        return wait
+
+    def info(self, now):
+        return {
+            'key': f"#{self.index + 1}",
+            'available_tokens': round(self.tokens, 2),
+            'cooling_down_for': round(max(0.0, self.cooldown_until - now), 1),
+            'in_flight': self.in_flight,
+            'requests': self.requests,
+            'successes': self.successes,
+            'errors': self.errors,
+            'rate_limited': self.rate_limited,
+            'avg_latency_ms': round(self.latency_total / self.successes * 1000) if self.successes else 0,
+            'utilization': round(1 - self.tokens / self.capacity, 3) if self.capacity else 0
+        }
+
+
+class GeminiClientPool:
+    """
+    Route Gemini calls across all configured keys.
+
+    - Token bucket per key (requests_per_minute, refilled continuously)
+    - Keys that return 429 are skipped until their cool-down expires
+    - Requests go to the ready key with the most tokens left
+    """
+
+    def __init__(self, api_keys, model_name=DEFAULT_MODEL, requests_per_minute=15,
+                 cooldown_seconds=60, acquire_timeout=30):
+        self.model_name = model_name
+        self.cooldown_seconds = cooldown_seconds
+        self.acquire_timeout = acquire_timeout
+        self._slots = [
+            _KeySlot(i, key, model_name, requests_per_minute)
+            for i, key in enumerate(api_keys)
+        ]
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+
+    def __len__(self):
+        return len(self._slots)
+
+    @property
+    def available(self):
+        return bool(self._slots)
+
+    def generate_content(self, *args, **kwargs):
+        """
+        Call GenerativeModel.generate_content on the best available key
+
+        On a quota error the key is put on cool-down and the call is retried
+        once on each remaining key before GeminiQuotaError is raised. Other
+        errors are raised unchanged.
+
+        With stream=True the result is a generator of chunks; the key counts
+        as in flight until it has been iterated to the end (or closed).
+        """
+        if not self._slots:
+            raise GeminiQuotaError("No GEMINI_API_KEY configured")
+
+        tried = set()
+        last_error = None
+
+        while len(tried) < len(self._slots):
+            slot = self._acquire(exclude=tried)
+            if slot is None:
+                break
+            tried.add(slot.index)
+
+            started = time.monotonic()
+            try:
+                response = slot.model.generate_content(*args, **kwargs)
+            except Exception as e:
+                self._release(slot, started, error=e)
+                if is_quota_error(e):
+                    print(f"⚠️  Gemini key #{slot.index + 1} rate limited, cooling down for {self.cooldown_seconds}s")
+                    last_error = e
+                    continue
+                raise
+
+            if kwargs.get('stream'):
+                return self._stream(slot, started, response)
+            self._release(slot, started)
+            return response
+
+        raise GeminiQuotaError(f"All Gemini API keys are rate limited (quota exceeded): {last_error}")
+
+    def info(self):
+        """Per-key utilization metrics"""
+        now = time.monotonic()
+        with self._lock:
+            for slot in self._slots:
+                slot.refill(now)
+            keys = [slot.info(now) for slot in self._slots]
+        return {
+            'model': self.model_name,
+            'keys': keys,
+            'requests': sum(k['requests'] for k in keys),
+            'rate_limited': sum(k['rate_limited'] for k in keys)
+        }
+
+    def _acquire(self, exclude):
+        """Take a token from the best ready key, waiting up to acquire_timeout"""
+        deadline = time.monotonic() + self.acquire_timeout
+
+        with self._ready:
+            while True:
+                now = time.monotonic()
+                candidates = [s for s in self._slots if s.index not in exclude]
+                if not candidates:
+                    return None
+
+                for slot in candidates:
+                    slot.refill(now)
+
+                ready = [s for s in candidates if s.cooldown_until <= now and s.tokens >= 1]
+                if ready:
+                    slot = max(ready, key=lambda s: (s.tokens, -s.in_flight))
+                    slot.tokens -= 1
+                    slot.in_flight += 1
+                    slot.requests += 1
+                    return slot
+
+                wait = min(s.seconds_until_ready(now) for s in candidates)
+                if now + wait > deadline:
+                    return None
+                self._ready.wait(wait)
+
+    def _stream(self, slot, started, response):
+        """Yield the chunks of a streamed response, releasing the key after the last one"""
+        error = None
+        try:
+            for chunk in response:
+                yield chunk
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self._release(slot, started, error=error)
+
+    def _release(self, slot, started, error=None):
+        with self._ready:
+            slot.in_flight -= 1
+            if error is None:
+                slot.successes += 1
+                slot.latency_total += time.monotonic() - started
+            elif is_quota_error(error):
+                slot.rate_limited += 1
+                slot.cooldown_until = time.monotonic() + self.cooldown_seconds
+            else:
+                slot.errors += 1
+            self._ready.notify_all()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_client_pool():
+    """Get the process-wide Gemini client pool (built on first use from env)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            keys = load_gemini_keys()
+            if not keys:
+                print("⚠️  Warning: No GEMINI_API_KEY configured")
+            else:
+                print(f"✓ Gemini client pool ready with {len(keys)} API key(s)")
+            _pool = GeminiClientPool(
+                keys,
+                model_name=os.getenv('GEMINI_MODEL', DEFAULT_MODEL),
+                requests_per_minute=int(os.getenv('GEMINI_REQUESTS_PER_MINUTE', 15)),
+                cooldown_seconds=int(os.getenv('GEMINI_QUOTA_COOLDOWN', 60))
+            )
+        return _pool
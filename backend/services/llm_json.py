@@ -0,0 +1,220 @@
+"""
+LLM JSON - Shared parsing of JSON answers from Gemini
+
+Gemini is asked for JSON (JSON mode when the installed SDK supports
+response_mime_type), but answers still arrive wrapped in markdown fences,
+with trailing commas, raw newlines inside strings or cut off at the token
+limit. parse_json() tries json.loads first and otherwise repairs the text
+in one pass instead of the caller paying for another Gemini call.
+
+Every parse is counted per source as clean, repaired or failed (a value
+only counts as parsed once it passes the caller's validate check); callers
+record the retries they make after a failure, so stats() shows how much
+quota malformed output costs.
+"""
+
+import json
+import threading
+from collections import defaultdict
+
+import google.ai.generativelanguage as glm
+
+
+class LLMJSONError(ValueError):
+    """Raised when a response can't be parsed or repaired into JSON"""
+
+
+def _supports_json_mode():
+    try:
+        return 'response_mime_type' in glm.GenerationConfig.meta.fields
+    except Exception:
+        return False
+
+
+# google-generativeai 0.3.x predates response_mime_type; the request would be rejected
+JSON_MODE = _supports_json_mode()
+
+_lock = threading.Lock()
+_counts = defaultdict(lambda: {'clean': 0, 'repaired': 0, 'failed': 0, 'retries': 0})
+
+
+def json_generation_config(**config):
+    """generation_config for a JSON answer (adds JSON mode when supported)"""
+    if JSON_MODE:
+        config['response_mime_type'] = 'application/json'
+    return config
+
+
+def parse_json(text, expect=dict, source='llm', validate=None):
+    """
+    Parse a JSON object or array out of an LLM response
+
+    Args:
+        text: Raw response text
+        expect: dict or list, the type of the top-level value
+        source: Name the outcome is counted under (see stats())
+        validate: Optional callable(value) that raises if the value can't
+                  be used (e.g. a repaired answer missing required fields)
+
+    Returns:
+        Parsed value of type expect
+
+    Raises:
+        LLMJSONError if the text can't be repaired into a valid value of that type
+    """
+    text = (text or '').strip()
+    problem = None
+
+    try:
+        value = json.loads(text)
+        if isinstance(value, expect):
+            problem = _check(value, validate)
+            if problem is None:
+                _record(source, 'clean')
+                return value
+    except ValueError:
+        pass
+
+    if problem is None:
+        for candidate in _repair(text, '{' if expect is dict else '['):
+            try:
+                value = json.loads(candidate)
+            except ValueError:
+                continue
+            if not isinstance(value, expect):
+                continue
+            problem = _check(value, validate)
+            if problem is None:
+                _record(source, 'repaired')
+                return value
+
+    _record(source, 'failed')
+    if problem is not None:
+        raise LLMJSONError(f"Parsed JSON {expect.__name__} failed validation: {problem}")
+    raise LLMJSONError(f"Could not parse a JSON {expect.__name__} from the response ({len(text)} chars)")
+
+
+def record_retry(source='llm'):
+    """Count a Gemini call repeated because its output couldn't be used"""
+    _record(source, 'retries')
+
+
+def stats():
+    with _lock:
+        by_source = {source: dict(counts) for source, counts in _counts.items()}
+
+    totals = {'clean': 0, 'repaired': 0, 'failed': 0, 'retries': 0}
+    for counts in by_source.values():
+        for outcome, value in counts.items():
+            totals[outcome] += value
+
+    return {'json_mode': JSON_MODE, **totals, 'by_source': by_source}
+
+
+def _check(value, validate):
+    """None if value passes validate, else the validation error"""
+    if validate is None:
+        return None
+    try:
+        validate(value)
+    except Exception as e:
+        return e
+    return None
+
+
+def _record(source, outcome):
+    with _lock:
+        _counts[source][outcome] += 1
+
+
+def _repair(text, opener):
+    """
+    Rewrite text into JSON candidates, most complete first
+
+    Scans from the first opener, ignoring text before it and after the
+    top-level value closes. Raw control characters inside strings are
+    escaped and trailing commas dropped. If the text is cut off, the open
+    string and brackets are closed; the second candidate instead cuts back
+    to the last complete value (e.g. when it ended inside a key).
+    """
+    start = text.find(opener)
+    if start < 0:
+        return []
+
+    out = []
+    stack = []             # closing brackets still owed
+    in_string = False
+    escaped = False
+    string_is_key = False
+    last_token = ''        # last significant character outside strings
+    safe = (0, [])         # (len(out), stack) after the last complete value
+
+    for ch in text[start:]:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif ch == '"':
+                in_string = False
+                last_token = '"'
+                out.append(ch)
+                if not string_is_key:
+                    safe = (len(out), list(stack))
+                continue
+            elif ch in _CONTROL_ESCAPES:
+                out.append(_CONTROL_ESCAPES[ch])
+                continue
+            out.append(ch)
+            continue
+
+        if ch == '"':
+            in_string = True
+            string_is_key = bool(stack) and stack[-1] == '}' and last_token in '{,'
+        elif ch in '{[':
+            stack.append('}' if ch == '{' else ']')
+        elif ch in '}]':
+            if not stack or ch != stack[-1]:
+                break
+            _drop_trailing_comma(out)
+            stack.pop()
+            out.append(ch)
+            last_token = ch
+            safe = (len(out), list(stack))
+            if not stack:
+                return [''.join(out)]
+            continue
+        elif ch == ',':
+            safe = (len(out), list(stack))
+
+        out.append(ch)
+        if not ch.isspace():
+            last_token = ch
+
+    # Cut off: close what is open, or fall back to the last complete value
+    closed = list(out)
+    if in_string:
+        if escaped:
+            closed.pop()
+        closed.append('"')
+    _drop_trailing_comma(closed)
+    candidates = [''.join(closed) + ''.join(reversed(stack))]
+
+    safe_len, safe_stack = safe
+    if safe_len:
+        trimmed = out[:safe_len]
+        _drop_trailing_comma(trimmed)
+        candidates.append(''.join(trimmed) + ''.join(reversed(safe_stack)))
+
+    return candidates
+
+
+_CONTROL_ESCAPES = {'\n': '\\n', '\r': '\\r', '\t': '\\t'}
+
+
+def _drop_trailing_comma(out):
+    i = len(out) - 1
+    while i >= 0 and out[i].isspace():
+        i -= 1
+    if i >= 0 and out[i] == ',':
+        del out[i]
@@ -0,0 +1,185 @@
+"""
+Opportunity Crawler - Scheduled refresh of the opportunity catalog
+
+Opportunities used to enter the catalog only when a user searched, so
+the first search for a common query paid for the Google round trips and
+result parsing. The crawler pre-runs every suggestion template on a
+cadence, which fills the catalog and the search cache ahead of users,
+and then flags cached opportunities whose deadline has passed.
+
+Crawling spends Custom Search quota, so it stops once it has used its
+daily budget (a share of the combined daily quota of the configured
+GOOGLE_SEARCH_API_KEY_* keys). The budget and the run lease live in one
+Firestore document: each run is claimed, and each search's calls
+reserved, in a transaction, so with several workers only one crawls
+and together they stay within the budget. A reservation is then
+corrected to the requests the search actually sent (none for a fresh
+cache entry, extra ones for pages retried after a 429).
+"""
+
+import os
+import threading
+from datetime import datetime
+
+from firebase_admin import firestore
+
+from .opportunity_service import all_suggestion_templates
+from .scheduler import PeriodicJob, claim_lease
+
+
+class OpportunityCrawler:
+    STATS_COLLECTION = 'stats'
+    STATS_DOCUMENT = 'opportunity_crawler'
+
+    def __init__(self, opportunity_service):
+        """
+        Initialize Opportunity Crawler
+
+        Args:
+            opportunity_service: OpportunityService instance (search, parsing, catalog writes)
+        """
+        self.opportunities = opportunity_service
+        self.firebase = opportunity_service.firebase
+
+        self.interval = int(os.getenv('OPPORTUNITY_CRAWL_INTERVAL', 21600))
+
+        # Google allows 100 Custom Search queries per key per day on the free tier
+        key_count = len(opportunity_service.search_api_keys)
+        daily_quota = int(os.getenv('GOOGLE_SEARCH_DAILY_QUOTA', 100)) * key_count
+        self.daily_budget = int(os.getenv('OPPORTUNITY_CRAWL_DAILY_BUDGET', daily_quota // 2))
+
+        self._job = None
+        self._lock = threading.Lock()
+        self._last_result = None
+
+    def start(self):
+        """Start the periodic crawl (OPPORTUNITY_CRAWL_INTERVAL seconds, 0 disables)"""
+        if self._job or not self.interval or not self.firebase.firebase_enabled:
+            return self._job
+        if not self.opportunities.search_api_keys:
+            print("⚠️  Opportunity crawler disabled - no Google Search API keys")
+            return None
+        self._job = PeriodicJob('opportunity-crawler', self.interval, self.crawl, run_immediately=True).start()
+        return self._job
+
+    def crawl(self, force=False):
+        """
+        Refresh every suggestion template within the daily budget, then mark
+        expired opportunities
+
+        Skipped when another worker crawled within the last interval, unless
+        force is set.
+
+        Returns:
+            Dictionary with queries refreshed/skipped, API calls used and
+            opportunities marked expired (None if skipped)
+        """
+        if not self._lock.acquire(blocking=False):
+            return None
+        try:
+            return self._crawl(force)
+        finally:
+            self._lock.release()
+
+    def info(self):
+        return {
+            'interval': self.interval,
+            'daily_budget': self.daily_budget,
+            'running': bool(self._job),
+            'last_result': self._last_result
+        }
+
+    # ========================================================================
+    # PRIVATE HELPER METHODS
+    # ========================================================================
+
+    def _crawl(self, force):
+        doc_ref = self._doc_ref()
+
+        # Exactly one worker crawls per interval
+        if not claim_lease(self.firebase.db, doc_ref, self.interval, force=force):
+            return None
+
+        calls_per_query = self.opportunities.search_pages
+        result = {'refreshed': 0, 'fresh': 0, 'over_budget': 0, 'calls_used': 0, 'expired': 0}
+
+        print(f"🕷️  Crawling {len(all_suggestion_templates())} search templates "
+              f"(budget {self.daily_budget} API calls a day)")
+
+        for query in all_suggestion_templates():
+            # Stop at the shared crawl budget, or earlier if the keys themselves run low
+            if self.opportunities.key_scheduler.remaining() < calls_per_query:
+                result['over_budget'] += 1
+                continue
+            if not self._reserve_calls(doc_ref, calls_per_query):
+                result['over_budget'] += 1
+                continue
+
+            try:
+                status, api_calls = self.opportunities.refresh_search(query)
+            except Exception as e:
+                # How many calls went out is unknown, keep the reservation
+                print(f"⚠️  Crawl of '{query}' failed: {e}")
+                continue
+
+            # Charge what was actually sent: nothing if the cache was fresh,
+            # more than reserved if pages were retried on another key after a 429
+            self._adjust_calls(doc_ref, api_calls - calls_per_query)
+            result['calls_used'] += api_calls
+            if status == 'fresh':
+                result['fresh'] += 1
+            elif status == 'refreshed':
+                result['refreshed'] += 1
+
+        expired_ids = self.firebase.mark_expired_opportunities(self.opportunities.is_opportunity_expired)
+        for opportunity_id in expired_ids:
+            self.opportunities.search_index.remove(opportunity_id)
+        result['expired'] = len(expired_ids)
+
+        print(f"✓ Crawl finished: {result['refreshed']} refreshed, {result['fresh']} still fresh, "
+              f"{result['over_budget']} over budget, {result['calls_used']} API calls, "
+              f"{result['expired']} marked expired")
+
+        self._last_result = {**result, 'finished_at': datetime.now().isoformat()}
+        return result
+
+    def _reserve_calls(self, doc_ref, calls):
+        """
+        Take calls from today's budget before searching
+
+        The counter is shared by every worker and checked and updated in
+        one transaction, so together they never spend more than the budget.
+        calls_used starts over when the search key quota day changes.
+
+        Returns:
+            False once the budget is spent
+        """
+        day = self.opportunities.key_scheduler.quota_day()
+
+        @firestore.transactional
+        def reserve(transaction):
+            snapshot = doc_ref.get(transaction=transaction)
+            data = snapshot.to_dict() if snapshot.exists else {}
+            used = data.get('calls_used', 0) if data.get('day') == day else 0
+            if used + calls > self.daily_budget:
+                return False
+            transaction.set(doc_ref, {'day': day, 'calls_used': used + calls}, merge=True)
+            return True
+
+        try:
+            return reserve(self.firebase.db.transaction())
+        except Exception as e:
+            print(f"⚠️  Could not reserve crawler quota: {e}")
+            return False
+
+    def _adjust_calls(self, doc_ref, delta):
+        """Correct a reservation by the difference to the calls actually made"""
+        if not delta:
+            return
+        try:
+            doc_ref.update({'calls_used': firestore.Increment(delta)})
+        except Exception as e:
+            print(f"⚠️  Could not adjust crawler quota: {e}")
+
+    def _doc_ref(self):
+        return self.firebase.db.collection(self.STATS_COLLECTION).document(self.STATS_DOCUMENT)
@@ -4,8 +4,68 @@ Opportunity Service - Handles opportunity discovery using Google Programmable Se
 
 import os
 import requests
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
 import re
+from requests.adapters import HTTPAdapter
+
+from .search_cache import SearchCache
+from .search_index import SearchIndex
+from .search_key_scheduler import SearchKeyScheduler
+from .scheduler import PeriodicJob, claim_lease
+from .canonical_url import canonicalize_url, opportunity_id_for_url
+from . import date_extraction, keyword_matcher
+
+
+# Search templates per study branch: (profile keywords, suggested queries)
+SUGGESTION_BRANCHES = [
+    # === COMPUTER SCIENCE & IT ===
+    (['computer', 'software', 'it', 'information technology'],
+     ['Software development internship 2026', 'Tech hackathon 2026']),
+    
+    # === AI/ML/DATA SCIENCE ===
+    (['machine learning', 'ai', 'artificial intelligence', 'data science', 'deep learning'],
+     ['AI hackathon 2026', 'Data Science competition 2026']),
+    
+    # === MECHANICAL ENGINEERING ===
+    (['mechanical', 'automobile', 'automotive', 'manufacturing', 'cad', 'solidworks', 'catia'],
+     ['Mechanical engineering internship 2026', 'Product design competition', 'Automotive hackathon']),
+    
+    # === ELECTRICAL/ELECTRONICS ===
+    (['electrical', 'electronics', 'ece', 'eee', 'circuit', 'vlsi', 'embedded', 'iot'],
+     ['Electronics project competition 2026', 'IoT hackathon 2026', 'Hardware engineering internship']),
+    
+    # === CIVIL ENGINEERING ===
+    (['civil', 'construction', 'structural', 'architecture'],
+     ['Civil engineering internship 2026', 'Infrastructure design competition', 'Smart city hackathon']),
+    
+    # === CHEMICAL/BIOTECHNOLOGY ===
+    (['chemical', 'biotech', 'biotechnology', 'pharmacy', 'pharmaceutical'],
+     ['Biotech innovation challenge 2026', 'Chemical engineering internship', 'Healthcare hackathon']),
+    
+    # === BUSINESS/MANAGEMENT ===
+    (['management', 'mba', 'business', 'finance', 'marketing'],
+     ['Business case competition 2026', 'Startup challenge', 'Management internship 2026']),
+    
+    # === DESIGN/CREATIVE ===
+    (['design', 'ui', 'ux', 'graphic', 'creative'],
+     ['Design competition 2026', 'UI/UX hackathon'])
+]
+
+# === GENERAL FOR ALL STUDENTS ===
+GENERAL_SUGGESTIONS = [
+    'Student hackathon 2026',
+    'College internship program 2026',
+    'Student fellowship 2026',
+    'Innovation challenge',
+    'Student startup competition'
+]
+
+
+def all_suggestion_templates():
+    """Every query generate_personalized_suggestions() can return, deduplicated"""
+    queries = [query for _, branch_queries in SUGGESTION_BRANCHES for query in branch_queries]
+    return list(dict.fromkeys(queries + GENERAL_SUGGESTIONS))
 
 
 class OpportunityService:
@@ -27,7 +87,15 @@ class OpportunityService:
                 self.search_api_keys.append(key_value)
         
         self.search_engine_id = os.getenv('GOOGLE_SEARCH_ENGINE_ID')
-        self.current_key_index = 0  # Track which key we're using
+        
+        # Hands out the key with the most daily quota left, parks keys after 429
+        self.key_scheduler = SearchKeyScheduler(
+            self.search_api_keys,
+            firebase_service,
+            daily_quota=int(os.getenv('GOOGLE_SEARCH_DAILY_QUOTA', 100)),
+            reset_utc_offset=int(os.getenv('GOOGLE_SEARCH_QUOTA_RESET_UTC_OFFSET', -8)),
+            sync_interval=int(os.getenv('GOOGLE_SEARCH_KEY_SYNC_INTERVAL', 60))
+        )
         
         if not self.search_api_keys or not self.search_engine_id:
             print("⚠️  Warning: Google Search API credentials not configured")
@@ -35,14 +103,27 @@ class OpportunityService:
             print(f"✓ Loaded {len(self.search_api_keys)} Google Search API key(s) for load balancing")
         
         self.search_url = "https://www.googleapis.com/customsearch/v1"
-    
-    def _get_next_api_key(self):
-        """Get next API key in rotation"""
-        if not self.search_api_keys:
-            return None
-        key = self.search_api_keys[self.current_key_index]
-        self.current_key_index = (self.current_key_index + 1) % len(self.search_api_keys)
-        return key
+        
+        # Result pages fetched per search (10 results each), in parallel
+        self.search_pages = max(1, int(os.getenv('GOOGLE_SEARCH_PAGES', 2)))
+        
+        # Keep-alive connection pool shared by all searches
+        self.http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(10, self.search_pages * 4))
+        self.http.mount('https://', adapter)
+        
+        # Normalized query -> results cache (saves Custom Search quota)
+        self.search_cache = SearchCache(firebase_service)
+        
+        # Local BM25 index over the cached catalog for 'local_first' searches
+        self.search_index = SearchIndex(max_age_seconds=int(os.getenv('LOCAL_SEARCH_INDEX_TTL', 900)))
+        self.search_mode = os.getenv('OPPORTUNITY_SEARCH_MODE', 'google')
+        self.local_min_results = int(os.getenv('LOCAL_SEARCH_MIN_RESULTS', 5))
+        
+        # Expired opportunities are archived (or deleted) by a periodic sweep
+        self.sweep_interval = int(os.getenv('OPPORTUNITY_SWEEP_INTERVAL', 21600))
+        self.expired_action = os.getenv('OPPORTUNITY_EXPIRED_ACTION', 'archive')
+        self._sweeper = None
     
     
     def generate_personalized_suggestions(self, profile_data):
@@ -70,68 +151,12 @@ class OpportunityService:
         all_interests = ' '.join(interests).lower() if interests else ''
         combined_text = f"{major} {degree} {all_skills} {all_interests}"
         
-        # === COMPUTER SCIENCE & IT ===
-        cs_keywords = ['computer', 'software', 'it', 'information technology']
-        if any(kw in combined_text for kw in cs_keywords):
-            suggestions.append('Software development internship 2026')
-            suggestions.append('Tech hackathon 2026')
-        
-        # === AI/ML/DATA SCIENCE ===
-        ai_keywords = ['machine learning', 'ai', 'artificial intelligence', 'data science', 'deep learning']
-        if any(kw in combined_text for kw in ai_keywords):
-            suggestions.append('AI hackathon 2026')
-            suggestions.append('Data Science competition 2026')
-        
-        # === MECHANICAL ENGINEERING ===
-        mech_keywords = ['mechanical', 'automobile', 'automotive', 'manufacturing', 'cad', 'solidworks', 'catia']
-        if any(kw in combined_text for kw in mech_keywords):
-            suggestions.append('Mechanical engineering internship 2026')
-            suggestions.append('Product design competition')
-            suggestions.append('Automotive hackathon')
-        
-        # === ELECTRICAL/ELECTRONICS ===
-        eee_keywords = ['electrical', 'electronics', 'ece', 'eee', 'circuit', 'vlsi', 'embedded', 'iot']
-        if any(kw in combined_text for kw in eee_keywords):
-            suggestions.append('Electronics project competition 2026')
-            suggestions.append('IoT hackathon 2026')
-            suggestions.append('Hardware engineering internship')
-        
-        # === CIVIL ENGINEERING ===
-        civil_keywords = ['civil', 'construction', 'structural', 'architecture']
-        if any(kw in combined_text for kw in civil_keywords):
-            suggestions.append('Civil engineering internship 2026')
-            suggestions.append('Infrastructure design competition')
-            suggestions.append('Smart city hackathon')
-        
-        # === CHEMICAL/BIOTECHNOLOGY ===
-        chem_keywords = ['chemical', 'biotech', 'biotechnology', 'pharmacy', 'pharmaceutical']
-        if any(kw in combined_text for kw in chem_keywords):
-            suggestions.append('Biotech innovation challenge 2026')
-            suggestions.append('Chemical engineering internship')
-            suggestions.append('Healthcare hackathon')
-        
-        # === BUSINESS/MANAGEMENT ===
-        mgmt_keywords = ['management', 'mba', 'business', 'finance', 'marketing']
-        if any(kw in combined_text for kw in mgmt_keywords):
-            suggestions.append('Business case competition 2026')
-            suggestions.append('Startup challenge')
-            suggestions.append('Management internship 2026')
-        
-        # === DESIGN/CREATIVE ===
-        design_keywords = ['design', 'ui', 'ux', 'graphic', 'creative']
-        if any(kw in combined_text for kw in design_keywords):
-            suggestions.append('Design competition 2026')
-            suggestions.append('UI/UX hackathon')
-        
-        # === GENERAL FOR ALL STUDENTS ===
+        for keywords, branch_queries in SUGGESTION_BRANCHES:
+            if any(kw in combined_text for kw in keywords):
+                suggestions.extend(branch_queries)
+        
         # Always include general opportunities
-        suggestions.extend([
-            'Student hackathon 2026',
-            'College internship program 2026',
-            'Student fellowship 2026',
-            'Innovation challenge',
-            'Student startup competition'
-        ])
+        suggestions.extend(GENERAL_SUGGESTIONS)
         
         # Remove duplicates and limit to 8
         suggestions = list(dict.fromkeys(suggestions))[:8]
@@ -139,7 +164,7 @@ class OpportunityService:
         return suggestions
     
     
-    def search_opportunities(self, query, opportunity_type=None):
+    def search_opportunities(self, query, opportunity_type=None, mode=None):
         """
         Search for opportunities using Google Programmable Search Engine
         Enhanced to search across multiple platforms including:
@@ -150,33 +175,104 @@ class OpportunityService:
         Args:
             query: Search query string
             opportunity_type: Optional filter (hackathon, internship, fellowship)
+            mode: 'google' or 'local_first' (defaults to OPPORTUNITY_SEARCH_MODE).
+                  local_first answers from the cached catalog and only calls
+                  Google when fewer than LOCAL_SEARCH_MIN_RESULTS match
         
         Returns:
             Dictionary with opportunities list and metadata
         """
+        if (mode or self.search_mode) == 'local_first':
+            local_opportunities = self._search_local(query, opportunity_type)
+            if len(local_opportunities) >= self.local_min_results:
+                print(f"📚 Local search: {len(local_opportunities)} results for '{query}'")
+                return {
+                    'opportunities': local_opportunities,
+                    'count': len(local_opportunities),
+                    'query': query,
+                    'cached': True,
+                    'source': 'local'
+                }
+            print(f"📚 Local search: only {len(local_opportunities)} results, falling back to Google")
+        
         # Build enhanced query with platform-specific search
         enhanced_query = self._enhance_query(query, opportunity_type)
         
-        # Check cache first (recent searches within last hour)
-        # For hackathon demo, we'll implement basic caching logic
+        def fetch():
+            return self._fetch_opportunities(enhanced_query, opportunity_type)
         
-        # Perform Google search
-        search_results = self._perform_google_search(enhanced_query)
-        
-        # Parse and structure results
-        opportunities = self._parse_search_results(search_results, opportunity_type)
-        
-        # Cache results in Firebase
-        cached_opportunities = self._cache_opportunities(opportunities)
+        # Check cache first (identical searches within SEARCH_CACHE_TTL cost no API quota)
+        cache_key = SearchCache.make_key(enhanced_query, opportunity_type)
+        cached_opportunities, cache_status = self.search_cache.get_or_fetch(cache_key, fetch)
+        print(f"🗃️  Search cache {cache_status}: {enhanced_query}")
         
         return {
             'opportunities': cached_opportunities,
             'count': len(cached_opportunities),
             'query': enhanced_query,
-            'cached': True
+            'cached': True,
+            'cache_status': cache_status,
+            'source': 'google'
         }
     
     
+    def refresh_search(self, query, opportunity_type=None, force=False):
+        """
+        Run a search against Google and store the results in the search cache,
+        so the next identical user search is served without a round trip
+        
+        Args:
+            query: Search query string
+            opportunity_type: Optional type filter
+            force: Refresh even if the cached results are still fresh
+        
+        Returns:
+            Tuple of (status, api_calls): status is 'fresh' (cached results
+            still fresh, nothing fetched), 'refreshed' or 'unavailable' (the
+            search fell back to mock data); api_calls is the number of Google
+            Search requests made, including retries after a 429
+        """
+        enhanced_query = self._enhance_query(query, opportunity_type)
+        cache_key = SearchCache.make_key(enhanced_query, opportunity_type)
+        
+        if not force and self.search_cache.is_fresh(cache_key):
+            return 'fresh', 0
+        
+        opportunities, search_results = self._run_search(enhanced_query, opportunity_type)
+        api_calls = search_results.get('api_calls', 0)
+        if search_results.get('is_mock'):
+            return 'unavailable', api_calls
+        
+        self.search_cache.store(cache_key, opportunities)
+        return 'refreshed', api_calls
+    
+    
+    def sweep_expired(self, force=False):
+        """
+        Archive (or delete) expired opportunities and drop them from the local index
+        
+        Every worker schedules the sweep, but only the one that claims the
+        shared lease runs it each interval; the others return None.
+        """
+        lease = self.firebase.db.collection('stats').document('opportunity_sweeper')
+        if not claim_lease(self.firebase.db, lease, self.sweep_interval, force=force):
+            return None
+        
+        removed = self.firebase.sweep_expired_opportunities(archive=self.expired_action != 'delete')
+        for opportunity_id in removed:
+            self.search_index.remove(opportunity_id)
+        return len(removed)
+    
+    
+    def start_expiry_sweeper(self):
+        """Start the periodic expiry sweep (OPPORTUNITY_SWEEP_INTERVAL seconds, 0 disables)"""
+        if self._sweeper or not self.sweep_interval or not self.firebase.firebase_enabled:
+            return self._sweeper
+        self._sweeper = PeriodicJob('opportunity-sweeper', self.sweep_interval, self.sweep_expired,
+                                    run_immediately=True).start()
+        return self._sweeper
+    
+    
     def get_cached_opportunities(self, limit=20, opportunity_type=None):
         """
         Get recently cached opportunities from Firebase
@@ -200,6 +296,37 @@ class OpportunityService:
     # PRIVATE HELPER METHODS
     # ========================================================================
     
+    def _fetch_opportunities(self, enhanced_query, opportunity_type=None):
+        """
+        Search Google, parse the results and save them to the catalog
+        
+        Returns:
+            Tuple of (opportunities, cacheable) - cacheable is False for mock data
+        """
+        opportunities, search_results = self._run_search(enhanced_query, opportunity_type)
+        return opportunities, not search_results.get('is_mock')
+    
+    
+    def _run_search(self, enhanced_query, opportunity_type=None):
+        """
+        Search Google and parse the results; real results are saved to the
+        catalog and search index, mock fallback data never is
+        
+        Returns:
+            Tuple of (opportunities, raw search results)
+        """
+        # Perform Google search
+        search_results = self._perform_google_search(enhanced_query)
+        
+        # Parse and structure results
+        opportunities = self._parse_search_results(search_results, opportunity_type)
+        
+        # Cache results in Firebase
+        if not search_results.get('is_mock'):
+            opportunities = self._cache_opportunities(opportunities)
+        return opportunities, search_results
+    
+    
     def _enhance_query(self, query, filters=None):
         """
         SIMPLIFIED query enhancement - less aggressive
@@ -246,23 +373,22 @@ class OpportunityService:
             num_results: Number of results per page (max 10 per API call)
         
         Returns:
-            Search results dictionary
+            Search results dictionary ('api_calls' counts the requests made)
         """
         if not self.search_api_keys or not self.search_engine_id:
             print("⚠️  Missing API credentials - using mock data")
             return self._get_mock_search_results(query)
         
+        calls = []  # one entry per request sent (list.append is thread-safe)
         try:
             all_items = []
             
-            # Fetch 2 pages for diverse results (2 pages = 20 results)
-            # Reduced from 5 pages to save API quota
-            for start_index in [1, 11]:
-                # Get next API key in rotation
-                api_key = self._get_next_api_key()
-                
+            # Fetch GOOGLE_SEARCH_PAGES pages concurrently (default 2 = 20 results)
+            # Kept low to save API quota
+            start_indexes = [1 + page * num_results for page in range(self.search_pages)]
+            
+            def fetch_page(start_index):
                 params = {
-                    'key': api_key,
                     'cx': self.search_engine_id,
                     'q': f"{query} India",  # Add India filter
                     'num': num_results,
@@ -273,11 +399,29 @@ class OpportunityService:
                     'cr': 'countryIN'  # Country restrict: India
                 }
                 
-                print(f"🔍 Google Search (page {start_index}): {query} India")
-                
-                response = requests.get(self.search_url, params=params, timeout=10)
-                
-                if response.status_code == 200:
+                # On 429, park the key and retry the page with the next one
+                response = None
+                for _ in range(len(self.key_scheduler)):
+                    key = self.key_scheduler.acquire()
+                    if not key:
+                        break
+                    print(f"🔍 Google Search (page {start_index}): {query} India")
+                    calls.append(start_index)
+                    response = self.http.get(self.search_url, params={**params, 'key': key}, timeout=10)
+                    if response.status_code != 429:
+                        break
+                    self.key_scheduler.park(key)
+                return response
+            
+            with ThreadPoolExecutor(max_workers=len(start_indexes)) as executor:
+                responses = list(executor.map(fetch_page, start_indexes))
+            
+            # Process pages in order so 429 / first-page failures behave as before
+            for start_index, response in zip(start_indexes, responses):
+                if response is None:
+                    print(f"⚠️  All Google Search API keys are out of quota, using {len(all_items)} results so far")
+                    break
+                elif response.status_code == 200:
                     result = response.json()
                     items = result.get('items', [])
                     all_items.extend(items)
@@ -310,15 +454,15 @@ class OpportunityService:
             
             if not all_items:
                 print("⚠️  No results from API - using mock data")
-                return self._get_mock_search_results(query)
+                return {**self._get_mock_search_results(query), 'api_calls': len(calls)}
             
             print(f"✅ Total results fetched: {len(all_items)}")
-            return {'items': all_items}
+            return {'items': all_items, 'api_calls': len(calls)}
             
         except requests.RequestException as e:
             print(f"❌ Google Search API error: {e}")
             print("⚠️  Falling back to mock data")
-            return self._get_mock_search_results(query)
+            return {**self._get_mock_search_results(query), 'api_calls': len(calls)}
     
     
     def _parse_search_results(self, search_results, opportunity_type=None):
@@ -340,13 +484,15 @@ class OpportunityService:
         items = search_results.get('items', [])
         print(f"📄 Parsing {len(items)} search results...")
         
-        for idx, item in enumerate(items, 1):
+        # Relevance score (0-100), inferred type and eligibility for the whole page
+        matches = keyword_matcher.score_page(items)
+        
+        for idx, (item, match) in enumerate(zip(items, matches), 1):
             title = item.get('title', 'No title')
             link = item.get('link', '')
             snippet = item.get('snippet', 'No description')
             
-            # Calculate relevance score (0-100)
-            relevance_score = self._calculate_relevance_score(item)
+            relevance_score = match.relevance_score
             
             # More lenient filtering - accept if score > 15
             if relevance_score < 15:
@@ -355,13 +501,13 @@ class OpportunityService:
                 continue
             
             # Check if opportunity has expired deadline
-            if self._is_opportunity_expired(title, snippet):
+            if self.is_opportunity_expired(title, snippet):
                 print(f"⏭️  Skipping #{idx}: Expired deadline ({title[:50]}...)")
                 skipped_expired += 1
                 continue
             
             # Infer type if not provided
-            inferred_type = opportunity_type or self._infer_opportunity_type(title, snippet)
+            inferred_type = opportunity_type or match.type
             
             # Extract opportunity details
             # Combine title and snippet for better deadline extraction
@@ -378,9 +524,10 @@ class OpportunityService:
                 'discovered_date': datetime.now().isoformat(),
                 'type': inferred_type,
                 'organizer': self._extract_organizer(title, snippet),
-                'eligibility_text': self._extract_eligibility(snippet),
+                'eligibility_text': match.eligibility_text,
                 'deadline': deadline or 'Not specified',
                 'apply_by': deadline or 'Not specified',
+                'expires_at': date_extraction.expires_at(deadline, self.firebase.opportunity_ttl_days),
                 'opportunity_id': f"opp_{idx}",  # Use index for consistent IDs
                 'url': link  # Add URL for ID generation
             }
@@ -392,54 +539,44 @@ class OpportunityService:
         opportunities.sort(key=lambda x: x['relevance_score'], reverse=True)
         print(f"📊 Results: {len(opportunities)} kept, {skipped_relevance} low relevance, {skipped_expired} expired")
         
-        # Save opportunities to database for eligibility checking
-        try:
-            import hashlib
-            for opp in opportunities:
-                # Use URL hash as ID for consistency and deduplication
-                opp_id = hashlib.md5(opp['url'].encode()).hexdigest()[:12]
-                opp['id'] = opp_id
-                opp['opportunity_id'] = opp_id
-                
-                # Save to opportunities collection using firebase service
-                self.firebase.db.collection('opportunities').document(opp_id).set({
-                    'title': opp.get('title'),
-                    'link': opp.get('link'),
-                    'url': opp.get('url'),
-                    'description': opp.get('description'),
-                    'snippet': opp.get('snippet'),
-                    'source': opp.get('source'),
-                    'type': opp.get('type'),
-                    'organizer': opp.get('organizer'),
-                    'eligibility_text': opp.get('eligibility_text'),
-                    'deadline': opp.get('deadline'),
-                    'apply_by': opp.get('apply_by'),
-                    'relevance_score': opp.get('relevance_score'),
-                    'discovered_date': opp.get('discovered_date'),
-                    'created_at': datetime.now().isoformat(),
-                    'source_type': 'search',
-                    'is_cached': True
-                }, merge=True)
-        except Exception as e:
-            print(f"⚠️  Could not save opportunities to DB: {e}")
+        # Use canonical URL hash as ID so repeated results map to one document
+        unique = {}
+        for opp in opportunities:
+            opp_id = opportunity_id_for_url(opp['url'])
+            opp['id'] = opp_id
+            opp['opportunity_id'] = opp_id
+            opp['canonical_url'] = canonicalize_url(opp['url'])
+            # Keep the most relevant copy (list is already sorted)
+            unique.setdefault(opp_id, opp)
         
-        return opportunities
+        return list(unique.values())
     
     
     def _cache_opportunities(self, opportunities):
         """
-        Cache opportunities in Firebase
+        Save opportunities to Firebase (one batched upsert per search)
         
         Returns:
             List of opportunities with IDs
         """
-        cached = []
+        try:
+            self.firebase.upsert_opportunities(opportunities)
+        except Exception as e:
+            print(f"⚠️  Could not save opportunities to DB: {e}")
         
-        for opp in opportunities:
-            result = self.firebase.create_opportunity(opp)
-            cached.append(result)
+        self.search_index.add_many(opportunities)
+        return opportunities
+    
+    
+    def _search_local(self, query, opportunity_type=None, limit=20):
+        """Rank cached opportunities against the query with the local BM25 index"""
+        if self.firebase.firebase_enabled:
+            try:
+                self.search_index.ensure_fresh(self.firebase.db)
+            except Exception as e:
+                print(f"⚠️  Could not refresh local search index: {e}")
         
-        return cached
+        return self.search_index.search(query, limit=limit, opportunity_type=opportunity_type)
     
     
     def _extract_organizer(self, title, snippet):
@@ -468,117 +605,20 @@ class OpportunityService:
         return "Unknown"
     
     
-    def _extract_eligibility(self, snippet):
-        """
-        Extract eligibility criteria from snippet
-        """
-        # Look for eligibility-related sentences
-        eligibility_keywords = [
-            'eligible', 'eligibility', 'open to', 'for students',
-            'requirements', 'must be', 'should be', 'criteria'
-        ]
-        
-        sentences = snippet.split('.')
-        eligibility_sentences = []
-        
-        for sentence in sentences:
-            if any(keyword in sentence.lower() for keyword in eligibility_keywords):
-                eligibility_sentences.append(sentence.strip())
-        
-        if eligibility_sentences:
-            return ' '.join(eligibility_sentences)
-        
-        # Default: return full snippet
-        return snippet
-    
-    
     def _extract_deadline(self, snippet):
         """
         Extract deadline date from snippet with extensive pattern matching
         Searches aggressively for any date mentions
         Returns formatted date string or None
         """
-        from datetime import datetime
-        import re
-        
         # Look in both snippet (title + description are passed together)
-        text = snippet
-        
-        # Extensive date patterns - catch everything possible
-        date_patterns = [
-            # With keywords
-            (r'(?:deadline|apply by|last date|due date|register by|submit by|registration deadline|application deadline|closes on|close date|expiry|expires|ends on|till|before):?\s*([A-Z][a-z]+\s+\d{1,2},?\s+\d{4})', 'keyword_mdy'),
-            (r'(?:deadline|apply by|last date|due date|register by|submit by|registration deadline|application deadline|closes on|close date|expiry|expires|ends on|till|before):?\s*(\d{1,2}\s+[A-Z][a-z]+\s+\d{4})', 'keyword_dmy'),
-            (r'(?:deadline|apply by|last date|due date|register by|submit by):?\s*(\d{1,2}\s+[A-Z][a-z]+\s+\'\d{2})', 'keyword_short_dmy'),
-            (r'(?:deadline|apply by|last date|due date|register by|submit by):?\s*([A-Z][a-z]+\s+\d{1,2}\s+\'\d{2})', 'keyword_short_mdy'),
-            
-            # Standalone dates (more aggressive)
-            (r'\b([A-Z][a-z]+\s+\d{1,2},?\s+20\d{2})\b', 'standalone_mdy'),
-            (r'\b(\d{1,2}\s+[A-Z][a-z]+\s+20\d{2})\b', 'standalone_dmy'),
-            (r'\b(\d{1,2}\s+[A-Z][a-z]+\s+\'\d{2})\b', 'standalone_short_dmy'),
-            (r'\b([A-Z][a-z]+\s+\d{1,2}\s+\'\d{2})\b', 'standalone_short_mdy'),
-            
-            # Numeric formats
-            (r'\b(\d{1,2}/\d{1,2}/20\d{2})\b', 'slash'),
-            (r'\b(\d{1,2}-\d{1,2}-20\d{2})\b', 'dash'),
-            (r'\b(20\d{2}-\d{1,2}-\d{1,2})\b', 'iso'),
-        ]
-        
-        for pattern, date_type in date_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                date_str = match.group(1)
-                
-                # Convert short year to full year
-                if "'" in date_str:
-                    date_str = date_str.replace("'2", "202").replace("'1", "201")
-                
-                print(f"📅 Found deadline: {date_str}")
-                return date_str
-        
-        print("⚠️  No deadline found in snippet")
-        return None
-    
-    
-    def _calculate_relevance_score(self, item):
-        """
-        Calculate relevance score (0-100) based on multiple factors
-        
-        Args:
-            item: Search result item
+        date_str = date_extraction.extract_deadline(snippet)
         
-        Returns:
-            Relevance score (0-100)
-        """
-        score = 50  # Base score
-        
-        title = item.get('title', '').lower()
-        snippet = item.get('snippet', '').lower()
-        link = item.get('link', '').lower()
-        
-        # High-value keywords boost score
-        high_value_keywords = ['apply', 'deadline', 'eligibility', 'register', 'prize', 'stipend', '2026']
-        for keyword in high_value_keywords:
-            if keyword in title:
-                score += 5
-            if keyword in snippet:
-                score += 3
-        
-        # Trusted domains get boost
-        trusted_domains = ['devpost.com', 'devfolio.co', 'unstop.com', 'internshala.com', 
-                          'scholars4dev.com', 'opportunitydesk.org', 'linkedin.com']
-        for domain in trusted_domains:
-            if domain in link:
-                score += 15
-                break
-        
-        # Penalty for irrelevant indicators
-        spam_indicators = ['login', 'signin', 'profile', 'settings', 'terms', 'privacy']
-        for indicator in spam_indicators:
-            if indicator in link:
-                score -= 20
-        
-        return max(0, min(100, score))
+        if date_str:
+            print(f"📅 Found deadline: {date_str}")
+        else:
+            print("⚠️  No deadline found in snippet")
+        return date_str
     
     
     def _extract_domain(self, url):
@@ -590,107 +630,17 @@ class OpportunityService:
             return 'Unknown'
     
     
-    def _is_opportunity_expired(self, title, snippet):
+    def is_opportunity_expired(self, title, snippet):
         """
         Check if opportunity deadline has passed
         Dynamically calculates relative to today's date
         """
-        from datetime import datetime, timedelta
-        import re
-        
-        text = (title + ' ' + snippet).lower()
-        current_date = datetime.now()
-        
-        # Look for "closed", "ended", "expired" keywords
-        expired_keywords = ['closed', 'ended', 'expired', 'registration closed', 'applications closed']
-        if any(keyword in text for keyword in expired_keywords):
-            return True
-        
-        # Extract dates from text with multiple patterns
-        date_patterns = [
-            # Month Day, Year: Jan 15, 2026
-            (r'(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]* (\d{1,2}),? (\d{4})', 'mdy'),
-            # Day-Month-Year: 15-01-2026 or 15/01/2026
-            (r'(\d{1,2})[-/](\d{1,2})[-/](\d{4})', 'dmy'),
-            # Year-Month-Day: 2026-01-15
-            (r'(\d{4})-(\d{1,2})-(\d{1,2})', 'ymd'),
-            # Deadline: 15 Jan 2026
-            (r'deadline:?\s*(\d{1,2})\s*(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\s*(\d{4})', 'dmy_text'),
-        ]
-        
-        month_map = {'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
-                     'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12}
-        
-        for pattern, format_type in date_patterns:
-            matches = re.findall(pattern, text)
-            for match in matches:
-                try:
-                    deadline = None
-                    
-                    if format_type == 'mdy':
-                        # Month Day, Year
-                        month = month_map.get(match[0][:3])
-                        day = int(match[1])
-                        year = int(match[2])
-                        if month:
-                            deadline = datetime(year, month, day)
-                    
-                    elif format_type == 'dmy':
-                        # Day-Month-Year
-                        day = int(match[0])
-                        month = int(match[1])
-                        year = int(match[2])
-                        deadline = datetime(year, month, day)
-                    
-                    elif format_type == 'ymd':
-                        # Year-Month-Day
-                        year = int(match[0])
-                        month = int(match[1])
-                        day = int(match[2])
-                        deadline = datetime(year, month, day)
-                    
-                    elif format_type == 'dmy_text':
-                        # Day Month Year (text)
-                        day = int(match[0])
-                        month = month_map.get(match[1][:3])
-                        year = int(match[2])
-                        if month:
-                            deadline = datetime(year, month, day)
-                    
-                    # Check if deadline is before yesterday
-                    # Filter out anything with deadline on or before day before yesterday
-                    yesterday = current_date - timedelta(days=1)
-                    if deadline and deadline.date() < yesterday.date():
-                        print(f"🚫 Expired: {deadline.date()} is before yesterday {yesterday.date()}")
-                        return True
-                        
-                except Exception as e:
-                    continue
-        
-        return False
-    
-    def _infer_opportunity_type(self, title, snippet):
-        """
-        Infer opportunity type from title and snippet
-        """
-        text = (title + ' ' + snippet).lower()
-        
-        # Type keywords
-        type_keywords = {
-            'hackathon': ['hackathon', 'hack'],
-            'internship': ['internship', 'intern', 'summer training'],
-            'fellowship': ['fellowship', 'scholar', 'grant'],
-            'scholarship': ['scholarship', 'financial aid'],
-            'competition': ['competition', 'contest', 'challenge'],
-            'program': ['program', 'workshop', 'bootcamp']
-        }
+        expired, deadline = date_extraction.is_expired(title, snippet)
         
-        for opp_type, keywords in type_keywords.items():
-            if any(keyword in text for keyword in keywords):
-                return opp_type
-        
-        return 'opportunity'
-    
+        if deadline:
+            yesterday = date.today() - timedelta(days=1)
+            print(f"🚫 Expired: {deadline} is before yesterday {yesterday}")
+        return expired
     
     def _get_mock_search_results(self, query):
         """
@@ -698,6 +648,7 @@ class OpportunityService:
         Updated with RECENT January 2026 active opportunities with future deadlines
         """
         return {
+            'is_mock': True,  # Never stored in the search cache
             'items': [
                 {
                     'title': 'Google AI Hackathon 2026 - Build with Gemini | Unstop',
@@ -0,0 +1,145 @@
+"""
+Passwords - Salted scrypt hashing with a bounded verification pool
+
+Hashes are stored as 'scrypt$<n>$<r>$<p>$<salt>$<hash>' (base64 salt/hash).
+Legacy unsalted SHA-256 hex digests are still accepted and reported as
+needing a rehash so login can upgrade them transparently.
+
+Hashing runs on a small dedicated thread pool (PASSWORD_HASH_WORKERS;
+hashlib.scrypt releases the GIL), and at most PASSWORD_HASH_QUEUE
+operations may be waiting at once, so a burst of logins gets a fast
+AuthBusyError instead of tying up every Flask worker.
+"""
+
+import base64
+import hashlib
+import hmac
+import os
+import re
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+_LEGACY_SHA256 = re.compile(r'^[0-9a-f]{64}$')
+
+# Built on first use so settings from .env are honoured
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class AuthBusyError(Exception):
+    """Raised when too many password operations are already queued"""
+
+
+def _b64(data):
+    return base64.b64encode(data).decode('ascii')
+
+
+def _scrypt(password, salt, n, r, p):
+    return hashlib.scrypt(
+        password.encode(),
+        salt=salt,
+        n=n, r=r, p=p,
+        maxmem=256 * n * r,
+        dklen=KEY_BYTES
+    )
+
+
+def scrypt_params():
+    """Current (n, r, p) cost, from PASSWORD_SCRYPT_N / _R / _P"""
+    return (
+        int(os.getenv('PASSWORD_SCRYPT_N', 2 ** 14)),
+        int(os.getenv('PASSWORD_SCRYPT_R', 8)),
+        int(os.getenv('PASSWORD_SCRYPT_P', 1))
+    )
+
+
+def is_legacy_hash(stored_hash):
+    """True for the old unsalted SHA-256 hex digests"""
+    return bool(stored_hash) and bool(_LEGACY_SHA256.match(stored_hash))
+
+
+def hash_password_sync(password):
+    """Hash on the calling thread (scripts and tests; requests use hash_password)"""
+    n, r, p = scrypt_params()
+    salt = secrets.token_bytes(SALT_BYTES)
+    key = _scrypt(password, salt, n, r, p)
+    return f"scrypt${n}${r}${p}${_b64(salt)}${_b64(key)}"
+
+
+def verify_password_sync(password, stored_hash):
+    """
+    Check a password against a stored hash on the calling thread
+
+    Returns:
+        Tuple of (matches, needs_rehash). needs_rehash is True for legacy
+        hashes and for scrypt hashes made with different cost parameters.
+    """
+    if not stored_hash:
+        return False, False
+
+    if is_legacy_hash(stored_hash):
+        legacy = hashlib.sha256(password.encode()).hexdigest()
+        matches = hmac.compare_digest(legacy, stored_hash)
+        return matches, matches
+
+    try:
+        scheme, n, r, p, salt, key = stored_hash.split('$')
+        n, r, p = int(n), int(r), int(p)
+        if scheme != 'scrypt':
+            return False, False
+        expected = base64.b64decode(key)
+        actual = _scrypt(password, base64.b64decode(salt), n, r, p)
+    except (ValueError, TypeError):
+        return False, False
+
+    matches = hmac.compare_digest(actual, expected)
+    needs_rehash = matches and (n, r, p) != scrypt_params()
+    return matches, needs_rehash
+
+
+def _get_pool():
+    """Executor plus a semaphore bounding running + queued operations"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = int(os.getenv('PASSWORD_HASH_WORKERS', 4))
+            queue = int(os.getenv('PASSWORD_HASH_QUEUE', 64))
+            _pool = (
+                ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash'),
+                threading.BoundedSemaphore(workers + queue),
+                float(os.getenv('PASSWORD_HASH_TIMEOUT', 10))
+            )
+        return _pool
+
+
+def _run_pooled(func, *args):
+    executor, slots, timeout = _get_pool()
+    if not slots.acquire(blocking=False):
+        raise AuthBusyError("Too many login attempts in progress, please retry shortly")
+    try:
+        future = executor.submit(func, *args)
+    except Exception:
+        slots.release()
+        raise
+    # Free the slot when the hash actually finishes, not when the caller
+    # gives up waiting, so timed-out work still counts against the queue
+    future.add_done_callback(lambda _: slots.release())
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeoutError:
+        raise AuthBusyError("Password check timed out under load, please retry shortly")
+
+
+def hash_password(password):
+    """Hash a new password on the bounded hashing pool"""
+    return _run_pooled(hash_password_sync, password)
+
+
+def verify_password(password, stored_hash):
+    """Verify a password on the bounded hashing pool; see verify_password_sync"""
+    return _run_pooled(verify_password_sync, password, stored_hash)
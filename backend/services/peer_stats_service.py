@@ -0,0 +1,419 @@
+"""
+Peer Stats Service - Pre-aggregated peer statistics for analytics and peer insights
+"""
+
+import os
+import random
+import threading
+import time
+from datetime import datetime
+
+from firebase_admin import firestore
+
+from .scheduler import PeriodicJob, claim_lease
+
+
+def _add_counter_deltas(rebuilt, before, current):
+    """
+    rebuilt plus (current - before) for every numeric counter, recursively
+
+    Counters that only exist in current (e.g. a histogram bucket created
+    during the scan) are carried over with their whole delta, and other
+    fields missing from rebuilt are kept.
+    """
+    result = dict(rebuilt)
+    for key, value in current.items():
+        if isinstance(value, bool):
+            continue
+        if isinstance(value, dict):
+            result[key] = _add_counter_deltas(
+                rebuilt.get(key) if isinstance(rebuilt.get(key), dict) else {},
+                before.get(key) if isinstance(before.get(key), dict) else {},
+                value
+            )
+        elif isinstance(value, (int, float)):
+            previous = before.get(key, 0)
+            delta = value - (previous if isinstance(previous, (int, float)) else 0)
+            if delta:
+                result[key] = rebuilt.get(key, 0) + delta
+        elif key not in result:
+            result[key] = value
+    return result
+
+
+def _sum_counters(docs):
+    """Add up the numeric counters of several documents, recursively (other fields: first wins)"""
+    total = {}
+    for doc in docs:
+        for key, value in doc.items():
+            previous = total.get(key)
+            if isinstance(value, dict):
+                total[key] = _sum_counters([previous if isinstance(previous, dict) else {}, value])
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                total[key] = (previous if isinstance(previous, (int, float)) else 0) + value
+            elif key not in total:
+                total[key] = value
+    return total
+
+
+class PeerStatsService:
+    """
+    Maintains pre-aggregated running sums, counts, per-college buckets and a
+    points histogram so peer comparisons are a few point reads instead of a
+    scan of the gamification and applications collections.
+
+    'stats/peer_stats' holds the totals from the last reconciliation.
+    Changes since then are applied with Firestore Increment to one of
+    PEER_STATS_SHARDS 'stats/peer_stats_shard_<k>' documents picked at
+    random, so point awards don't all contend for a single document; a
+    snapshot is the base document plus every shard. The periodic
+    reconciliation rebuilds the base from scratch and clears the shards.
+
+    Per-college buckets are only built by reconciliation: a user's college
+    is usually unknown when their stats are created and may change later,
+    so incremental college counts would drift.
+    """
+
+    STATS_COLLECTION = 'stats'
+    STATS_DOCUMENT = 'peer_stats'
+    SHARD_PREFIX = 'peer_stats_shard_'
+
+    def __init__(self, firebase_service):
+        """
+        Initialize Peer Stats Service
+
+        Args:
+            firebase_service: FirebaseService instance
+        """
+        self.firebase = firebase_service
+        self.db = firebase_service.db
+
+        self.snapshot_ttl = int(os.getenv('PEER_STATS_CACHE_TTL', 30))
+        self.reconcile_interval = int(os.getenv('PEER_STATS_RECONCILE_INTERVAL', 3600))
+        self.shard_count = max(1, int(os.getenv('PEER_STATS_SHARDS', 10)))
+        # Width (in points) of each points_histogram bucket
+        self.histogram_bucket = max(1, int(os.getenv('PEER_STATS_HISTOGRAM_BUCKET', 50)))
+
+        self._snapshot = None
+        self._snapshot_expires = 0
+        self._lock = threading.Lock()
+        self._job = None
+
+
+    # ========================================================================
+    # READS
+    # ========================================================================
+
+    def get_snapshot(self):
+        """
+        Get the aggregate document (cached in-process for snapshot_ttl seconds)
+
+        Builds the aggregate with a full reconciliation the first time it is
+        requested and does not exist yet (or was built with a different
+        histogram bucket width).
+
+        Returns:
+            Aggregate dictionary or None if Firebase is unavailable
+        """
+        if not self.firebase.firebase_enabled:
+            return None
+
+        with self._lock:
+            if self._snapshot is not None and time.monotonic() < self._snapshot_expires:
+                return self._snapshot
+
+        snapshot = self._read()
+        if snapshot is None or snapshot.get('histogram_bucket') != self.histogram_bucket:
+            snapshot = self.reconcile(force=True)
+
+        with self._lock:
+            self._snapshot = snapshot
+            self._snapshot_expires = time.monotonic() + self.snapshot_ttl
+
+        return snapshot
+
+
+    @staticmethod
+    def summarize(snapshot, points):
+        """
+        Derive averages, rank and percentile for a user from an aggregate
+
+        Args:
+            snapshot: Aggregate dictionary from get_snapshot()
+            points: The user's current total points
+
+        Returns:
+            Dictionary with total_users, user_rank, percentile and averages
+        """
+        user_count = snapshot.get('user_count', 0)
+        width = snapshot.get('histogram_bucket') or 1
+        own_bucket = points // width * width
+
+        users_above = 0
+        users_below = 0
+        for bucket, count in snapshot.get('points_histogram', {}).items():
+            bucket_points = int(bucket)
+            if bucket_points > own_bucket:
+                users_above += count
+            elif bucket_points < own_bucket:
+                users_below += count
+            elif count > 1:
+                # Assume the other users in the user's bucket are spread evenly across it
+                fraction = (points - bucket_points + 0.5) / width
+                users_below += (count - 1) * fraction
+                users_above += (count - 1) * (1 - fraction)
+
+        applicants = snapshot.get('applicant_count', 0)
+
+        return {
+            'total_users': user_count,
+            'user_rank': int(users_above) + 1,
+            'percentile': (users_below / user_count) * 100 if user_count else 0,
+            'avg_points': snapshot.get('points_sum', 0) / user_count if user_count else 0,
+            'avg_streak': snapshot.get('streak_sum', 0) / user_count if user_count else 0,
+            'avg_applications': snapshot.get('application_count', 0) / applicants if applicants else 0
+        }
+
+
+    # ========================================================================
+    # INCREMENTAL UPDATES
+    # ========================================================================
+
+    def record_user_created(self, user_id):
+        """Count a newly initialized gamification profile (0 points)"""
+        self.record_user_change(user_id, None, {'points': 0, 'streak': 0, 'achievements': 0})
+
+
+    def record_user_change(self, user_id, old, new):
+        """
+        Apply the difference between a user's old and new gamification stats
+
+        Args:
+            user_id: User whose stats changed
+            old: {'points', 'streak', 'achievements'} before the change, or None for a new user
+            new: The same keys after the change (missing keys are treated as unchanged)
+        """
+        if not self.firebase.firebase_enabled:
+            return
+
+        try:
+            is_new = old is None
+            old = old or {'points': 0, 'streak': 0, 'achievements': 0}
+            new = {**old, **new}
+
+            delta = {
+                'points_sum': new['points'] - old['points'],
+                'streak_sum': new['streak'] - old['streak'],
+                'achievements_sum': new['achievements'] - old['achievements']
+            }
+
+            update = {k: firestore.Increment(v) for k, v in delta.items() if v}
+            if is_new:
+                update['user_count'] = firestore.Increment(1)
+
+            old_bucket = self._histogram_key(old['points'])
+            new_bucket = self._histogram_key(new['points'])
+            histogram = {}
+            if is_new:
+                histogram[new_bucket] = firestore.Increment(1)
+            elif new_bucket != old_bucket:
+                histogram[old_bucket] = firestore.Increment(-1)
+                histogram[new_bucket] = firestore.Increment(1)
+            if histogram:
+                update['points_histogram'] = histogram
+
+            if update:
+                self._shard_ref().set(update, merge=True)
+
+        except Exception as e:
+            print(f"⚠️  Could not update peer stats for {user_id}: {e}")
+
+
+    def record_application(self, user_id):
+        """Count a newly created application (and a new applicant on their first one)"""
+        if not self.firebase.firebase_enabled:
+            return
+
+        try:
+            existing = self.db.collection('applications')\
+                .where(filter=firestore.FieldFilter('user_id', '==', user_id))\
+                .limit(2)\
+                .stream()
+            is_first = len(list(existing)) <= 1
+
+            update = {'application_count': firestore.Increment(1)}
+            if is_first:
+                update['applicant_count'] = firestore.Increment(1)
+
+            self._shard_ref().set(update, merge=True)
+
+        except Exception as e:
+            print(f"⚠️  Could not update peer stats for application by {user_id}: {e}")
+
+
+    # ========================================================================
+    # RECONCILIATION
+    # ========================================================================
+
+    def reconcile(self, force=False):
+        """
+        Rebuild the aggregate from the source collections
+
+        Skipped when another worker reconciled within the last interval,
+        unless force is set.
+
+        Returns:
+            The aggregate dictionary that is now stored (or the existing one if skipped)
+        """
+        doc_ref = self._doc_ref()
+
+        # One worker per interval; the others keep the stored aggregate
+        if not claim_lease(self.db, doc_ref, self.reconcile_interval, field='reconcile_started_at', force=force):
+            return self._read()
+
+        print("🔄 Reconciling peer statistics...")
+
+        # Shard counters as they were before the scan (see _store_reconciled)
+        before = _sum_counters(doc.to_dict() for doc in self.db.get_all(self._shard_refs()) if doc.exists)
+
+        gami_docs = list(self.db.collection('gamification')
+                         .select(['total_points', 'login_streak', 'achievements'])
+                         .stream())
+        profiles = self.firebase.get_profile_summaries((doc.id for doc in gami_docs), use_cache=False)
+
+        stats = {
+            'user_count': 0,
+            'points_sum': 0,
+            'streak_sum': 0,
+            'achievements_sum': 0,
+            'application_count': 0,
+            'applicant_count': 0,
+            'points_histogram': {},
+            'histogram_bucket': self.histogram_bucket,
+            'colleges': {}
+        }
+
+        for doc in gami_docs:
+            data = doc.to_dict()
+            points = data.get('total_points', 0)
+            streak = data.get('login_streak', 0)
+            achievements = len(data.get('achievements', []))
+
+            stats['user_count'] += 1
+            stats['points_sum'] += points
+            stats['streak_sum'] += streak
+            stats['achievements_sum'] += achievements
+
+            bucket = self._histogram_key(points)
+            stats['points_histogram'][bucket] = stats['points_histogram'].get(bucket, 0) + 1
+
+            college = (profiles.get(doc.id) or {}).get('college')
+            if college:
+                college_stats = stats['colleges'].setdefault(self.college_key(college), {
+                    'name': college,
+                    'user_count': 0,
+                    'points_sum': 0,
+                    'streak_sum': 0,
+                    'achievements_sum': 0
+                })
+                college_stats['user_count'] += 1
+                college_stats['points_sum'] += points
+                college_stats['streak_sum'] += streak
+                college_stats['achievements_sum'] += achievements
+
+        applicants = set()
+        for app in self.db.collection('applications').select(['user_id']).stream():
+            stats['application_count'] += 1
+            applicants.add(app.to_dict().get('user_id'))
+        stats['applicant_count'] = len(applicants)
+
+        stats = self._store_reconciled(doc_ref, stats, before)
+
+        with self._lock:
+            self._snapshot = stats
+            self._snapshot_expires = time.monotonic() + self.snapshot_ttl
+
+        print(f"✓ Peer statistics reconciled ({stats['user_count']} users, {stats['application_count']} applications)")
+        return stats
+
+
+    def _store_reconciled(self, doc_ref, stats, before):
+        """
+        Write a rebuilt aggregate without losing concurrent increments
+
+        record_* calls keep applying Increments to the shards while the scan
+        runs. In one transaction, whatever the shards gained since 'before'
+        is added on top of the rebuilt values, that becomes the new base
+        document and the shards are cleared, so no increment is dropped. An
+        update the scan already saw may be counted twice; the next
+        reconcile corrects that.
+
+        Returns:
+            The aggregate as stored
+        """
+        shard_refs = self._shard_refs()
+
+        @firestore.transactional
+        def store(transaction):
+            base = doc_ref.get(transaction=transaction)
+            shards = self.db.get_all(shard_refs, transaction=transaction)
+            current = _sum_counters(doc.to_dict() for doc in shards if doc.exists)
+
+            merged = _add_counter_deltas(stats, before, current)
+            now = datetime.now().isoformat()
+            merged['reconcile_started_at'] = (base.to_dict() or {}).get('reconcile_started_at') if base.exists else now
+            merged['reconciled_at'] = now
+            merged['updated_at'] = now
+
+            transaction.set(doc_ref, merged)
+            for ref in shard_refs:
+                transaction.delete(ref)
+            return merged
+
+        return store(self.db.transaction())
+
+
+    def start_reconciliation(self):
+        """Start the periodic reconciliation job (PEER_STATS_RECONCILE_INTERVAL seconds)"""
+        if not self.firebase.firebase_enabled or self._job:
+            return self._job
+        self._job = PeriodicJob('peer-stats-reconcile', self.reconcile_interval, self.reconcile).start()
+        return self._job
+
+
+    # ========================================================================
+    # PRIVATE HELPER METHODS
+    # ========================================================================
+
+    def _doc_ref(self):
+        return self.db.collection(self.STATS_COLLECTION).document(self.STATS_DOCUMENT)
+
+
+    def _shard_refs(self):
+        collection = self.db.collection(self.STATS_COLLECTION)
+        return [collection.document(f"{self.SHARD_PREFIX}{k}") for k in range(self.shard_count)]
+
+
+    def _shard_ref(self):
+        shard = random.randrange(self.shard_count)
+        return self.db.collection(self.STATS_COLLECTION).document(f"{self.SHARD_PREFIX}{shard}")
+
+
+    def _read(self):
+        """Base document plus every shard, or None if the base doesn't exist yet"""
+        base = self._doc_ref().get()
+        if not base.exists:
+            return None
+        shards = self.db.get_all(self._shard_refs())
+        return _sum_counters([base.to_dict()] + [doc.to_dict() for doc in shards if doc.exists])
+
+
+    def _histogram_key(self, points):
+        """points_histogram key: the start of the bucket the points fall in"""
+        return str(points // self.histogram_bucket * self.histogram_bucket)
+
+
+    @staticmethod
+    def college_key(college):
+        """Map a college name to a safe Firestore map key"""
+        return ''.join(c if c.isalnum() else '_' for c in college.strip().lower())
@@ -5,9 +5,9 @@ Profile Service - Handles resume parsing and profile management
 import PyPDF2
 import io
 import re
-import google.generativeai as genai
-import os
-import json
+
+from .llm_client_pool import get_client_pool
+from .llm_json import LLMJSONError, json_generation_config, parse_json
 
 
 class ProfileService:
@@ -20,53 +20,38 @@ class ProfileService:
         """
         self.firebase = firebase_service
         
-        # Configure Gemini API with load balancing
-        gemini_key = os.getenv('GEMINI_API_KEY')
-        gemini_key_2 = os.getenv('GEMINI_API_KEY_2')
-        
-        # Setup key rotation for load balancing
-        self.api_keys = [k for k in [gemini_key, gemini_key_2] if k]
-        if not self.api_keys:
-            print("⚠️  Warning: No GEMINI_API_KEY configured")
-        elif len(self.api_keys) == 2:
-            print(f"✓ Load balancing enabled with {len(self.api_keys)} Gemini API keys")
-        
-        self.current_key_index = 0
-        self._configure_current_key()
-    
-    def _configure_current_key(self):
-        """Configure Gemini with current API key"""
-        if self.api_keys:
-            genai.configure(api_key=self.api_keys[self.current_key_index])
-            self.model = genai.GenerativeModel('gemini-2.5-flash')
+        # Shared Gemini client pool (per-key clients and rate limits)
+        self.llm = get_client_pool()
     
-    def _rotate_key(self):
-        """Rotate to next API key for load balancing"""
-        if len(self.api_keys) > 1:
-            self.current_key_index = (self.current_key_index + 1) % len(self.api_keys)
-            self._configure_current_key()
     
-    
-    def parse_and_create_profile(self, resume_file):
+    def parse_and_create_profile(self, resume_file, progress=None):
         """
         Parse resume PDF and create structured profile
         
         Args:
-            resume_file: FileStorage object from Flask
+            resume_file: FileStorage object from Flask (or any file-like object)
+            progress: Optional callable(stage) told 'extracting', 'parsing',
+                      'evaluating' and 'saving' as each step starts
         
         Returns:
             Dictionary with profile_id, profile_data, resume_summary, and resume_grade
         """
+        progress = progress or (lambda stage: None)
+        
         # Extract text from PDF
+        progress('extracting')
         resume_text = self._extract_text_from_pdf(resume_file)
         
         # Use Gemini to parse resume into structured format
+        progress('parsing')
         profile_data = self._parse_resume_with_gemini(resume_text)
         
         # Generate resume evaluation (summary and grade)
+        progress('evaluating')
         evaluation = self._evaluate_resume(resume_text, profile_data)
         
         # Store in Firebase
+        progress('saving')
         result = self.firebase.create_student_profile(profile_data, resume_text)
         
         # Add evaluation to result
@@ -196,33 +181,21 @@ CRITICAL RULES:
         try:
             print(f"📄 Parsing resume with Gemini (length: {len(resume_text)} chars)")
             
-            response = self.model.generate_content(
+            response = self.llm.generate_content(
                 prompt,
-                generation_config={
-                    "temperature": 0.1,  # Lower temperature for more accurate extraction
-                    "max_output_tokens": 2048,
-                }
+                generation_config=json_generation_config(
+                    temperature=0.1,  # Lower temperature for more accurate extraction
+                    max_output_tokens=2048,
+                )
             )
             
-            # Rotate API key for load balancing
-            self._rotate_key()
-            
             # Extract JSON from response
             response_text = response.text.strip()
             print(f"✓ Gemini responded (length: {len(response_text)} chars)")
             print(f"Response preview: {response_text[:200]}...")
             
-            # Remove markdown code block if present
-            if response_text.startswith('```'):
-                response_text = re.sub(r'^```(?:json)?\n', '', response_text)
-                response_text = re.sub(r'\n```$', '', response_text)
-            
-            # Fix common JSON issues
-            response_text = re.sub(r',\s*}', '}', response_text)  # Remove trailing commas before }
-            response_text = re.sub(r',\s*]', ']', response_text)  # Remove trailing commas before ]
-            
-            # Parse JSON
-            profile_data = json.loads(response_text)
+            # Parse JSON (fences, trailing commas and truncation are repaired)
+            profile_data = parse_json(response_text, expect=dict, source='resume_parse')
             
             # Validate we got actual data
             has_content = False
@@ -240,7 +213,7 @@ CRITICAL RULES:
             print(f"✓ Successfully parsed resume with content")
             return profile_data
             
-        except json.JSONDecodeError as e:
+        except LLMJSONError as e:
             print(f"❌ JSON parsing failed: {e}")
             print(f"Response was: {response_text[:500] if 'response_text' in locals() else 'No response'}")
             return self._create_fallback_profile(resume_text)
@@ -405,27 +378,15 @@ Be honest about the grade - most student resumes are B/B+, not A+. Return ONLY t
         try:
             print("📊 Evaluating resume with Gemini...")
             
-            response = self.model.generate_content(
+            response = self.llm.generate_content(
                 prompt,
-                generation_config={
-                    "temperature": 0.3,
-                    "max_output_tokens": 1024,
-                }
+                generation_config=json_generation_config(
+                    temperature=0.3,
+                    max_output_tokens=1024,
+                )
             )
             
-            self._rotate_key()
-            
-            response_text = response.text.strip()
-            
-            # Clean up response
-            if response_text.startswith('```'):
-                response_text = re.sub(r'^```(?:json)?\n', '', response_text)
-                response_text = re.sub(r'\n```$', '', response_text)
-            
-            response_text = re.sub(r',\s*}', '}', response_text)
-            response_text = re.sub(r',\s*]', ']', response_text)
-            
-            evaluation = json.loads(response_text)
+            evaluation = parse_json(response.text, expect=dict, source='resume_evaluation')
             
             print(f"✓ Resume evaluated: Grade {evaluation.get('grade', 'N/A')}")
             
@@ -4,47 +4,168 @@ Analyzes student eligibility and generates guidance
 """
 
 import os
-import google.generativeai as genai
 import json
-import re
-from typing import Dict, List
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from .date_extraction import parse_deadline
+from .firebase_service import is_provisional_reasoning
+from .llm_client_pool import get_client_pool
+from .llm_json import LLMJSONError, json_generation_config, parse_json, record_retry
+
+
+# Bump when _build_reasoning_prompt changes so cached analyses aren't reused
+REASONING_PROMPT_VERSION = 1
+
+# eligibility_status of _create_fallback_analysis (never cached by fingerprint)
+FALLBACK_STATUS = 'Review Required'
+
+# Seconds before a provisional verdict whose Gemini fill failed is tried again
+PROVISIONAL_RETRY_SECONDS = 60
+
+# Structured opportunity fields ProfileService.calculate_eligibility_score reads;
+# without any of them its score is mostly defaults and says nothing
+PRESCREEN_FIELDS = ['education_requirement', 'required_skills', 'experience_years', 'location']
+
+# Score breakdown entry -> (max points, sentence when met, sentence when not met)
+PRESCREEN_CRITERIA = {
+    'education_match': (25, "Your education matches what this opportunity asks for",
+                        "Your degree may not match the education requirement"),
+    'skills_match': (25, "You have the skills listed in the requirements",
+                     "You are missing some of the required skills"),
+    'experience_match': (20, "You have the experience this opportunity expects",
+                         "You need more hands-on experience than your profile shows"),
+    'location_match': (10, "Your location fits this opportunity",
+                       "Your location may not match where this opportunity is held"),
+}
+
+
+# Shared by the single and packed eligibility prompts
+REASONING_PROMPT_ROLE = """You are an expert career advisor and opportunity analyst specializing in helping students in Tier-2 and Tier-3 colleges in India understand their eligibility for opportunities.
+
+Your role is NOT to gatekeep, but to:
+- Explain eligibility transparently
+- Identify gaps constructively
+- Provide actionable guidance
+- Encourage growth mindset"""
+
+ANALYSIS_JSON_STRUCTURE = """{
+  "eligibility_status": "<one of: Eligible | Partially Eligible | Not Yet Eligible>",
+  "reasons_met": [
+    "List each criterion YOU MEET with specific evidence from your profile. Use 2nd person: 'You have...', 'Your experience...'"
+  ],
+  "reasons_not_met": [
+    "List each criterion YOU DO NOT MEET with clear explanation. Use 2nd person: 'You need...', 'Your profile lacks...'"
+  ],
+  "missing_skills": [
+    "Specific technical or soft skills you need to acquire. Use 2nd person."
+  ],
+  "missing_experience": [
+    "Types of experience you lack (projects, internships, leadership, etc.). Use 2nd person."
+  ],
+  "confidence_score": <integer 0-100>,
+  "explanation_simple": "<2-3 sentence plain English explanation directly addressing the student using 'you' and 'your'>",
+  "next_steps": [
+    {
+      "action": "<Specific, actionable step>",
+      "reason": "<Why this matters for this opportunity>",
+      "time_estimate": "<Realistic timeframe: e.g., '2-3 weeks', '1 month', '3-6 months'>"
+    }
+  ]
+}"""
+
+REASONING_PROMPT_RULES = """CRITICAL RULES:
+1. ALWAYS use SECOND PERSON (you, your) when addressing the student - NEVER third person (the student, they)
+2. NEVER say just "not eligible" without explanation
+3. Be encouraging, not discouraging—frame gaps as development opportunities
+4. Use simple, mentor-like language (avoid academic jargon)
+5. Be specific about what's missing (not vague like "improve skills")
+6. If criteria are ambiguous, interpret generously in favor of the student
+7. If confidence is low (<60), acknowledge uncertainty in explanation
+8. Focus next_steps on skill-building, project ideas, or community engagement
+9. Keep explanation_simple under 100 words
+10. Limit next_steps to 3-5 most impactful actions
+11. Always output valid, parseable JSON"""
+
+
+def _normalize(value):
+    """Collapse whitespace in strings, recursively, so cosmetic edits hash the same"""
+    if isinstance(value, str):
+        return ' '.join(value.split())
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def reasoning_prompt_inputs(opportunity: Dict) -> Dict:
+    """The opportunity fields _build_reasoning_prompt actually uses"""
+    return {
+        'title': opportunity.get('title', 'Unknown Opportunity'),
+        'organizer': opportunity.get('organizer', 'Unknown Organizer'),
+        'eligibility_text': opportunity.get('eligibility_text', opportunity.get('snippet', ''))
+    }
+
+
+def reasoning_fingerprint(profile_data: Dict, opportunity: Dict) -> str:
+    """
+    Stable hash of everything that goes into an eligibility prompt
+    
+    Independent of profile_id and opportunity_id, so an identical resume
+    uploaded again or a duplicate opportunity maps to the same analysis.
+    """
+    payload = json.dumps(
+        {
+            'version': REASONING_PROMPT_VERSION,
+            'profile': _normalize(profile_data),
+            'opportunity': _normalize(reasoning_prompt_inputs(opportunity))
+        },
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
 
 
 class ReasoningService:
-    def __init__(self, firebase_service):
+    def __init__(self, firebase_service, profile_service=None):
         """
         Initialize Reasoning Service with Gemini AI
         
         Args:
             firebase_service: FirebaseService instance
+            profile_service: ProfileService instance (rule-based pre-screen; optional)
         """
         self.firebase = firebase_service
+        self.profile_service = profile_service
         
-        # Configure Gemini API with load balancing
-        gemini_key = os.getenv('GEMINI_API_KEY')
-        gemini_key_2 = os.getenv('GEMINI_API_KEY_2')
+        # Shared Gemini client pool (per-key clients and rate limits)
+        self.llm = get_client_pool()
         
-        # Setup key rotation for load balancing
-        self.api_keys = [k for k in [gemini_key, gemini_key_2] if k]
-        if not self.api_keys:
-            print("⚠️  Warning: No GEMINI_API_KEY configured")
-        elif len(self.api_keys) == 2:
-            print(f"✓ Load balancing enabled with {len(self.api_keys)} Gemini API keys")
+        # Concurrent Gemini calls allowed per key for batch analysis
+        self.max_concurrency_per_key = int(os.getenv('GEMINI_MAX_CONCURRENCY_PER_KEY', 4))
         
-        self.current_key_index = 0
-        self._configure_current_key()
-    
-    def _configure_current_key(self):
-        """Configure Gemini with current API key"""
-        if self.api_keys:
-            genai.configure(api_key=self.api_keys[self.current_key_index])
-            self.model = genai.GenerativeModel('gemini-2.5-flash')
-    
-    def _rotate_key(self):
-        """Rotate to next API key for load balancing"""
-        if len(self.api_keys) > 1:
-            self.current_key_index = (self.current_key_index + 1) % len(self.api_keys)
-            self._configure_current_key()
+        # Opportunities analyzed per Gemini request in batch mode (1 disables packing)
+        self.batch_pack_size = int(os.getenv('REASONING_BATCH_PACK_SIZE', 5))
+        
+        # Pre-screen: clear matches/mismatches get an instant provisional verdict,
+        # and scores below the skip threshold never reach Gemini (0 disables)
+        self.prescreen_match_score = int(os.getenv('REASONING_PRESCREEN_MATCH_SCORE', 85))
+        self.prescreen_mismatch_score = int(os.getenv('REASONING_PRESCREEN_MISMATCH_SCORE', 40))
+        self.prescreen_skip_llm_below = int(os.getenv('REASONING_PRESCREEN_SKIP_LLM_BELOW', 0))
+        
+        # Background Gemini calls that replace provisional verdicts
+        self._fill_executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv('REASONING_PRESCREEN_FILL_WORKERS', 2)),
+            thread_name_prefix='reasoning-fill'
+        )
+        self._filling = set()
+        self._fill_failed = {}  # (profile_id, opportunity_id) -> monotonic time of the last failed fill
+        self._fill_lock = threading.Lock()
     
     
     def analyze_eligibility(self, profile_id: str, opportunity_id: str) -> Dict:
@@ -71,24 +192,31 @@ class ReasoningService:
             
             print(f"Analyzing eligibility for profile {profile_id} and opportunity {opportunity_id}")
             
-            # Perform AI reasoning
-            analysis = self._perform_gemini_reasoning(
-                profile['profile'],
-                opportunity
-            )
+            # Same profile and opportunity content analyzed before (any IDs)?
+            fingerprint = reasoning_fingerprint(profile['profile'], opportunity)
+            analysis = self.firebase.get_reasoning_by_fingerprint(fingerprint)
             
-            if not analysis:
-                print("Warning: Gemini returned empty analysis, using fallback")
-                analysis = self._create_fallback_analysis()
+            if analysis:
+                print(f"♻️  Reusing analysis for fingerprint {fingerprint[:12]}")
+                return self.firebase.create_reasoning_result(
+                    profile_id,
+                    opportunity_id,
+                    analysis,
+                    fingerprint=fingerprint
+                )
             
-            # Store result in Firebase
-            result = self.firebase.create_reasoning_result(
-                profile_id,
-                opportunity_id,
-                analysis
-            )
+            # Clear cases get a rule-based verdict now, Gemini fills in later
+            verdict = self._prescreen(profile['profile'], opportunity)
+            if verdict:
+                analysis, needs_llm = verdict
+                print(f"⚡ Pre-screen verdict: {analysis['eligibility_status']} "
+                      f"({'provisional' if needs_llm else 'final'})")
+                result = self.firebase.create_reasoning_result(profile_id, opportunity_id, analysis)
+                if needs_llm:
+                    self._fill_in_background(profile_id, opportunity_id, profile['profile'], opportunity, fingerprint)
+                return result
             
-            return result
+            return self._reason_with_gemini(profile_id, opportunity_id, profile['profile'], opportunity, fingerprint)
             
         except Exception as e:
             print(f"Error in analyze_eligibility: {str(e)}")
@@ -114,47 +242,161 @@ class ReasoningService:
         """
         Analyze eligibility for multiple opportunities at once
         
+        Cached results are looked up in bulk first. The rest are packed
+        REASONING_BATCH_PACK_SIZE to a Gemini request (see _analyze_packed);
+        whatever packing can't answer runs as single analyses in parallel on
+        a pool bounded by GEMINI_MAX_CONCURRENCY_PER_KEY per configured API key.
+        
         Args:
             profile_id: Student profile ID
             opportunity_ids: List of opportunity IDs
         
         Returns:
-            List of analysis results
+            List of analysis results, in the same order as opportunity_ids
         """
-        results = []
+        results = [None] * len(opportunity_ids)
+        
+        try:
+            cached = self.firebase.get_cached_reasonings(profile_id, opportunity_ids)
+        except Exception as e:
+            print(f"⚠️  Bulk reasoning cache lookup failed: {e}")
+            cached = {}
         
-        for opp_id in opportunity_ids:
+        pending = []
+        for i, opp_id in enumerate(opportunity_ids):
+            if opp_id in cached:
+                if is_provisional_reasoning(cached[opp_id]):
+                    self._fill_in_background(profile_id, opp_id)
+                results[i] = {
+                    'opportunity_id': opp_id,
+                    'analysis': cached[opp_id]['analysis'],
+                    'cached': True
+                }
+            else:
+                pending.append(i)
+        
+        if not pending:
+            return results
+        
+        if self.batch_pack_size > 1 and len(pending) > 1:
             try:
-                # Check cache first
-                cached = self.get_cached_reasoning(profile_id, opp_id)
-                if cached:
-                    results.append({
-                        'opportunity_id': opp_id,
-                        'analysis': cached['analysis'],
-                        'cached': True
-                    })
-                else:
-                    # Perform new analysis
-                    analysis = self.analyze_eligibility(profile_id, opp_id)
-                    results.append({
-                        'opportunity_id': opp_id,
-                        'analysis': analysis,
-                        'cached': False
-                    })
+                pending = self._analyze_packed(profile_id, opportunity_ids, pending, results)
             except Exception as e:
-                results.append({
+                print(f"⚠️  Packed reasoning failed, analyzing one by one: {e}")
+                pending = [i for i in pending if results[i] is None]
+            
+            if not pending:
+                return results
+        
+        def analyze(i):
+            opp_id = opportunity_ids[i]
+            try:
+                return {
+                    'opportunity_id': opp_id,
+                    'analysis': self.analyze_eligibility(profile_id, opp_id),
+                    'cached': False
+                }
+            except Exception as e:
+                return {
                     'opportunity_id': opp_id,
                     'error': str(e)
-                })
+                }
+        
+        max_workers = min(len(pending), self.max_concurrency_per_key * max(1, len(self.llm)))
+        print(f"🔀 Analyzing {len(pending)} opportunities with {max_workers} workers "
+              f"({len(opportunity_ids) - len(pending)} cached or packed)")
+        
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='reasoning') as executor:
+            for i, result in zip(pending, executor.map(analyze, pending)):
+                results[i] = result
         
         return results
     
     
+    def _analyze_packed(self, profile_id: str, opportunity_ids: List[str], pending: List[int],
+                        results: List[Dict]) -> List[int]:
+        """
+        Analyze pending opportunities several at a time, one profile per prompt
+        
+        Opportunities the fingerprint cache or the pre-screen can answer are
+        left to analyze_eligibility, as are packed items that come back
+        missing or fail _validate_analysis_structure.
+        
+        Returns:
+            Indexes into opportunity_ids that still need a single analysis
+        """
+        profile = self.firebase.get_student_profile(profile_id)
+        if not profile:
+            return pending
+        profile_data = profile['profile']
+        
+        leftover = []
+        packable = {}  # opportunity_id -> (opportunity, fingerprint, result indexes)
+        for i in pending:
+            opp_id = opportunity_ids[i]
+            if opp_id in packable:
+                packable[opp_id][2].append(i)
+                continue
+            
+            opportunity = self.firebase.get_opportunity(opp_id)
+            if not opportunity:
+                leftover.append(i)
+                continue
+            
+            fingerprint = reasoning_fingerprint(profile_data, opportunity)
+            if self.firebase.get_reasoning_by_fingerprint(fingerprint) or self._prescreen(profile_data, opportunity):
+                leftover.append(i)
+                continue
+            
+            packable[opp_id] = (opportunity, fingerprint, [i])
+        
+        if len(packable) < 2:
+            return pending
+        
+        items = list(packable.items())
+        packs = [items[j:j + self.batch_pack_size] for j in range(0, len(items), self.batch_pack_size)]
+        
+        def run(pack):
+            return pack, self._perform_packed_gemini_reasoning(profile_data, [entry[0] for _, entry in pack])
+        
+        max_workers = min(len(packs), self.max_concurrency_per_key * max(1, len(self.llm)))
+        print(f"📦 Packing {len(items)} opportunities into {len(packs)} Gemini requests")
+        
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='reasoning-pack') as executor:
+            for pack, analyses in executor.map(run, packs):
+                for (opp_id, (opportunity, fingerprint, indexes)), analysis in zip(pack, analyses):
+                    if analysis is None:
+                        leftover.extend(indexes)
+                        continue
+                    
+                    self.firebase.store_reasoning_fingerprint(fingerprint, analysis)
+                    result = self.firebase.create_reasoning_result(
+                        profile_id,
+                        opp_id,
+                        analysis,
+                        fingerprint=fingerprint
+                    )
+                    for i in indexes:
+                        results[i] = {
+                            'opportunity_id': opp_id,
+                            'analysis': result,
+                            'cached': False
+                        }
+        
+        return sorted(leftover)
+    
+    
     def get_cached_reasoning(self, profile_id: str, opportunity_id: str):
         """
         Check if reasoning already exists (cached)
+        
+        A provisional verdict is still returned, but its Gemini analysis is
+        queued again in case the earlier fill failed or ran on another worker.
         """
-        return self.firebase.get_cached_reasoning(profile_id, opportunity_id)
+        result = self.firebase.get_cached_reasoning(profile_id, opportunity_id)
+        if result and is_provisional_reasoning(result):
+            self._fill_in_background(profile_id, opportunity_id)
+        return result
     
     
     def get_reasoning_by_id(self, reasoning_id: str):
@@ -164,10 +406,212 @@ class ReasoningService:
         return self.firebase.get_reasoning_result(reasoning_id)
     
     
+    # ========================================================================
+    # RULE-BASED PRE-SCREEN
+    # ========================================================================
+    
+    def _prescreen(self, profile_data: Dict, opportunity: Dict) -> Optional[Tuple[Dict, bool]]:
+        """
+        Rule-based verdict for clear cases, before paying for Gemini
+        
+        A passed deadline is final. Otherwise the opportunity needs structured
+        requirements (PRESCREEN_FIELDS) for ProfileService to score against;
+        scores at either end give a provisional verdict that Gemini replaces.
+        
+        Returns:
+            (analysis, needs_llm), or None when the case isn't clear
+        """
+        if self._deadline_passed(opportunity):
+            return self._create_closed_analysis(opportunity.get('deadline')), False
+        
+        if not self.profile_service or not any(opportunity.get(field) for field in PRESCREEN_FIELDS):
+            return None
+        
+        try:
+            score = self.profile_service.calculate_eligibility_score(profile_data, opportunity)
+        except Exception as e:
+            print(f"⚠️  Eligibility pre-screen failed: {e}")
+            return None
+        
+        total = score['total_score']
+        if total < self.prescreen_skip_llm_below:
+            return self._create_prescreen_analysis(score, 'Not Yet Eligible', provisional=False), False
+        if total >= self.prescreen_match_score:
+            return self._create_prescreen_analysis(score, 'Eligible', provisional=True), True
+        if total <= self.prescreen_mismatch_score:
+            return self._create_prescreen_analysis(score, 'Not Yet Eligible', provisional=True), True
+        return None
+    
+    
+    def _deadline_passed(self, opportunity: Dict) -> bool:
+        """Whether the opportunity has closed (flagged by the crawler or by its deadline)"""
+        if opportunity.get('is_expired'):
+            return True
+        
+        deadline_date = parse_deadline(opportunity.get('deadline'))
+        # Same one-day grace as date_extraction.is_expired (time zones)
+        return bool(deadline_date and deadline_date < date.today() - timedelta(days=1))
+    
+    
+    def _fill_in_background(self, profile_id, opportunity_id, profile_data=None, opportunity=None,
+                            fingerprint=None):
+        """
+        Replace a provisional verdict with the Gemini analysis once it's ready
+        
+        Without profile_data/opportunity (a provisional result served from
+        the cache) both are loaded in the worker. A pair whose fill failed is
+        not retried for PROVISIONAL_RETRY_SECONDS.
+        """
+        key = (profile_id, opportunity_id)
+        with self._fill_lock:
+            failed_at = self._fill_failed.get(key)
+            if key in self._filling or (failed_at and time.monotonic() - failed_at < PROVISIONAL_RETRY_SECONDS):
+                return
+            self._filling.add(key)
+        
+        def fill():
+            result = None
+            try:
+                nonlocal profile_data, opportunity, fingerprint
+                if profile_data is None or opportunity is None:
+                    profile = self.firebase.get_student_profile(profile_id)
+                    opportunity = self.firebase.get_opportunity(opportunity_id)
+                    if not profile or not opportunity:
+                        return
+                    profile_data = profile['profile']
+                    fingerprint = reasoning_fingerprint(profile_data, opportunity)
+                
+                result = self._reason_with_gemini(profile_id, opportunity_id, profile_data, opportunity,
+                                                  fingerprint, keep_fallback=False)
+            except Exception as e:
+                print(f"⚠️  Background eligibility analysis failed: {e}")
+            finally:
+                with self._fill_lock:
+                    self._filling.discard(key)
+                    if result is None:
+                        now = time.monotonic()
+                        self._fill_failed = {
+                            k: t for k, t in self._fill_failed.items() if now - t < PROVISIONAL_RETRY_SECONDS
+                        }
+                        self._fill_failed[key] = now
+                    else:
+                        self._fill_failed.pop(key, None)
+        
+        self._fill_executor.submit(fill)
+    
+    
+    def _create_prescreen_analysis(self, score: Dict, status: str, provisional: bool) -> Dict:
+        """Analysis in the Gemini structure, built from calculate_eligibility_score"""
+        breakdown = score['breakdown']
+        reasons_met = []
+        reasons_not_met = []
+        for criterion, (max_points, met, not_met) in PRESCREEN_CRITERIA.items():
+            if breakdown.get(criterion, 0) >= max_points:
+                reasons_met.append(met)
+            else:
+                reasons_not_met.append(not_met)
+        
+        missing_skills = [
+            skill
+            for gap in score.get('missing_requirements', [])
+            if gap.get('category') == 'Skills'
+            for skill in gap.get('missing', [])
+        ]
+        missing_experience = []
+        if breakdown.get('experience_match', 0) < PRESCREEN_CRITERIA['experience_match'][0]:
+            missing_experience.append("Projects or internships relevant to this opportunity")
+        
+        next_steps = [
+            {
+                "action": f"Learn {skill} through a small hands-on project",
+                "reason": "It is listed in the requirements and missing from your profile",
+                "time_estimate": "2-4 weeks"
+            }
+            for skill in missing_skills[:3]
+        ]
+        next_steps.append({
+            "action": "Review the full requirements on the official page",
+            "reason": "This quick check only covers the listed requirements",
+            "time_estimate": "30 minutes"
+        })
+        
+        explanation = f"Based on a quick check of your profile against the listed requirements: {score['recommendation']}."
+        if provisional:
+            explanation += " A detailed analysis will replace this shortly."
+        
+        return {
+            "eligibility_status": status,
+            "reasons_met": reasons_met,
+            "reasons_not_met": reasons_not_met,
+            "missing_skills": missing_skills,
+            "missing_experience": missing_experience,
+            "confidence_score": score['total_score'],
+            "explanation_simple": explanation,
+            "next_steps": next_steps,
+            "provisional": provisional,
+            "prescreen_score": score['total_score']
+        }
+    
+    
+    def _create_closed_analysis(self, deadline: Optional[str]) -> Dict:
+        """Final analysis for an opportunity whose deadline has passed"""
+        if deadline and deadline != 'Not specified':
+            reason = f"The application deadline ({deadline}) has passed"
+        else:
+            reason = "Applications for this opportunity have closed"
+        
+        return {
+            "eligibility_status": "Not Yet Eligible",
+            "reasons_met": [],
+            "reasons_not_met": [reason],
+            "missing_skills": [],
+            "missing_experience": [],
+            "confidence_score": 95,
+            "explanation_simple": "Applications for this opportunity have closed, so you can't apply this round. Many opportunities run every year, so use the time to strengthen your profile for the next edition.",
+            "next_steps": [
+                {
+                    "action": "Look for the next edition or similar opportunities that are still open",
+                    "reason": "This round is closed, but recurring programs reopen",
+                    "time_estimate": "1 hour"
+                }
+            ],
+            "provisional": False
+        }
+    
+    
     # ========================================================================
     # CORE AI REASONING WITH GEMINI
     # ========================================================================
     
+    def _reason_with_gemini(self, profile_id, opportunity_id, profile_data, opportunity, fingerprint,
+                            keep_fallback=True):
+        """
+        Run Gemini reasoning, remember it by fingerprint and store the result
+        
+        With keep_fallback=False a failed analysis is not stored (so a
+        provisional verdict stays in place) and None is returned.
+        """
+        analysis = self._perform_gemini_reasoning(profile_data, opportunity)
+        
+        if not analysis:
+            print("Warning: Gemini returned empty analysis, using fallback")
+            analysis = self._create_fallback_analysis()
+        
+        if analysis.get('eligibility_status') == FALLBACK_STATUS:
+            if not keep_fallback:
+                return None
+        else:
+            self.firebase.store_reasoning_fingerprint(fingerprint, analysis)
+        
+        # Store result in Firebase
+        return self.firebase.create_reasoning_result(
+            profile_id,
+            opportunity_id,
+            analysis,
+            fingerprint=fingerprint
+        )
+    
+    
     def _perform_gemini_reasoning(self, profile_data: Dict, opportunity: Dict) -> Dict:
         """
         Use Gemini API to perform eligibility reasoning
@@ -191,52 +635,24 @@ class ReasoningService:
                 print(f"🤖 Calling Gemini API for eligibility analysis (attempt {attempt + 1}/{max_retries})...")
                 
                 # Call Gemini API with stricter config for JSON
-                response = self.model.generate_content(
+                response = self.llm.generate_content(
                     prompt,
-                    generation_config={
-                        "temperature": 0.3,  # Lower temp for more consistent JSON
-                        "max_output_tokens": 4096,  # Increased to prevent truncation
-                    }
+                    generation_config=json_generation_config(
+                        temperature=0.3,  # Lower temp for more consistent JSON
+                        max_output_tokens=4096,  # Increased to prevent truncation
+                    )
                 )
                 
-                # Rotate API key for load balancing
-                self._rotate_key()
-                
-                print(f"✓ Gemini API responded (length: {len(response.text)} chars)")
-                
-                # Parse JSON response
                 response_text = response.text.strip()
+                print(f"✓ Gemini API responded (length: {len(response_text)} chars)")
                 
                 if not response_text:
                     raise ValueError("Empty response from Gemini")
                 
-                # Aggressive JSON cleanup
-                original_text = response_text
-                
-                # Remove markdown code blocks
-                if '```' in response_text:
-                    response_text = re.sub(r'^```(?:json)?\s*\n?', '', response_text, flags=re.MULTILINE)
-                    response_text = re.sub(r'\n?```\s*$', '', response_text, flags=re.MULTILINE)
-                
-                # Remove trailing commas (common JSON error)
-                response_text = re.sub(r',\s*([}\]])', r'\1', response_text)
-                
-                # Fix newlines inside strings
-                response_text = response_text.replace('\n', ' ')
-                
-                # Remove any non-JSON text before/after
-                json_start = response_text.find('{')
-                json_end = response_text.rfind('}') + 1
-                if json_start >= 0 and json_end > json_start:
-                    response_text = response_text[json_start:json_end]
-                
-                print(f"📄 Cleaned JSON (length: {len(response_text)} chars)")
-                
-                # Parse JSON
-                analysis = json.loads(response_text)
-                
-                # Validate structure
-                self._validate_analysis_structure(analysis)
+                # Parse JSON, repairing fences, trailing commas and truncation;
+                # output that parses but fails validation counts as a JSON failure
+                analysis = parse_json(response_text, expect=dict, source='reasoning',
+                                      validate=self._validate_analysis_structure)
                 
                 print(f"✓ Successfully parsed and validated analysis")
                 print(f"   Status: {analysis.get('eligibility_status', 'Unknown')}")
@@ -244,14 +660,14 @@ class ReasoningService:
                 
                 return analysis
                 
-            except json.JSONDecodeError as e:
+            except LLMJSONError as e:
                 last_error = f"JSON parsing failed: {e}"
                 print(f"❌ {last_error}")
-                print(f"   Raw response (first 300 chars): {original_text[:300] if 'original_text' in locals() else response_text[:300]}")
+                print(f"   Raw response (first 300 chars): {response_text[:300]}")
                 
                 if attempt < max_retries - 1:
-                    print(f"⏳ Retrying with different API key...")
-                    self._rotate_key()  # Try different key
+                    record_retry('reasoning')
+                    print(f"⏳ Retrying...")
                     continue
             
             except Exception as e:
@@ -260,7 +676,6 @@ class ReasoningService:
                 
                 if attempt < max_retries - 1:
                     print(f"⏳ Retrying...")
-                    self._rotate_key()
                     continue
         
         # All retries failed
@@ -271,6 +686,140 @@ class ReasoningService:
         return self._create_fallback_analysis()
     
     
+    def _perform_packed_gemini_reasoning(self, profile_data: Dict, opportunities: List[Dict]) -> List[Dict]:
+        """
+        Analyze several opportunities for one profile in a single Gemini request
+        
+        No retries here: items that are missing or invalid come back as None
+        and the caller analyzes them one by one.
+        
+        Returns:
+            Analysis (or None) for each opportunity, in order
+        """
+        analyses = [None] * len(opportunities)
+        prompt = self._build_packed_reasoning_prompt(profile_data, opportunities)
+        
+        try:
+            print(f"🤖 Calling Gemini API for {len(opportunities)} packed eligibility analyses...")
+            response = self.llm.generate_content(
+                prompt,
+                generation_config=json_generation_config(
+                    temperature=0.3,
+                    max_output_tokens=min(4096 * len(opportunities), 32768),
+                )
+            )
+            items = parse_json(response.text, expect=list, source='reasoning_packed',
+                               validate=self._validate_packed_items)
+        except LLMJSONError as e:
+            print(f"❌ Packed Gemini reasoning failed: {e}")
+            self._record_packed_retries(len(opportunities))
+            return analyses
+        except Exception as e:
+            print(f"❌ Packed Gemini reasoning failed: {e}")
+            return analyses
+        
+        for position, item in enumerate(items):
+            if not isinstance(item, dict):
+                continue
+            
+            # Prefer the echoed opportunity number, fall back to array order
+            try:
+                index = int(item.pop('opportunity_index', position + 1)) - 1
+            except (TypeError, ValueError):
+                continue
+            if not 0 <= index < len(opportunities) or analyses[index] is not None:
+                continue
+            
+            try:
+                self._validate_analysis_structure(item)
+            except Exception as e:
+                print(f"⚠️  Packed analysis {index + 1} is invalid: {e}")
+                continue
+            
+            analyses[index] = item
+        
+        valid = sum(1 for a in analyses if a)
+        print(f"✓ {valid}/{len(opportunities)} packed analyses valid")
+        self._record_packed_retries(len(opportunities) - valid)
+        return analyses
+    
+    
+    def _validate_packed_items(self, items: List):
+        """A packed answer is usable if at least one item is a valid analysis"""
+        for item in items:
+            if isinstance(item, dict):
+                try:
+                    self._validate_analysis_structure(item)
+                    return
+                except Exception:
+                    continue
+        raise ValueError("No valid analysis in the packed response")
+    
+    
+    def _record_packed_retries(self, count: int):
+        """Opportunities the packed call didn't answer are analyzed again one by one"""
+        for _ in range(count):
+            record_retry('reasoning_packed')
+    
+    
+    def _build_packed_reasoning_prompt(self, profile_data: Dict, opportunities: List[Dict]) -> str:
+        """
+        Build one prompt for several opportunities (same rules as
+        _build_reasoning_prompt, the profile serialized once)
+        """
+        profile_json = json.dumps(profile_data, indent=2)
+        
+        sections = []
+        for number, opportunity in enumerate(opportunities, 1):
+            inputs = reasoning_prompt_inputs(opportunity)
+            sections.append(f"""OPPORTUNITY {number}:
+Title: {inputs['title']}
+Organizer: {inputs['organizer']}
+Eligibility Criteria (Raw Text):
+```
+{inputs['eligibility_text']}
+```""")
+        opportunities_text = '\n\n'.join(sections)
+        
+        item_structure = ANALYSIS_JSON_STRUCTURE.replace(
+            '{\n', '{\n  "opportunity_index": <number of the opportunity above>,\n', 1
+        )
+        
+        prompt = f"""
+{REASONING_PROMPT_ROLE}
+
+---
+
+STUDENT PROFILE:
+```json
+{profile_json}
+```
+
+{opportunities_text}
+
+---
+
+TASK:
+Analyze whether this student meets the eligibility criteria of EACH of the {len(opportunities)} opportunities above, separately. Use SECOND PERSON ("you", "your") when referring to the student, not third person ("the student", "they").
+
+OUTPUT REQUIREMENTS:
+Return ONLY a valid JSON array with exactly {len(opportunities)} objects, one per opportunity, in the same order. Each object has this exact structure:
+
+{item_structure}
+
+---
+
+{REASONING_PROMPT_RULES}
+
+---
+
+NOW ANALYZE THE STUDENT PROFILE AGAINST EVERY OPPORTUNITY PROVIDED ABOVE.
+OUTPUT ONLY THE JSON ARRAY. DO NOT ADD ANY EXTRA TEXT BEFORE OR AFTER IT.
+"""
+        
+        return prompt
+    
+    
     def _build_reasoning_prompt(self, profile_data: Dict, opportunity: Dict) -> str:
         """
         Build detailed prompt for Gemini eligibility reasoning
@@ -281,18 +830,13 @@ class ReasoningService:
         profile_json = json.dumps(profile_data, indent=2)
         
         # Extract opportunity details
-        title = opportunity.get('title', 'Unknown Opportunity')
-        organizer = opportunity.get('organizer', 'Unknown Organizer')
-        eligibility_text = opportunity.get('eligibility_text', opportunity.get('snippet', ''))
+        inputs = reasoning_prompt_inputs(opportunity)
+        title = inputs['title']
+        organizer = inputs['organizer']
+        eligibility_text = inputs['eligibility_text']
         
         prompt = f"""
-You are an expert career advisor and opportunity analyst specializing in helping students in Tier-2 and Tier-3 colleges in India understand their eligibility for opportunities.
-
-Your role is NOT to gatekeep, but to:
-- Explain eligibility transparently
-- Identify gaps constructively
-- Provide actionable guidance
-- Encourage growth mindset
+{REASONING_PROMPT_ROLE}
 
 ---
 
@@ -317,45 +861,11 @@ Analyze whether this student meets the eligibility criteria. Use SECOND PERSON (
 OUTPUT REQUIREMENTS:
 Return ONLY valid JSON in this exact structure:
 
-{{
-  "eligibility_status": "<one of: Eligible | Partially Eligible | Not Yet Eligible>",
-  "reasons_met": [
-    "List each criterion YOU MEET with specific evidence from your profile. Use 2nd person: 'You have...', 'Your experience...'"
-  ],
-  "reasons_not_met": [
-    "List each criterion YOU DO NOT MEET with clear explanation. Use 2nd person: 'You need...', 'Your profile lacks...'"
-  ],
-  "missing_skills": [
-    "Specific technical or soft skills you need to acquire. Use 2nd person."
-  ],
-  "missing_experience": [
-    "Types of experience you lack (projects, internships, leadership, etc.). Use 2nd person."
-  ],
-  "confidence_score": <integer 0-100>,
-  "explanation_simple": "<2-3 sentence plain English explanation directly addressing the student using 'you' and 'your'>",
-  "next_steps": [
-    {{
-      "action": "<Specific, actionable step>",
-      "reason": "<Why this matters for this opportunity>",
-      "time_estimate": "<Realistic timeframe: e.g., '2-3 weeks', '1 month', '3-6 months'>"
-    }}
-  ]
-}}
+{ANALYSIS_JSON_STRUCTURE}
 
 ---
 
-CRITICAL RULES:
-1. ALWAYS use SECOND PERSON (you, your) when addressing the student - NEVER third person (the student, they)
-2. NEVER say just "not eligible" without explanation
-3. Be encouraging, not discouraging—frame gaps as development opportunities
-4. Use simple, mentor-like language (avoid academic jargon)
-5. Be specific about what's missing (not vague like "improve skills")
-6. If criteria are ambiguous, interpret generously in favor of the student
-7. If confidence is low (<60), acknowledge uncertainty in explanation
-8. Focus next_steps on skill-building, project ideas, or community engagement
-9. Keep explanation_simple under 100 words
-10. Limit next_steps to 3-5 most impactful actions
-11. Always output valid, parseable JSON
+{REASONING_PROMPT_RULES}
 
 ---
 
@@ -407,7 +917,7 @@ OUTPUT ONLY THE JSON. DO NOT ADD ANY EXTRA TEXT BEFORE OR AFTER THE JSON.
         Provides reasonable default guidance
         """
         return {
-            "eligibility_status": "Review Required",
+            "eligibility_status": FALLBACK_STATUS,
             "reasons_met": [
                 "Your profile shows potential and enthusiasm"
             ],
@@ -478,8 +988,8 @@ OUTPUT (JSON):
 """
         
         try:
-            response = self.model.generate_content(prompt)
-            result = json.loads(response.text)
+            response = self.llm.generate_content(prompt, generation_config=json_generation_config())
+            result = parse_json(response.text, expect=dict, source='guidance')
             return result
         except Exception as e:
             return {"error": str(e)}
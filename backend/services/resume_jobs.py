@@ -0,0 +1,253 @@
+"""
+Resume Jobs - Background queue for resume parsing
+
+Parsing a resume (PDF extraction, Gemini parsing and Gemini evaluation)
+takes tens of seconds, which used to hold a Flask worker for the whole
+upload. submit() stores the PDF bytes and returns a job ID at once; a
+small worker pool (RESUME_PARSE_WORKERS) does the work and records the
+stage, progress and result. At most RESUME_PARSE_QUEUE jobs may wait, so
+an upload burst gets a fast ResumeQueueFullError instead of an unbounded
+backlog.
+
+Job state is kept in-process and mirrored to the Firestore 'resume_jobs'
+collection, so a status poll that lands on another worker still finds it.
+Documents carry an expires_at timestamp for a Firestore TTL policy.
+
+Jobs are not durable: a worker restart loses the ones it was running or
+holding in its queue. A queued or running job whose state hasn't changed
+for RESUME_JOB_STALL_TIMEOUT seconds is reported as failed, so clients stop
+polling and can upload again. Timestamps are UTC so workers on hosts with
+different time zones agree on a job's age.
+"""
+
+import io
+import os
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+
+# Attempts at the on_success callback (linking the profile) before giving up
+LINK_ATTEMPTS = 3
+
+# Stage -> progress percentage reported while the job is in it
+STAGES = {
+    'queued': 0,
+    'extracting': 10,
+    'parsing': 30,
+    'evaluating': 70,
+    'saving': 90,
+    'done': 100,
+    'failed': 100
+}
+
+
+class ResumeQueueFullError(Exception):
+    """Raised when too many resume parsing jobs are already waiting"""
+
+
+class ResumeJobQueue:
+    COLLECTION = 'resume_jobs'
+
+    def __init__(self, profile_service, firebase_service):
+        """
+        Initialize Resume Job Queue
+
+        Args:
+            profile_service: ProfileService instance (does the parsing)
+            firebase_service: FirebaseService instance (shared job state)
+        """
+        self.profiles = profile_service
+        self.firebase = firebase_service
+
+        workers = int(os.getenv('RESUME_PARSE_WORKERS', 2))
+        queue = int(os.getenv('RESUME_PARSE_QUEUE', 20))
+        self.job_ttl = int(os.getenv('RESUME_JOB_TTL', 3600))
+        self.stall_timeout = int(os.getenv('RESUME_JOB_STALL_TIMEOUT', 600))
+
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='resume-parse')
+        self._slots = threading.BoundedSemaphore(workers + queue)
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, user_id, resume_bytes, on_success=None):
+        """
+        Queue a resume for parsing
+
+        Args:
+            user_id: Owner of the job (only they can read its status)
+            resume_bytes: Uploaded PDF contents
+            on_success: Optional callable(result) run in the worker when
+                        the profile has been created (retried; if it still
+                        fails the job is done with link_error set)
+
+        Returns:
+            Job dictionary (job_id, status, stage, progress)
+
+        Raises:
+            ResumeQueueFullError when the queue is full
+        """
+        if not self._slots.acquire(blocking=False):
+            raise ResumeQueueFullError("Too many resumes are being processed, please retry shortly")
+
+        job_id = uuid.uuid4().hex
+        job = {
+            'job_id': job_id,
+            'user_id': user_id,
+            'status': 'queued',
+            'stage': 'queued',
+            'progress': 0,
+            'result': None,
+            'error': None,
+            'link_error': None,
+            'created_at': datetime.now(timezone.utc).isoformat()
+        }
+
+        self._prune()
+        with self._lock:
+            self._jobs[job_id] = job
+        self._persist(job)
+
+        try:
+            self._executor.submit(self._run, job_id, resume_bytes, on_success)
+        except Exception:
+            self._slots.release()
+            raise
+
+        print(f"📥 Queued resume parsing job {job_id} for user {user_id}")
+        return self._public(job)
+
+    def get(self, job_id, user_id=None):
+        """
+        Current state of a job
+
+        Returns:
+            Job dictionary, or None if unknown, expired or owned by another user
+        """
+        with self._lock:
+            job = dict(self._jobs[job_id]) if job_id in self._jobs else None
+
+        if job is None:
+            job = self._load(job_id)
+
+        if job is None or (user_id is not None and job.get('user_id') != user_id):
+            return None
+
+        if self._stalled(job):
+            job.update(status='failed', stage='failed', progress=100,
+                       error="Resume parsing was interrupted, please upload your resume again")
+        return self._public(job)
+
+    def info(self):
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job['status']] = counts.get(job['status'], 0) + 1
+        return {'jobs': counts}
+
+    # ========================================================================
+    # PRIVATE HELPER METHODS
+    # ========================================================================
+
+    def _run(self, job_id, resume_bytes, on_success):
+        started = time.monotonic()
+        try:
+            self._update(job_id, status='running', stage='extracting', progress=STAGES['extracting'])
+            result = self.profiles.parse_and_create_profile(
+                io.BytesIO(resume_bytes),
+                progress=lambda stage: self._update(job_id, stage=stage, progress=STAGES[stage])
+            )
+            # The profile exists now; a failure past this point must not fail
+            # the job, or the user uploads again and creates a duplicate
+            link_error = self._call_on_success(job_id, on_success, result) if on_success else None
+
+            self._update(job_id, status='done', stage='done', progress=100, result=result,
+                         link_error=link_error)
+            print(f"✓ Resume parsing job {job_id} finished in {time.monotonic() - started:.1f}s")
+
+        except Exception as e:
+            print(f"❌ Resume parsing job {job_id} failed: {e}")
+            traceback.print_exc()
+            self._update(job_id, status='failed', stage='failed', progress=100,
+                         error=f"Failed to parse resume: {str(e)}")
+        finally:
+            self._slots.release()
+
+    def _call_on_success(self, job_id, on_success, result):
+        """Run on_success up to LINK_ATTEMPTS times; returns the error message or None"""
+        for attempt in range(1, LINK_ATTEMPTS + 1):
+            try:
+                on_success(result)
+                return None
+            except Exception as e:
+                print(f"⚠️  Resume job {job_id}: linking the profile failed (attempt {attempt}/{LINK_ATTEMPTS}): {e}")
+                if attempt < LINK_ATTEMPTS:
+                    time.sleep(attempt)
+        return "Your profile was created but could not be linked to your account"
+
+    def _update(self, job_id, **fields):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.update(fields, updated_at=datetime.now(timezone.utc).isoformat())
+            snapshot = dict(job)
+        self._persist(snapshot)
+
+    def _persist(self, job):
+        if not self.firebase.firebase_enabled:
+            return
+        try:
+            expires_at = datetime.now(timezone.utc) + timedelta(seconds=self.job_ttl)
+            self.firebase.db.collection(self.COLLECTION).document(job['job_id']).set(
+                {**job, 'expires_at': expires_at}
+            )
+        except Exception as e:
+            print(f"⚠️  Could not save resume job {job['job_id']}: {e}")
+
+    def _load(self, job_id):
+        if not self.firebase.firebase_enabled:
+            return None
+        try:
+            doc = self.firebase.db.collection(self.COLLECTION).document(job_id).get()
+            if not doc.exists:
+                return None
+            job = doc.to_dict()
+            expires_at = job.get('expires_at')
+            if expires_at and expires_at <= datetime.now(timezone.utc):
+                return None
+            return job
+        except Exception as e:
+            print(f"⚠️  Could not load resume job {job_id}: {e}")
+            return None
+
+    def _stalled(self, job):
+        """True for an unfinished job whose state hasn't changed within stall_timeout"""
+        if job.get('status') not in ('queued', 'running'):
+            return False
+        return self._age(job) > self.stall_timeout
+
+    def _prune(self):
+        """Forget finished jobs older than RESUME_JOB_TTL"""
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job['status'] in ('done', 'failed') and self._age(job) > self.job_ttl
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+    @staticmethod
+    def _age(job):
+        """Seconds since the job last changed"""
+        changed_at = datetime.fromisoformat(job.get('updated_at') or job['created_at'])
+        if changed_at.tzinfo is None:
+            changed_at = changed_at.replace(tzinfo=timezone.utc)
+        return (datetime.now(timezone.utc) - changed_at).total_seconds()
+
+    def _public(self, job):
+        keys = ('job_id', 'status', 'stage', 'progress', 'result', 'error', 'link_error', 'created_at')
+        return {key: job.get(key) for key in keys}
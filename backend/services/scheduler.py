@@ -0,0 +1,95 @@
+"""
+Scheduler - Lightweight periodic background jobs for the Flask process
+"""
+
+import threading
+import traceback
+from datetime import datetime
+
+from firebase_admin import firestore
+
+
+# A lease may be re-claimed slightly early so workers whose timers drift
+# behind the winner's don't skip a whole interval
+LEASE_SLACK = 0.9
+
+
+class PeriodicJob:
+    """
+    Run a function every interval_seconds on a daemon thread.
+
+    Each gunicorn worker runs its own copy of a job, so jobs that touch
+    shared state should be idempotent or take a lease with claim_lease().
+    """
+
+    def __init__(self, name, interval_seconds, func, run_immediately=False):
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self.func = func
+        self.run_immediately = run_immediately
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the job thread (no-op if already running)"""
+        if self._thread and self._thread.is_alive():
+            return self
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=f"job-{self.name}", daemon=True)
+        self._thread.start()
+        print(f"✓ Scheduled background job '{self.name}' every {self.interval_seconds}s")
+        return self
+
+    def stop(self, timeout=None):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def run_once(self):
+        """Run the job body now on the calling thread, logging failures"""
+        try:
+            return self.func()
+        except Exception as e:
+            print(f"❌ Background job '{self.name}' failed: {e}")
+            traceback.print_exc()
+            return None
+
+    def _run(self):
+        if self.run_immediately:
+            self.run_once()
+        while not self._stop_event.wait(self.interval_seconds):
+            self.run_once()
+
+
+def claim_lease(db, doc_ref, interval_seconds, field='last_run_at', force=False):
+    """
+    Atomically claim a periodic run shared by every worker
+
+    Reads doc_ref[field] and writes the current time inside one Firestore
+    transaction, so of several workers waking together exactly one wins.
+
+    Args:
+        db: Firestore client
+        doc_ref: Document holding the lease timestamp
+        interval_seconds: How long a claim holds
+        field: Timestamp field (ISO string)
+        force: Claim even if the current lease hasn't run out
+
+    Returns:
+        True if this process now owns the run
+    """
+    @firestore.transactional
+    def claim(transaction):
+        snapshot = doc_ref.get(transaction=transaction)
+        last_run_at = (snapshot.to_dict() or {}).get(field) if snapshot.exists else None
+
+        now = datetime.now()
+        if not force and last_run_at:
+            age = (now - datetime.fromisoformat(last_run_at)).total_seconds()
+            if age < interval_seconds * LEASE_SLACK:
+                return False
+
+        transaction.set(doc_ref, {field: now.isoformat()}, merge=True)
+        return True
+
+    return claim(db.transaction())
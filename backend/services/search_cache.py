@@ -0,0 +1,153 @@
+"""
+Search Cache - Normalized query-result cache for opportunity searches
+
+Identical searches (after query enhancement and normalization) share one
+result set. Fresh entries are served directly; entries past their TTL but
+within the stale window are served immediately while a background refresh
+fetches new results. Entries are kept in-process and persisted to the
+Firestore 'search_cache' collection so they survive restarts and are
+shared between workers.
+"""
+
+import hashlib
+import os
+import re
+import threading
+import time
+
+from .cache import create_cache
+
+
+class SearchCache:
+    COLLECTION = 'search_cache'
+
+    def __init__(self, firebase_service):
+        """
+        Initialize Search Cache
+
+        Args:
+            firebase_service: FirebaseService instance (for persistence)
+        """
+        self.firebase = firebase_service
+        self.ttl = int(os.getenv('SEARCH_CACHE_TTL', 3600))
+        self.stale_ttl = int(os.getenv('SEARCH_CACHE_STALE_TTL', 86400))
+
+        self._local = create_cache('search', default_ttl=self.ttl + self.stale_ttl)
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
+
+    @staticmethod
+    def make_key(enhanced_query, opportunity_type=None):
+        """Normalize the enhanced query + type into a cache key"""
+        query = re.sub(r'\s+', ' ', (enhanced_query or '').strip().lower())
+        return f"{query}|{(opportunity_type or '').strip().lower()}"
+
+    def get_or_fetch(self, key, fetch):
+        """
+        Serve a search from cache, falling back to fetch()
+
+        Args:
+            key: Key from make_key()
+            fetch: Zero-argument callable returning (opportunities, cacheable);
+                   results with cacheable False (e.g. mock fallback data)
+                   are returned but not stored
+
+        Returns:
+            Tuple of (opportunities, status) where status is 'hit',
+            'stale' (served while refreshing in the background) or 'miss'
+        """
+        entry = self._lookup(key)
+
+        if entry is not None:
+            age = time.time() - entry['fetched_at']
+            if age <= self.ttl:
+                return entry['opportunities'], 'hit'
+            if age <= self.ttl + self.stale_ttl:
+                self._refresh_async(key, fetch)
+                return entry['opportunities'], 'stale'
+
+        opportunities, cacheable = fetch()
+        if cacheable:
+            self.store(key, opportunities)
+        return opportunities, 'miss'
+
+    def store(self, key, opportunities):
+        """Cache a fresh result set for key (empty results are not stored)"""
+        # Don't pin an empty result (e.g. transient API failure) for a whole TTL
+        if not opportunities:
+            return
+
+        entry = {'fetched_at': time.time(), 'opportunities': opportunities}
+        self._local.set(key, entry)
+
+        if not self.firebase.firebase_enabled:
+            return
+
+        try:
+            self.firebase.db.collection(self.COLLECTION).document(self._doc_id(key)).set({
+                'key': key,
+                **entry
+            })
+        except Exception as e:
+            print(f"⚠️  Could not persist search cache entry: {e}")
+
+    def is_fresh(self, key):
+        """True if key has an entry younger than the TTL"""
+        entry = self._lookup(key)
+        return entry is not None and time.time() - entry['fetched_at'] <= self.ttl
+
+    def info(self):
+        return {'ttl': self.ttl, 'stale_ttl': self.stale_ttl, **self._local.info()}
+
+    # ========================================================================
+    # PRIVATE HELPER METHODS
+    # ========================================================================
+
+    def _doc_id(self, key):
+        return hashlib.sha1(key.encode()).hexdigest()
+
+    def _lookup(self, key):
+        entry = self._local.get(key)
+        if entry is not None:
+            return entry
+
+        if not self.firebase.firebase_enabled:
+            return None
+
+        try:
+            doc = self.firebase.db.collection(self.COLLECTION).document(self._doc_id(key)).get()
+        except Exception as e:
+            print(f"⚠️  Could not read search cache: {e}")
+            return None
+
+        if not doc.exists:
+            return None
+
+        data = doc.to_dict()
+        entry = {'fetched_at': data.get('fetched_at', 0), 'opportunities': data.get('opportunities', [])}
+
+        remaining = entry['fetched_at'] + self.ttl + self.stale_ttl - time.time()
+        if remaining > 0:
+            self._local.set(key, entry, ttl=remaining)
+        return entry
+
+    def _refresh_async(self, key, fetch):
+        """Refresh a stale entry in the background (one refresh per key at a time)"""
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                print(f"🔄 Refreshing stale search results for '{key}'")
+                opportunities, cacheable = fetch()
+                if cacheable:
+                    self.store(key, opportunities)
+            except Exception as e:
+                print(f"⚠️  Background search refresh failed: {e}")
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name='search-refresh', daemon=True).start()
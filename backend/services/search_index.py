@@ -0,0 +1,216 @@
+"""
+Search Index - In-process BM25 full-text index over cached opportunities
+"""
+
+import math
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+
+# Field weights: a term in the title counts as three occurrences
+FIELD_WEIGHTS = {
+    'title': 3,
+    'organizer': 2,
+    'snippet': 1,
+    'eligibility_text': 1
+}
+
+# Fields kept per document so local results look like search results
+STORED_FIELDS = [
+    'title', 'link', 'url', 'description', 'snippet', 'source', 'type',
+    'organizer', 'eligibility_text', 'deadline', 'apply_by', 'relevance_score',
+    'discovered_date', 'canonical_url', 'expires_at'
+]
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'is',
+    'it', 'of', 'on', 'or', 'the', 'to', 'with', 'india', 'site', 'com', 'www'
+}
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text):
+    """Lowercase alphanumeric tokens without stopwords"""
+    return [t for t in _TOKEN_RE.findall((text or '').lower()) if t not in STOPWORDS and len(t) > 1]
+
+
+class SearchIndex:
+    """
+    BM25 inverted index over title/snippet/eligibility_text/organizer.
+
+    Built from the opportunities collection on first use (and again once
+    older than max_age_seconds, to pick up other workers' writes) and
+    updated incrementally as searches add documents.
+    """
+
+    def __init__(self, k1=1.5, b=0.75, max_age_seconds=900):
+        self.k1 = k1
+        self.b = b
+        self.max_age_seconds = max_age_seconds
+        self._postings = {}      # term -> {doc_id: weighted tf}
+        self._doc_terms = {}     # doc_id -> Counter of weighted tf
+        self._doc_len = {}       # doc_id -> weighted length
+        self._docs = {}          # doc_id -> stored fields
+        self._total_len = 0
+        self._lock = threading.RLock()
+        self._rebuild_lock = threading.Lock()
+        self._built_at = None
+
+    # ========================================================================
+    # BUILD
+    # ========================================================================
+
+    def rebuild(self, db):
+        """
+        Rebuild the index from the opportunities collection (one full scan)
+
+        Returns:
+            Number of documents indexed
+        """
+        docs = db.collection('opportunities').select(STORED_FIELDS).stream()
+
+        fresh = SearchIndex(self.k1, self.b, self.max_age_seconds)
+        for doc in docs:
+            fresh._add(doc.id, doc.to_dict())
+
+        with self._lock:
+            self._postings = fresh._postings
+            self._doc_terms = fresh._doc_terms
+            self._doc_len = fresh._doc_len
+            self._docs = fresh._docs
+            self._total_len = fresh._total_len
+            self._built_at = time.monotonic()
+
+        print(f"✓ Local search index built with {len(self._docs)} opportunities")
+        return len(self._docs)
+
+    def ensure_fresh(self, db):
+        """Rebuild the index if it was never built or is older than max_age_seconds"""
+        if not self.is_stale():
+            return
+
+        # Only one thread rebuilds; others keep serving the current snapshot
+        if not self._rebuild_lock.acquire(blocking=self._built_at is None):
+            return
+        try:
+            if self.is_stale():
+                self.rebuild(db)
+        finally:
+            self._rebuild_lock.release()
+
+    def is_stale(self):
+        if self._built_at is None:
+            return True
+        if not self.max_age_seconds:
+            return False
+        return time.monotonic() - self._built_at > self.max_age_seconds
+
+    # ========================================================================
+    # INCREMENTAL UPDATES
+    # ========================================================================
+
+    def add_many(self, opportunities):
+        """Index (or re-index) opportunities that carry an 'opportunity_id'"""
+        with self._lock:
+            for opp in opportunities:
+                if opp.get('opportunity_id'):
+                    self._add(opp['opportunity_id'], opp)
+
+    def remove(self, doc_id):
+        with self._lock:
+            terms = self._doc_terms.pop(doc_id, None)
+            if terms is None:
+                return
+            for term in terms:
+                postings = self._postings.get(term)
+                if postings is not None:
+                    postings.pop(doc_id, None)
+                    if not postings:
+                        del self._postings[term]
+            self._total_len -= self._doc_len.pop(doc_id, 0)
+            self._docs.pop(doc_id, None)
+
+    def _add(self, doc_id, data):
+        self.remove(doc_id)
+
+        terms = Counter()
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(data.get(field)):
+                terms[token] += weight
+
+        self._doc_terms[doc_id] = terms
+        self._doc_len[doc_id] = sum(terms.values())
+        self._total_len += self._doc_len[doc_id]
+        self._docs[doc_id] = {field: data.get(field) for field in STORED_FIELDS}
+        for term, tf in terms.items():
+            self._postings.setdefault(term, {})[doc_id] = tf
+
+    # ========================================================================
+    # QUERIES
+    # ========================================================================
+
+    def search(self, query, limit=20, opportunity_type=None, min_term_coverage=0.5):
+        """
+        Rank indexed opportunities against a query with BM25
+
+        Args:
+            query: Free-text query
+            limit: Max results
+            opportunity_type: Only return documents of this type
+            min_term_coverage: Fraction of query terms a document must contain
+
+        Returns:
+            List of opportunity dicts (with 'opportunity_id' and 'local_score'), best first
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        with self._lock:
+            n_docs = len(self._docs)
+            if not n_docs:
+                return []
+            avg_len = self._total_len / n_docs
+
+            scores = Counter()
+            matched = Counter()
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_len[doc_id] / avg_len)
+                    scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+                    matched[doc_id] += 1
+
+            required = max(1, math.ceil(len(terms) * min_term_coverage))
+            now = datetime.now(timezone.utc)
+            results = []
+            for doc_id, score in scores.most_common():
+                if matched[doc_id] < required:
+                    continue
+                doc = self._docs[doc_id]
+                # Expired documents stay indexed until the sweeper removes them
+                if doc.get('expires_at') and doc['expires_at'] <= now:
+                    continue
+                if opportunity_type and (doc.get('type') or '').lower() != opportunity_type.lower():
+                    continue
+                results.append({
+                    **doc,
+                    'id': doc_id,
+                    'opportunity_id': doc_id,
+                    'local_score': round(score, 3)
+                })
+                if len(results) >= limit:
+                    break
+
+            return results
+
+    def __len__(self):
+        with self._lock:
+            return len(self._docs)
@@ -0,0 +1,220 @@
+"""
+Search Key Scheduler - Quota-aware selection of Google Custom Search API keys
+
+Each Custom Search key has a daily query quota that resets at midnight
+Pacific time. The scheduler hands out the key with the most quota left,
+counts every call against it, and parks a key that answered 429 until
+the next reset so searches stop burning requests on it.
+
+Usage is counted in-process and merged into one Firestore document per
+quota day ('search_key_usage/<day>', one counter per key fingerprint)
+with Increment, so counts survive restarts and are shared by workers.
+Raw keys are never stored; only a short SHA-256 fingerprint.
+"""
+
+import hashlib
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from firebase_admin import firestore
+
+from .scheduler import PeriodicJob
+
+
+class SearchKeyScheduler:
+    COLLECTION = 'search_key_usage'
+
+    def __init__(self, keys, firebase_service, daily_quota=100, reset_utc_offset=-8, sync_interval=60):
+        """
+        Initialize Search Key Scheduler
+
+        Args:
+            keys: Google Custom Search API keys
+            firebase_service: FirebaseService instance (for shared counters)
+            daily_quota: Queries per key per quota day
+            reset_utc_offset: UTC offset (hours) of the midnight quota reset
+            sync_interval: Seconds between merges of local counts into Firestore
+        """
+        self.keys = list(keys)
+        self.firebase = firebase_service
+        self.daily_quota = daily_quota
+        self.reset_offset = timedelta(hours=reset_utc_offset)
+        self.sync_interval = sync_interval
+
+        self._fingerprints = {key: hashlib.sha256(key.encode()).hexdigest()[:12] for key in self.keys}
+        self._lock = threading.Lock()
+        self._day = None
+        self._synced = {}         # fingerprint -> calls recorded in Firestore (all workers)
+        self._pending = {}        # fingerprint -> calls made here, not yet merged
+        self._parked_until = {}   # fingerprint -> epoch seconds
+        self._next = 0
+        self._loaded = False
+        self._job = None
+
+    def __len__(self):
+        return len(self.keys)
+
+    # ========================================================================
+    # KEY SELECTION
+    # ========================================================================
+
+    def acquire(self):
+        """
+        Take the key with the most quota left and count one call against it
+
+        Returns:
+            API key, or None if every key is parked or out of quota
+        """
+        if not self._loaded:
+            self.sync()
+
+        with self._lock:
+            self._roll_day()
+            now = time.time()
+
+            best = None
+            for offset in range(len(self.keys)):
+                # Rotate the starting point so equally used keys take turns
+                key = self.keys[(self._next + offset) % len(self.keys)]
+                fp = self._fingerprints[key]
+                if self._parked_until.get(fp, 0) > now:
+                    continue
+                if self._used(fp) >= self.daily_quota:
+                    continue
+                if best is None or self._used(fp) < self._used(self._fingerprints[best]):
+                    best = key
+
+            if best is None:
+                return None
+
+            self._next = (self.keys.index(best) + 1) % len(self.keys)
+            fp = self._fingerprints[best]
+            self._pending[fp] = self._pending.get(fp, 0) + 1
+            return best
+
+    def park(self, key):
+        """Stop using a key until the next quota reset (after HTTP 429)"""
+        fp = self._fingerprints.get(key)
+        if not fp:
+            return
+
+        until = self.next_reset().timestamp()
+        with self._lock:
+            self._parked_until[fp] = until
+        print(f"🅿️  Search key {fp} hit its quota, parked until {self.next_reset().isoformat()}")
+
+        if self.firebase.firebase_enabled:
+            try:
+                self._doc_ref(self.quota_day()).set({f"{fp}_parked_until": until}, merge=True)
+            except Exception as e:
+                print(f"⚠️  Could not persist parked search key: {e}")
+
+    def remaining(self):
+        """Calls left today across all keys that are not parked"""
+        with self._lock:
+            self._roll_day()
+            now = time.time()
+            return sum(
+                max(0, self.daily_quota - self._used(fp))
+                for fp in self._fingerprints.values()
+                if self._parked_until.get(fp, 0) <= now
+            )
+
+    # ========================================================================
+    # QUOTA WINDOW
+    # ========================================================================
+
+    def quota_day(self):
+        """Current quota day (ISO date in the reset time zone)"""
+        return (datetime.now(timezone.utc) + self.reset_offset).date().isoformat()
+
+    def next_reset(self):
+        """UTC datetime of the next quota reset"""
+        local_now = datetime.now(timezone.utc) + self.reset_offset
+        local_midnight = datetime.combine(local_now.date() + timedelta(days=1), datetime.min.time(), timezone.utc)
+        return local_midnight - self.reset_offset
+
+    # ========================================================================
+    # PERSISTENCE
+    # ========================================================================
+
+    def start_sync(self):
+        """Merge counters into Firestore every sync_interval seconds"""
+        if self._job or not self.keys or not self.firebase.firebase_enabled:
+            return self._job
+        self._job = PeriodicJob('search-key-sync', self.sync_interval, self.sync).start()
+        return self._job
+
+    def sync(self):
+        """Push local call counts to Firestore and pull everyone's totals"""
+        with self._lock:
+            self._roll_day()
+            day = self._day
+            pending = {fp: calls for fp, calls in self._pending.items() if calls}
+            self._loaded = True
+
+        if not self.firebase.firebase_enabled:
+            return
+
+        doc_ref = self._doc_ref(day)
+        try:
+            if pending:
+                doc_ref.set({fp: firestore.Increment(calls) for fp, calls in pending.items()}, merge=True)
+            doc = doc_ref.get()
+            data = doc.to_dict() if doc.exists else {}
+        except Exception as e:
+            print(f"⚠️  Could not sync search key usage: {e}")
+            return
+
+        with self._lock:
+            if self._day != day:
+                return
+            for fp, calls in pending.items():
+                self._pending[fp] -= calls
+            for fp in self._fingerprints.values():
+                self._synced[fp] = data.get(fp, 0)
+                parked_until = data.get(f"{fp}_parked_until", 0)
+                if parked_until > self._parked_until.get(fp, 0):
+                    self._parked_until[fp] = parked_until
+
+    def info(self):
+        with self._lock:
+            self._roll_day()
+            now = time.time()
+            keys = [
+                {
+                    'key': fp,
+                    'used': self._used(fp),
+                    'remaining': max(0, self.daily_quota - self._used(fp)),
+                    'parked': self._parked_until.get(fp, 0) > now
+                }
+                for fp in self._fingerprints.values()
+            ]
+
+        return {
+            'daily_quota_per_key': self.daily_quota,
+            'quota_day': self.quota_day(),
+            'resets_at': self.next_reset().isoformat(),
+            'remaining': sum(k['remaining'] for k in keys if not k['parked']),
+            'keys': keys
+        }
+
+    # ========================================================================
+    # PRIVATE HELPER METHODS
+    # ========================================================================
+
+    def _used(self, fp):
+        return self._synced.get(fp, 0) + self._pending.get(fp, 0)
+
+    def _roll_day(self):
+        """Start fresh counters when the quota day changes (caller holds the lock)"""
+        day = self.quota_day()
+        if day != self._day:
+            self._day = day
+            self._synced = {}
+            self._pending = {}
+            self._parked_until = {}
+
+    def _doc_ref(self, day):
+        return self.firebase.db.collection(self.COLLECTION).document(day)
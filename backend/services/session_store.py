@@ -0,0 +1,290 @@
+"""
+Session Store - Auth sessions shared across workers, indexed by user
+
+Backends:
+- memory: in-process dict (default, per gunicorn worker)
+- sqlite: a local SQLite file shared by all workers on the host
+- redis:  any Redis-compatible server, set SESSION_BACKEND=redis and REDIS_URL
+
+Sessions are dictionaries with at least 'user_id' and 'expires_at' (naive
+UTC datetime). Each backend keeps a user_id -> tokens index so updating
+every session of one user doesn't scan all sessions.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+
+def _to_epoch(dt):
+    return dt.replace(tzinfo=timezone.utc).timestamp()
+
+
+def _serialize(session):
+    return json.dumps({**session, 'expires_at': session['expires_at'].isoformat()})
+
+
+def _deserialize(raw):
+    session = json.loads(raw)
+    session['expires_at'] = datetime.fromisoformat(session['expires_at'])
+    return session
+
+
+class BaseSessionStore:
+    """Common interface for session backends"""
+
+    backend = 'base'
+
+    def create(self, token, session):
+        raise NotImplementedError
+
+    def get(self, token):
+        """Get a live session, or None if missing or expired (expired ones are removed)"""
+        raise NotImplementedError
+
+    def delete(self, token):
+        raise NotImplementedError
+
+    def tokens_for_user(self, user_id):
+        raise NotImplementedError
+
+    def update_user(self, user_id, **fields):
+        """Set fields on every session belonging to user_id"""
+        raise NotImplementedError
+
+    def purge_expired(self):
+        """Remove expired sessions; returns how many were removed"""
+        raise NotImplementedError
+
+    def info(self):
+        return {'backend': self.backend}
+
+
+class MemorySessionStore(BaseSessionStore):
+    """In-process sessions with a user_id -> tokens index"""
+
+    backend = 'memory'
+
+    def __init__(self):
+        self._sessions = {}
+        self._by_user = {}
+        self._lock = threading.Lock()
+
+    def create(self, token, session):
+        with self._lock:
+            self._sessions[token] = dict(session)
+            self._by_user.setdefault(session['user_id'], set()).add(token)
+
+    def get(self, token):
+        with self._lock:
+            session = self._sessions.get(token)
+            if session is None:
+                return None
+            if datetime.utcnow() > session['expires_at']:
+                self._remove(token)
+                return None
+            return dict(session)
+
+    def delete(self, token):
+        with self._lock:
+            self._remove(token)
+
+    def tokens_for_user(self, user_id):
+        with self._lock:
+            return set(self._by_user.get(user_id, ()))
+
+    def update_user(self, user_id, **fields):
+        with self._lock:
+            for token in self._by_user.get(user_id, ()):
+                self._sessions[token].update(fields)
+
+    def purge_expired(self):
+        now = datetime.utcnow()
+        with self._lock:
+            expired = [t for t, s in self._sessions.items() if now > s['expires_at']]
+            for token in expired:
+                self._remove(token)
+        return len(expired)
+
+    def info(self):
+        with self._lock:
+            return {**super().info(), 'sessions': len(self._sessions), 'users': len(self._by_user)}
+
+    def _remove(self, token):
+        session = self._sessions.pop(token, None)
+        if session is None:
+            return
+        tokens = self._by_user.get(session['user_id'])
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._by_user[session['user_id']]
+
+
+class SQLiteSessionStore(BaseSessionStore):
+    """Sessions in a SQLite file, shared by every worker on the host"""
+
+    backend = 'sqlite'
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sessions (
+                    token TEXT PRIMARY KEY,
+                    user_id TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_user ON sessions (user_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_expires ON sessions (expires_at)")
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def create(self, token, session):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (token, user_id, data, expires_at) VALUES (?, ?, ?, ?)",
+                (token, session['user_id'], _serialize(session), _to_epoch(session['expires_at']))
+            )
+
+    def get(self, token):
+        row = self._connect().execute(
+            "SELECT data, expires_at FROM sessions WHERE token = ?", (token,)
+        ).fetchone()
+        if row is None:
+            return None
+        if _to_epoch(datetime.utcnow()) > row[1]:
+            self.delete(token)
+            return None
+        return _deserialize(row[0])
+
+    def delete(self, token):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM sessions WHERE token = ?", (token,))
+
+    def tokens_for_user(self, user_id):
+        rows = self._connect().execute("SELECT token FROM sessions WHERE user_id = ?", (user_id,))
+        return {row[0] for row in rows}
+
+    def update_user(self, user_id, **fields):
+        with self._connect() as conn:
+            rows = conn.execute("SELECT token, data FROM sessions WHERE user_id = ?", (user_id,)).fetchall()
+            conn.executemany(
+                "UPDATE sessions SET data = ? WHERE token = ?",
+                [(_serialize({**_deserialize(data), **fields}), token) for token, data in rows]
+            )
+
+    def purge_expired(self):
+        with self._connect() as conn:
+            cursor = conn.execute("DELETE FROM sessions WHERE expires_at < ?", (_to_epoch(datetime.utcnow()),))
+            return cursor.rowcount
+
+    def info(self):
+        count = self._connect().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        return {**super().info(), 'sessions': count, 'path': self.path}
+
+
+class RedisSessionStore(BaseSessionStore):
+    """Sessions as expiring Redis keys plus one token set per user"""
+
+    backend = 'redis'
+
+    def __init__(self, url, namespace='orbit:session'):
+        try:
+            import redis
+        except ImportError:
+            raise ImportError("SESSION_BACKEND=redis requires the 'redis' package (pip install redis)")
+
+        self.client = redis.Redis.from_url(url)
+        self.client.ping()
+        self.namespace = namespace
+
+    def _key(self, token):
+        return f"{self.namespace}:{token}"
+
+    def _user_key(self, user_id):
+        return f"{self.namespace}:user:{user_id}"
+
+    def create(self, token, session):
+        ttl = max(1, int(_to_epoch(session['expires_at']) - _to_epoch(datetime.utcnow())))
+        pipe = self.client.pipeline()
+        pipe.set(self._key(token), _serialize(session), ex=ttl)
+        pipe.sadd(self._user_key(session['user_id']), token)
+        pipe.execute()
+
+    def get(self, token):
+        raw = self.client.get(self._key(token))
+        if raw is None:
+            return None
+        session = _deserialize(raw)
+        if datetime.utcnow() > session['expires_at']:
+            self.delete(token)
+            return None
+        return session
+
+    def delete(self, token):
+        raw = self.client.get(self._key(token))
+        pipe = self.client.pipeline()
+        pipe.delete(self._key(token))
+        if raw is not None:
+            pipe.srem(self._user_key(json.loads(raw)['user_id']), token)
+        pipe.execute()
+
+    def tokens_for_user(self, user_id):
+        return {t.decode() if isinstance(t, bytes) else t
+                for t in self.client.smembers(self._user_key(user_id))}
+
+    def update_user(self, user_id, **fields):
+        for token in self.tokens_for_user(user_id):
+            raw = self.client.get(self._key(token))
+            if raw is None:
+                # Expired by Redis; drop it from the index
+                self.client.srem(self._user_key(user_id), token)
+                continue
+            self.client.set(self._key(token), _serialize({**_deserialize(raw), **fields}), keepttl=True)
+
+    def purge_expired(self):
+        # Redis expires session keys itself; only the user index needs pruning
+        removed = 0
+        for user_key in self.client.scan_iter(f"{self.namespace}:user:*"):
+            for token in self.client.smembers(user_key):
+                token = token.decode() if isinstance(token, bytes) else token
+                if not self.client.exists(self._key(token)):
+                    self.client.srem(user_key, token)
+                    removed += 1
+        return removed
+
+
+def create_session_store():
+    """
+    Build the session store selected by SESSION_BACKEND (memory | sqlite | redis)
+
+    Falls back to the in-process store if the configured backend can't be created.
+    """
+    backend = os.getenv('SESSION_BACKEND', 'memory').lower()
+
+    try:
+        if backend == 'sqlite':
+            store = SQLiteSessionStore(os.getenv('SESSION_DB', 'sessions.db'))
+            print(f"✓ Using SQLite session store at {store.path}")
+            return store
+        if backend == 'redis':
+            store = RedisSessionStore(os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+            print("✓ Using Redis session store")
+            return store
+    except Exception as e:
+        print(f"⚠️  Session backend '{backend}' unavailable ({e}), falling back to in-process store")
+
+    return MemorySessionStore()
@@ -1,11 +1,13 @@
 """Success Stories Service - Inspire users with peer achievements"""
 from datetime import datetime, timedelta
 import random
+from .peer_stats_service import PeerStatsService
 
 
 class SuccessStoriesService:
-    def __init__(self, firebase):
+    def __init__(self, firebase, peer_stats=None):
         self.firebase = firebase
+        self.peer_stats = peer_stats or PeerStatsService(firebase)
         
     def get_success_stories(self, user_id, limit=5):
         """Get inspiring success stories from peers who achieved real results"""
@@ -226,21 +228,18 @@ class SuccessStoriesService:
             db = self.firebase.db
             
             # Get user's current stats
-            user_gami = db.collection('gamification').document(user_id).get()
-            if not user_gami.exists:
+            user_data = self.firebase.get_gamification(user_id)
+            if user_data is None:
                 return {'error': 'User data not found'}
-            
-            user_data = user_gami.to_dict()
+
             user_points = user_data.get('total_points', 0)
             user_streak = user_data.get('login_streak', 0)
             user_achievements = len(user_data.get('achievements', []))
             
             # Get user profile for college
-            user_profile = db.collection('profiles').document(user_id).get()
-            if user_profile.exists:
-                profile_data = user_profile.to_dict()
-                education = profile_data.get('education', {})
-                user_college = education.get('institution', 'Unknown')
+            user_profile = self.firebase.get_profile_summaries([user_id]).get(user_id)
+            if user_profile is not None:
+                user_college = user_profile.get('college') or 'Unknown'
             else:
                 user_college = 'Unknown'
             
@@ -271,52 +270,31 @@ class SuccessStoriesService:
     def _get_peer_statistics(self, db, user_college):
         """Get average statistics from peers"""
         try:
-            # Get all gamification data
-            gami_docs = db.collection('gamification').stream()
-            
-            same_college_stats = []
-            all_peers_stats = []
+            # Averages come from the pre-aggregated peer stats document
+            snapshot = self.peer_stats.get_snapshot()
+            if snapshot is None:
+                raise Exception("Peer statistics unavailable")
             
-            for doc in gami_docs:
-                data = doc.to_dict()
-                points = data.get('total_points', 0)
-                streak = data.get('login_streak', 0)
-                achievements = len(data.get('achievements', []))
-                
-                all_peers_stats.append({
-                    'points': points,
-                    'streak': streak,
-                    'achievements': achievements
-                })
-                
-                # Check if same college
-                profile = db.collection('profiles').document(doc.id).get()
-                if profile.exists:
-                    profile_data = profile.to_dict()
-                    education = profile_data.get('education', {})
-                    profile_college = education.get('institution', '')
-                    if profile_college == user_college:
-                        same_college_stats.append({
-                            'points': points,
-                            'streak': streak,
-                            'achievements': achievements
-                        })
+            college_stats = snapshot.get('colleges', {}).get(
+                PeerStatsService.college_key(user_college), {}
+            ) if user_college else {}
             
             # Calculate averages
-            def calc_avg(stats_list):
-                if not stats_list:
+            def calc_avg(stats):
+                count = stats.get('user_count', 0)
+                if not count:
                     return {'points': 0, 'streak': 0, 'achievements': 0}
                 return {
-                    'points': sum(s['points'] for s in stats_list) // len(stats_list),
-                    'streak': sum(s['streak'] for s in stats_list) // len(stats_list),
-                    'achievements': sum(s['achievements'] for s in stats_list) // len(stats_list)
+                    'points': stats.get('points_sum', 0) // count,
+                    'streak': stats.get('streak_sum', 0) // count,
+                    'achievements': stats.get('achievements_sum', 0) // count
                 }
             
             return {
-                'same_college': calc_avg(same_college_stats),
-                'all_peers': calc_avg(all_peers_stats),
-                'total_peers': len(all_peers_stats),
-                'college_peers': len(same_college_stats)
+                'same_college': calc_avg(college_stats),
+                'all_peers': calc_avg(snapshot),
+                'total_peers': snapshot.get('user_count', 0),
+                'college_peers': college_stats.get('user_count', 0)
             }
         
         except Exception as e:
@@ -0,0 +1,155 @@
+"""
+Benchmark deadline/expiry extraction over a synthetic search-result corpus
+
+Compares, for every result's title + snippet:
+  1. legacy - the original inline helpers (re.search/re.findall with the
+              pattern strings rebuilt on every call)
+  2. cold   - services.date_extraction with an empty memo cache
+  3. warm   - services.date_extraction on a second pass (repeat results)
+
+and checks that all three agree on every deadline and expiry decision.
+
+Usage: python benchmark_date_extraction.py [--snippets 10000] [--seed 7]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from services import date_extraction
+
+
+WORDS = ("google ai hackathon open to all students build innovative solutions prizes worth "
+         "apply now registration team of four members eligibility india internship stipend "
+         "fellowship program research summer remote engineering undergraduate").split()
+
+DATE_PHRASES = [
+    "Deadline: March 15, 2026", "Apply by 20 February 2026", "last date 5 Jan '26",
+    "Register by Dec 1 '25", "Hackathon on January 5, 2026", "runs 12 August 2025",
+    "starts 01/02/2026", "results 15-11-2025", "posted 2025-03-01", "deadline: 10 oct 2025",
+    "Registration closed", "ends on June 30, 2027", "till 31 December 2026", "", "", "", ""
+]
+
+
+def legacy_extract_deadline(text):
+    date_patterns = [
+        (r'(?:deadline|apply by|last date|due date|register by|submit by|registration deadline|application deadline|closes on|close date|expiry|expires|ends on|till|before):?\s*([A-Z][a-z]+\s+\d{1,2},?\s+\d{4})', 'keyword_mdy'),
+        (r'(?:deadline|apply by|last date|due date|register by|submit by|registration deadline|application deadline|closes on|close date|expiry|expires|ends on|till|before):?\s*(\d{1,2}\s+[A-Z][a-z]+\s+\d{4})', 'keyword_dmy'),
+        (r'(?:deadline|apply by|last date|due date|register by|submit by):?\s*(\d{1,2}\s+[A-Z][a-z]+\s+\'\d{2})', 'keyword_short_dmy'),
+        (r'(?:deadline|apply by|last date|due date|register by|submit by):?\s*([A-Z][a-z]+\s+\d{1,2}\s+\'\d{2})', 'keyword_short_mdy'),
+        (r'\b([A-Z][a-z]+\s+\d{1,2},?\s+20\d{2})\b', 'standalone_mdy'),
+        (r'\b(\d{1,2}\s+[A-Z][a-z]+\s+20\d{2})\b', 'standalone_dmy'),
+        (r'\b(\d{1,2}\s+[A-Z][a-z]+\s+\'\d{2})\b', 'standalone_short_dmy'),
+        (r'\b([A-Z][a-z]+\s+\d{1,2}\s+\'\d{2})\b', 'standalone_short_mdy'),
+        (r'\b(\d{1,2}/\d{1,2}/20\d{2})\b', 'slash'),
+        (r'\b(\d{1,2}-\d{1,2}-20\d{2})\b', 'dash'),
+        (r'\b(20\d{2}-\d{1,2}-\d{1,2})\b', 'iso'),
+    ]
+    for pattern, _ in date_patterns:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            date_str = match.group(1)
+            if "'" in date_str:
+                date_str = date_str.replace("'2", "202").replace("'1", "201")
+            return date_str
+    return None
+
+
+def legacy_is_expired(title, snippet):
+    text = (title + ' ' + snippet).lower()
+    current_date = datetime.now()
+
+    if any(keyword in text for keyword in ['closed', 'ended', 'expired', 'registration closed', 'applications closed']):
+        return True
+
+    date_patterns = [
+        (r'(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]* (\d{1,2}),? (\d{4})', 'mdy'),
+        (r'(\d{1,2})[-/](\d{1,2})[-/](\d{4})', 'dmy'),
+        (r'(\d{4})-(\d{1,2})-(\d{1,2})', 'ymd'),
+        (r'deadline:?\s*(\d{1,2})\s*(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\s*(\d{4})', 'dmy_text'),
+    ]
+    month_map = {'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+                 'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12}
+
+    for pattern, format_type in date_patterns:
+        for match in re.findall(pattern, text):
+            try:
+                deadline = None
+                if format_type == 'mdy':
+                    month = month_map.get(match[0][:3])
+                    if month:
+                        deadline = datetime(int(match[2]), month, int(match[1]))
+                elif format_type == 'dmy':
+                    deadline = datetime(int(match[2]), int(match[1]), int(match[0]))
+                elif format_type == 'ymd':
+                    deadline = datetime(int(match[0]), int(match[1]), int(match[2]))
+                elif format_type == 'dmy_text':
+                    month = month_map.get(match[1][:3])
+                    if month:
+                        deadline = datetime(int(match[2]), month, int(match[0]))
+
+                yesterday = current_date - timedelta(days=1)
+                if deadline and deadline.date() < yesterday.date():
+                    return True
+            except Exception:
+                continue
+    return False
+
+
+def make_corpus(size, seed):
+    rng = random.Random(seed)
+    # Real search pages repeat results across queries; ~1 in 4 is a repeat
+    unique = []
+    for _ in range(int(size * 0.75)):
+        title = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(4, 10))).title()
+        snippet = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(15, 35)))
+        phrase = rng.choice(DATE_PHRASES)
+        if phrase:
+            words = snippet.split()
+            words.insert(rng.randint(0, len(words)), phrase)
+            snippet = ' '.join(words)
+        unique.append((title, snippet))
+    return unique + [rng.choice(unique) for _ in range(size - len(unique))]
+
+
+def run(name, corpus, extract, expired):
+    started = time.perf_counter()
+    results = [(extract(f"{title} {snippet}"), expired(title, snippet)) for title, snippet in corpus]
+    elapsed = time.perf_counter() - started
+    print(f"  {name:<8} {elapsed * 1000:8.1f} ms total  {elapsed / len(corpus) * 1e6:7.1f} us/result")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--snippets', type=int, default=10000, help='results in the corpus')
+    parser.add_argument('--seed', type=int, default=7, help='corpus random seed')
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.snippets, args.seed)
+    print(f"📅 Date extraction benchmark: {len(corpus)} results")
+
+    legacy = run('legacy', corpus, legacy_extract_deadline, legacy_is_expired)
+
+    date_extraction.extract_deadline.cache_clear()
+    date_extraction.scan_expiry.cache_clear()
+    new_expired = lambda title, snippet: date_extraction.is_expired(title, snippet)[0]
+    cold = run('cold', corpus, date_extraction.extract_deadline, new_expired)
+    warm = run('warm', corpus, date_extraction.extract_deadline, new_expired)
+
+    mismatches = sum(1 for a, b, c in zip(legacy, cold, warm) if not a == b == c)
+    found = sum(1 for deadline, _ in legacy if deadline)
+    expired = sum(1 for _, is_expired in legacy if is_expired)
+    print(f"\n  deadlines found: {found}, expired: {expired}, mismatches: {mismatches}")
+    print(f"  cache: {date_extraction.cache_info()}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
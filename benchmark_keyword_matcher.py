@@ -0,0 +1,129 @@
+"""
+Benchmark keyword scoring of search result pages
+
+Compares, for pages of raw search result items:
+  1. legacy  - per-item substring loops (original _calculate_relevance_score,
+               _infer_opportunity_type and _extract_eligibility)
+  2. matcher - services.keyword_matcher.score_page, one pass per result
+
+and checks that both produce the same relevance score, type and
+eligibility text for every item.
+
+Usage: python benchmark_keyword_matcher.py [--results 10000] [--page-size 10]
+                                          [--density 0.3] [--seed 3]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from services import keyword_matcher
+
+
+FILLER = ("the a with for our your new and of in on at this that join learn more about details "
+          "event online 2025 team students college campus week").split()
+
+WORDS = ("google ai hackathon open to all students build innovative solutions prizes worth "
+         "apply now registration team of four members eligibility india internship stipend "
+         "fellowship program research summer training bootcamp contest must be enrolled "
+         "deadline 2026 scholarship financial aid grant criteria should be").split()
+
+LINKS = ["https://devpost.com/hackathons/{n}", "https://unstop.com/p/{n}", "https://example.org/login?next={n}",
+         "https://foo.in/terms/{n}", "https://www.linkedin.com/jobs/{n}", "https://college.edu/events/{n}",
+         "https://internshala.com/internship/detail/{n}", "https://site.com/profile/settings/{n}"]
+
+
+def legacy_score(item):
+    score = 50
+    title = item.get('title', '').lower()
+    snippet = item.get('snippet', '').lower()
+    link = item.get('link', '').lower()
+    for keyword in keyword_matcher.HIGH_VALUE_KEYWORDS:
+        if keyword in title:
+            score += 5
+        if keyword in snippet:
+            score += 3
+    for domain in keyword_matcher.TRUSTED_DOMAINS:
+        if domain in link:
+            score += 15
+            break
+    for indicator in keyword_matcher.SPAM_INDICATORS:
+        if indicator in link:
+            score -= 20
+    return max(0, min(100, score))
+
+
+def legacy_type(title, snippet):
+    text = (title + ' ' + snippet).lower()
+    for opp_type, keywords in keyword_matcher.TYPE_KEYWORDS.items():
+        if any(keyword in text for keyword in keywords):
+            return opp_type
+    return 'opportunity'
+
+
+def legacy_eligibility(snippet):
+    sentences = [s.strip() for s in snippet.split('.')
+                 if any(k in s.lower() for k in keyword_matcher.ELIGIBILITY_KEYWORDS)]
+    return ' '.join(sentences) if sentences else snippet
+
+
+def legacy_page(items):
+    results = []
+    for item in items:
+        title = item.get('title', 'No title')
+        snippet = item.get('snippet', 'No description')
+        results.append((legacy_score(item), legacy_type(title, snippet), legacy_eligibility(snippet)))
+    return results
+
+
+def make_items(count, density, seed):
+    rng = random.Random(seed)
+    word = lambda: rng.choice(WORDS) if rng.random() < density else rng.choice(FILLER)
+    # Glue some words together so keywords overlap ("deadlineligible")
+    join = lambda words: ''.join(w if rng.random() < 0.1 else ' ' + w for w in words).strip()
+    items = []
+    for n in range(count):
+        title = join(word() for _ in range(rng.randint(4, 9))).title()
+        snippet = '. '.join(join(word() for _ in range(rng.randint(5, 12)))
+                            for _ in range(rng.randint(1, 4)))
+        items.append({'title': title, 'snippet': snippet, 'link': rng.choice(LINKS).format(n=n)})
+    return items
+
+
+def run(name, pages, score):
+    started = time.perf_counter()
+    results = [score(page) for page in pages]
+    elapsed = time.perf_counter() - started
+    count = sum(len(page) for page in pages)
+    print(f"  {name:<8} {elapsed * 1000:8.1f} ms total  {elapsed / count * 1e6:7.1f} us/result")
+    return [result for page in results for result in page]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--results', type=int, default=10000, help='search result items')
+    parser.add_argument('--page-size', type=int, default=10, help='items per search page')
+    parser.add_argument('--density', type=float, default=0.3, help='share of words that are keywords')
+    parser.add_argument('--seed', type=int, default=3, help='corpus random seed')
+    args = parser.parse_args()
+
+    items = make_items(args.results, args.density, args.seed)
+    pages = [items[i:i + args.page_size] for i in range(0, len(items), args.page_size)]
+    print(f"🔎 Keyword scoring benchmark: {len(items)} results in pages of {args.page_size}")
+
+    legacy = run('legacy', pages, legacy_page)
+    matched = run('matcher', pages, lambda page: [
+        (m.relevance_score, m.type, m.eligibility_text) for m in keyword_matcher.score_page(page)
+    ])
+
+    mismatches = sum(1 for a, b in zip(legacy, matched) if a != b)
+    print(f"\n  mismatches: {mismatches}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Benchmark login password verification under concurrent load
+
+Compares, for a burst of concurrent logins:
+  1. legacy  - unsalted SHA-256 checked inline (old behaviour)
+  2. inline  - scrypt checked on every request thread
+  3. pooled  - scrypt checked on the bounded hashing pool (current behaviour)
+
+and reports login latency percentiles plus the latency of a cheap
+"other request" probe running at the same time, which shows whether
+logins starve the rest of the worker's threads.
+
+Usage: python benchmark_login.py [--clients 32] [--logins 8]
+"""
+import argparse
+import hashlib
+import hmac
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from services import passwords
+
+
+PASSWORD = "AaravSharma@100"
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def legacy_check(stored):
+    return hmac.compare_digest(hashlib.sha256(PASSWORD.encode()).hexdigest(), stored)
+
+
+def run_scenario(name, check, clients, logins_per_client):
+    login_latencies = []
+    probe_latencies = []
+    busy = 0
+    lock = threading.Lock()
+    done = threading.Event()
+
+    def client():
+        nonlocal busy
+        for _ in range(logins_per_client):
+            started = time.perf_counter()
+            try:
+                check()
+            except passwords.AuthBusyError:
+                with lock:
+                    busy += 1
+                continue
+            with lock:
+                login_latencies.append(time.perf_counter() - started)
+
+    def probe():
+        # Stand-in for a cheap API request served by the same process
+        while not done.is_set():
+            started = time.perf_counter()
+            sum(i * i for i in range(2000))
+            probe_latencies.append(time.perf_counter() - started)
+            time.sleep(0.005)
+
+    probe_thread = threading.Thread(target=probe, daemon=True)
+    probe_thread.start()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        for _ in range(clients):
+            pool.submit(client)
+    elapsed = time.perf_counter() - started
+
+    done.set()
+    probe_thread.join()
+
+    ms = lambda seconds: f"{seconds * 1000:8.1f}"
+    print(f"\n{name}")
+    print(f"  logins: {len(login_latencies)} ok, {busy} busy (503) in {elapsed:.2f}s "
+          f"-> {len(login_latencies) / elapsed:.1f}/s")
+    if login_latencies:
+        print(f"  login latency ms   p50 {ms(percentile(login_latencies, 50))}"
+              f"  p95 {ms(percentile(login_latencies, 95))}"
+              f"  p99 {ms(percentile(login_latencies, 99))}")
+    if probe_latencies:
+        print(f"  probe latency ms   p50 {ms(statistics.median(probe_latencies))}"
+              f"  p99 {ms(percentile(probe_latencies, 99))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--clients', type=int, default=32, help='concurrent login requests')
+    parser.add_argument('--logins', type=int, default=8, help='logins per client')
+    args = parser.parse_args()
+
+    n, r, p = passwords.scrypt_params()
+    print(f"🔐 Login benchmark: {args.clients} clients x {args.logins} logins, "
+          f"scrypt n={n} r={r} p={p}, pool workers={os.getenv('PASSWORD_HASH_WORKERS', 4)}")
+
+    legacy_hash = hashlib.sha256(PASSWORD.encode()).hexdigest()
+    scrypt_hash = passwords.hash_password_sync(PASSWORD)
+
+    run_scenario("1. legacy SHA-256 inline", lambda: legacy_check(legacy_hash), args.clients, args.logins)
+    run_scenario("2. scrypt inline", lambda: passwords.verify_password_sync(PASSWORD, scrypt_hash),
+                 args.clients, args.logins)
+    run_scenario("3. scrypt on bounded pool", lambda: passwords.verify_password(PASSWORD, scrypt_hash),
+                 args.clients, args.logins)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""
+Compact the opportunities collection
+
+Merges duplicate opportunity documents (same page reached through
+different tracking parameters, www/mobile hosts, or older auto-ID
+writes) into one document per canonical URL and re-points reasoning
+results at the surviving document.
+
+Usage: python compact_opportunities.py [--dry-run]
+"""
+import os
+import sys
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend')
+sys.path.insert(0, BACKEND_DIR)
+os.chdir(BACKEND_DIR)  # firebase-credentials.json / .env live here
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from services.firebase_service import FirebaseService
+
+
+if __name__ == '__main__':
+    dry_run = '--dry-run' in sys.argv
+
+    firebase = FirebaseService()
+    if not firebase.firebase_enabled:
+        print("❌ Firebase is not configured, nothing to compact")
+        sys.exit(1)
+
+    print(f"🧹 Compacting opportunities{' (dry run)' if dry_run else ''}...")
+    stats = firebase.compact_opportunities(dry_run=dry_run)
+
+    print(f"\n✅ Scanned:            {stats['scanned']}")
+    print(f"✅ Groups merged:      {stats['groups_merged']}")
+    print(f"✅ Duplicates removed: {stats['documents_removed']}")
+    print(f"✅ Reasoning updated:  {stats['reasoning_repointed']}")
@@ -45,17 +45,44 @@ export const logoutUser = async () => {
 // PROFILE API
 // ============================================================================
 
-export const parseResume = async (file) => {
+const RESUME_POLL_INTERVAL = 1500; // ms between job status checks
+const RESUME_POLL_TIMEOUT = 180000; // give up after 3 minutes
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// Uploads the resume, then polls the background parsing job until it finishes.
+// onProgress (optional) receives { status, stage, progress } on every poll.
+export const parseResume = async (file, onProgress = null) => {
   const formData = new FormData();
   formData.append('resume', file);
-  
+
   const response = await api.post('/profile/parse_resume', formData, {
     headers: {
       'Content-Type': 'multipart/form-data',
     },
   });
-  
-  return response.data;
+
+  let job = response.data;
+  const startedAt = Date.now();
+
+  while (job.status !== 'done') {
+    if (job.status === 'failed') {
+      throw new Error(job.error || 'Failed to parse resume');
+    }
+    if (Date.now() - startedAt > RESUME_POLL_TIMEOUT) {
+      throw new Error('Resume parsing is taking too long. Please try again.');
+    }
+
+    if (onProgress) onProgress(job);
+    await sleep(RESUME_POLL_INTERVAL);
+
+    const status = await api.get(`/profile/parse_resume/${job.job_id}`);
+    job = status.data;
+  }
+
+  if (job.link_error) console.warn(job.link_error);
+  if (onProgress) onProgress(job);
+  return job.result;
 };
 
 export const createProfile = async (profileData) => {